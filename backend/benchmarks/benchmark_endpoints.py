@@ -0,0 +1,315 @@
+"""
+Suite de regresión de rendimiento de la API.
+
+Crea una base SQLite nueva, la llena con el dataset sintético de
+src/seed_sintetico.py (siempre con la misma semilla) y ejercita los endpoints
+de estadísticas, dashboards, listados y envío de respuestas. Por cada
+endpoint registra la cantidad de consultas SQL (vía src/system/metrics.py)
+y la latencia p50/p95, y compara contra benchmarks/baseline.json.
+
+Sale con código 1 si algún endpoint:
+  - ejecuta más consultas que el baseline (+ --tolerancia-consultas), o
+  - tiene una mediana (p50) mayor a baseline * --factor-latencia + --margen-ms.
+
+La cantidad de consultas es determinística y es el control principal. La
+latencia se controla sobre la mediana de --repeticiones muestras (después de
+--calentamiento llamadas sin medir): el p95 se informa, pero con pocas
+muestras es la peor y una pausa del GC o un fsync alcanzan para superarlo.
+Los envíos (*.responder_*) no se calientan y tienen a lo sumo una muestra por
+alumno o informe pendiente del dataset.
+
+Al agregar un escenario, regrabar el baseline en el mismo commit: sin
+entrada en baseline.json figura como "nuevo" y no se controla.
+
+Uso (desde 'backend'):
+    python benchmarks/benchmark_endpoints.py                    # compara
+    python benchmarks/benchmark_endpoints.py --guardar-baseline # regraba el baseline
+"""
+import os
+import sys
+import json
+import math
+import logging
+import time
+import argparse
+import tempfile
+from collections import defaultdict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_ROOT = os.path.dirname(BENCH_DIR)
+BASELINE_DEFAULT = os.path.join(BENCH_DIR, "baseline.json")
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Regresión de rendimiento de endpoints.")
+    parser.add_argument("--db", default=None, help="Archivo SQLite a crear (por defecto, uno temporal)")
+    parser.add_argument("--repeticiones", type=int, default=50)
+    parser.add_argument("--calentamiento", type=int, default=3, help="Llamadas sin medir antes de cada escenario")
+    parser.add_argument("--baseline", default=BASELINE_DEFAULT)
+    parser.add_argument("--guardar-baseline", action="store_true")
+    parser.add_argument("--tolerancia-consultas", type=int, default=0)
+    parser.add_argument("--factor-latencia", type=float, default=2.0)
+    parser.add_argument("--margen-ms", type=float, default=15.0)
+    parser.add_argument("--departamentos", type=int, default=2)
+    parser.add_argument("--materias", type=int, default=4)
+    parser.add_argument("--cursadas", type=int, default=1)
+    parser.add_argument("--anios", type=int, default=4)
+    parser.add_argument("--alumnos", type=int, default=40)
+    return parser.parse_args(argv)
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[max(0, math.ceil(p * len(ordenados)) - 1)]
+
+
+def _preparar_base(args):
+    """Configura la BBDD antes de importar la app (src.database lee DB_URL al importarse)."""
+    if args.db:
+        ruta_db = os.path.abspath(args.db)
+        if os.path.exists(ruta_db):
+            os.remove(ruta_db)
+    else:
+        ruta_db = os.path.join(tempfile.mkdtemp(prefix="ra_bench_"), "bench.db")
+    os.environ["DB_URL"] = f"sqlite:///{ruta_db}"
+    os.environ.setdefault("ENV", "bench")
+    if BACKEND_ROOT not in sys.path:
+        sys.path.insert(0, BACKEND_ROOT)
+    return ruta_db
+
+
+def _escenarios(db, params):
+    """Arma la lista de (nombre, rol, método, url, body_factory) con ids reales del dataset."""
+    from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
+    from src.seed_sintetico import PREFIJO
+    from src.enumerados import EstadoInstancia, EstadoInforme
+    from src.persona.models import Profesor, Alumno, Inscripcion
+    from src.materia.models import Materia, Cursada
+    from src.encuestas.models import EncuestaInstancia, Encuesta
+    from src.instrumento.models import ActividadCurricularInstancia, ActividadCurricular, InformeSinteticoInstancia
+    from src.seccion.models import Seccion
+    from src.pregunta.models import PreguntaMultipleChoice
+
+    profesor = db.scalars(select(Profesor).where(Profesor.username == f"{PREFIJO}_prof1_1")).one()
+    materia = db.scalars(select(Materia).join(Cursada).where(Cursada.profesor_id == profesor.id)).first()
+    alumno = db.scalars(select(Alumno).where(Alumno.username.like(f"{PREFIJO}_alu1_%"))).first()
+
+    instancia_activa = db.scalars(
+        select(EncuestaInstancia)
+        .join(Cursada)
+        .where(EncuestaInstancia.estado == EstadoInstancia.ACTIVA, Cursada.profesor_id == profesor.id)
+        .options(
+            selectinload(EncuestaInstancia.plantilla)
+            .selectinload(Encuesta.secciones)
+            .selectinload(Seccion.preguntas.of_type(PreguntaMultipleChoice))
+            .selectinload(PreguntaMultipleChoice.opciones)
+        )
+    ).first()
+    pendientes_alumnos = db.execute(
+        select(Alumno.username)
+        .join(Inscripcion, Inscripcion.alumno_id == Alumno.id)
+        .where(Inscripcion.cursada_id == instancia_activa.cursada_id, Inscripcion.ha_respondido == False)
+    ).scalars().all()
+
+    informes_pendientes = db.scalars(
+        select(ActividadCurricularInstancia)
+        .where(ActividadCurricularInstancia.estado == EstadoInforme.PENDIENTE)
+        .options(selectinload(ActividadCurricularInstancia.profesor))
+    ).all()
+    plantilla_informe = db.scalars(
+        select(ActividadCurricular).options(
+            selectinload(ActividadCurricular.secciones)
+            .selectinload(Seccion.preguntas.of_type(PreguntaMultipleChoice))
+            .selectinload(PreguntaMultipleChoice.opciones)
+        )
+    ).first()
+
+    def _body(plantilla, texto):
+        respuestas = []
+        for seccion in plantilla.secciones:
+            for pregunta in seccion.preguntas:
+                if isinstance(pregunta, PreguntaMultipleChoice):
+                    respuestas.append({"pregunta_id": pregunta.id, "opcion_id": pregunta.opciones[0].id})
+                else:
+                    respuestas.append({"pregunta_id": pregunta.id, "texto": texto})
+        return {"respuestas": respuestas}
+
+    body_encuesta = _body(instancia_activa.plantilla, "Comentario de benchmark.")
+    body_informe = _body(plantilla_informe, "Texto de benchmark.")
+    depto = f"{PREFIJO}_depto1"
+    secretaria = f"{PREFIJO}_secretaria"
+    prof = profesor.username
+    alu = alumno.username
+
+    escenarios = [
+        # Alumno
+        ("alumno.mis_instancias_activas", alu, "GET", "/encuestas-abiertas/mis-instancias-activas", None),
+        ("alumno.detalles_encuesta", alu, "GET", f"/encuestas-abiertas/instancia/{instancia_activa.id}/detalles", None),
+        ("alumno.historial", alu, "GET", "/encuestas-abiertas/historial-estadisticas", None),
+        # Profesor
+        ("profesor.mis_resultados", prof, "GET", "/profesor/mis-resultados", None),
+        ("profesor.mis_materias", prof, "GET", "/profesor/mis-materias", None),
+        ("profesor.mis_sedes", prof, "GET", "/profesor/mis-sedes", None),
+        ("profesor.dashboard", prof, "GET", "/encuestas-abiertas/dashboard", None),
+        ("profesor.reportes_activos", prof, "GET", "/encuestas-abiertas/mis-instancias-activas-profesor", None),
+        ("profesor.informes_historicos", prof, "GET", "/encuestas-abiertas/mis-informes-historicos", None),
+        ("profesor.mis_tendencias", prof, "GET", "/profesor/mis-tendencias", None),
+        # Departamento
+        ("depto.estadisticas_generales", depto, "GET", "/departamento/estadisticas-generales", None),
+        ("depto.estadisticas_profesor", depto, "GET", f"/departamento/estadisticas/profesor/{profesor.id}", None),
+        ("depto.estadisticas_materia", depto, "GET", f"/departamento/estadisticas/materia/{materia.id}", None),
+        ("depto.tendencias_profesor", depto, "GET", f"/departamento/tendencias/profesor/{profesor.id}", None),
+        ("depto.tendencias_materia", depto, "GET", f"/departamento/tendencias/materia/{materia.id}", None),
+        ("depto.comparacion_profesor", depto, "GET", f"/departamento/comparacion/profesor/{profesor.id}", None),
+        ("depto.buscar_respuestas", depto, "GET", "/respuestas/buscar?q=proyector", None),
+        ("depto.necesidades_temas", depto, "GET", "/departamento/necesidades/temas", None),
+        ("depto.profesores", depto, "GET", "/departamento/profesores", None),
+        ("depto.materias", depto, "GET", "/departamento/materias", None),
+        ("depto.informes_curriculares", depto, "GET", "/departamento/mis-informes-curriculares", None),
+        ("depto.informes_sinteticos", depto, "GET", "/departamento/informes-sinteticos", None),
+        # Secretaría
+        ("secretaria.cursadas_disponibles", secretaria, "GET", "/admin/gestion-encuestas/cursadas-disponibles", None),
+        ("secretaria.activas", secretaria, "GET", "/admin/gestion-encuestas/activas", None),
+        ("secretaria.departamentos", secretaria, "GET", "/admin/gestion-encuestas/departamentos", None),
+    ]
+
+    # Envíos: cada repetición usa un usuario/instancia distinto (no se puede responder dos veces)
+    envios_alumnos = [
+        (u, "POST", f"/encuestas-abiertas/instancia/{instancia_activa.id}/responder", body_encuesta)
+        for u in pendientes_alumnos
+    ]
+    envios_profesores = [
+        (inf.profesor.username, "POST", f"/reportes-abiertas/instancia/{inf.id}/responder", body_informe)
+        for inf in informes_pendientes
+    ]
+    return escenarios, {"alumno.responder_encuesta": envios_alumnos, "profesor.responder_informe": envios_profesores}
+
+
+def ejecutar(args):
+    ruta_db = _preparar_base(args)
+
+    from fastapi.testclient import TestClient
+    from src.main import app
+    from src.database import SessionLocal, engine
+    from src.models import ModeloBase
+    from src.seed_plantilla import seed_plantillas_data
+    from src.seed_sintetico import ParametrosDataset, generar_dataset
+    from src.auth.services import create_access_token
+    from src.system import metrics
+
+    # Los excesos de presupuesto ya se reportan en la tabla final
+    logging.getLogger(metrics.__name__).setLevel(logging.ERROR)
+
+    print(f"📦 Generando dataset en {ruta_db}...")
+    ModeloBase.metadata.create_all(bind=engine)
+    seed_plantillas_data(SessionLocal())
+    params = ParametrosDataset(
+        departamentos=args.departamentos,
+        materias_por_departamento=args.materias,
+        cursadas_por_anio=args.cursadas,
+        anios=args.anios,
+        alumnos_por_cursada=args.alumnos,
+    )
+    db = SessionLocal()
+    try:
+        print(f"   {generar_dataset(db, params)}")
+        escenarios, envios = _escenarios(db, params)
+    finally:
+        db.close()
+
+    tokens = {}
+
+    def headers(username):
+        if username not in tokens:
+            tokens[username] = create_access_token(data={"sub": username})
+        return {"Authorization": f"Bearer {tokens[username]}"}
+
+    resultados = {}
+
+    def medir(client, nombre, llamadas):
+        latencias, consultas, errores = [], [], 0
+        for username, metodo, url, body in llamadas:
+            metrics.reiniciar_metricas()
+            inicio = time.perf_counter()
+            resp = client.request(metodo, url, headers=headers(username), json=body)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            if resp.status_code >= 400:
+                errores += 1
+                print(f"   ⚠️ {nombre}: HTTP {resp.status_code} {resp.text[:120]}")
+            consultas.append(sum(st.sql_count for st in metrics.metricas_por_ruta().values()))
+        if not latencias:
+            return
+        resultados[nombre] = {
+            "consultas": max(consultas),
+            "p50_ms": round(_percentil(latencias, 0.50), 2),
+            "p95_ms": round(_percentil(latencias, 0.95), 2),
+            "errores": errores,
+        }
+
+    with TestClient(app) as client:
+        for nombre, username, metodo, url, body in escenarios:
+            for _ in range(args.calentamiento):
+                client.request(metodo, url, headers=headers(username), json=body)
+            medir(client, nombre, [(username, metodo, url, body)] * args.repeticiones)
+        for nombre, llamadas in envios.items():
+            medir(client, nombre, llamadas[:args.repeticiones])
+
+    return resultados
+
+
+def comparar(resultados, baseline, args):
+    regresiones = []
+    for nombre, actual in sorted(resultados.items()):
+        base = baseline.get(nombre)
+        estado = "nuevo"
+        if base:
+            estado = "ok"
+            if actual["consultas"] > base["consultas"] + args.tolerancia_consultas:
+                regresiones.append(f"{nombre}: consultas {base['consultas']} -> {actual['consultas']}")
+                estado = "REGRESIÓN"
+            limite = base["p50_ms"] * args.factor_latencia + args.margen_ms
+            if actual["p50_ms"] > limite:
+                regresiones.append(f"{nombre}: p50 {base['p50_ms']}ms -> {actual['p50_ms']}ms (límite {limite:.1f}ms)")
+                estado = "REGRESIÓN"
+        if actual["errores"]:
+            regresiones.append(f"{nombre}: {actual['errores']} respuestas con error")
+            estado = "ERROR"
+        print(
+            f"   {nombre:38s} consultas={actual['consultas']:4d} "
+            f"p50={actual['p50_ms']:8.2f}ms p95={actual['p95_ms']:8.2f}ms  {estado}"
+        )
+    return regresiones
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    resultados = ejecutar(args)
+
+    if args.guardar_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False, sort_keys=True)
+            f.write("\n")
+        print(f"💾 Baseline guardado en {args.baseline}")
+        comparar(resultados, {}, args)
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    else:
+        print(f"⚠️ No existe {args.baseline}: se informan los valores sin comparar.")
+
+    regresiones = comparar(resultados, baseline, args)
+    if regresiones:
+        print("\n❌ Regresiones de rendimiento:")
+        for r in regresiones:
+            print(f"   - {r}")
+        return 1
+    print("\n✅ Sin regresiones respecto del baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Tiempo de serialización y bytes transferidos de los endpoints de estadísticas.
+
+Genera el mismo dataset sintético que benchmark_endpoints.py, obtiene los
+resultados de los servicios una vez y compara, por payload:
+  - "fastapi": jsonable_encoder + JSONResponse (lo que hace FastAPI con
+    response_model cuando el endpoint devuelve objetos),
+  - "directo": TypeAdapter.dump_json (src/system/serializacion.py),
+y el tamaño en bytes sin comprimir, con gzip y con brotli (si está instalado).
+
+Uso (desde 'backend'):
+    python benchmarks/benchmark_serializacion.py
+    python benchmarks/benchmark_serializacion.py --anios 8 --alumnos 80
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+from typing import List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+if BENCH_DIR not in sys.path:
+    sys.path.insert(0, BENCH_DIR)
+
+from benchmark_endpoints import _preparar_base  # noqa: E402
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serialización y compresión de payloads de estadísticas.")
+    parser.add_argument("--db", default=None, help="Archivo SQLite a crear (por defecto, uno temporal)")
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--departamentos", type=int, default=2)
+    parser.add_argument("--materias", type=int, default=4)
+    parser.add_argument("--cursadas", type=int, default=1)
+    parser.add_argument("--anios", type=int, default=4)
+    parser.add_argument("--alumnos", type=int, default=40)
+    return parser.parse_args(argv)
+
+
+def _medir_ms(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+def ejecutar(args):
+    ruta_db = _preparar_base(args)
+
+    from sqlalchemy import select
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+    from src.main import app  # noqa: F401  (registra todos los modelos)
+    from src.database import SessionLocal, engine
+    from src.models import ModeloBase
+    from src.seed_plantilla import seed_plantillas_data
+    from src.seed_sintetico import PREFIJO, ParametrosDataset, generar_dataset
+    from src.persona.models import Profesor, AdminDepartamento
+    from src.materia.models import Cursada
+    from src.encuestas import services as encuestas_services
+    from src.encuestas.schemas import ResultadoCursada
+    from src.system.serializacion import a_json
+    from src.system.compresion import comprimir, brotli
+
+    print(f"📦 Generando dataset en {ruta_db}...")
+    ModeloBase.metadata.create_all(bind=engine)
+    seed_plantillas_data(SessionLocal())
+    params = ParametrosDataset(
+        departamentos=args.departamentos,
+        materias_por_departamento=args.materias,
+        cursadas_por_anio=args.cursadas,
+        anios=args.anios,
+        alumnos_por_cursada=args.alumnos,
+    )
+    db = SessionLocal()
+    try:
+        print(f"   {generar_dataset(db, params)}")
+        profesor = db.scalars(select(Profesor).where(Profesor.username == f"{PREFIJO}_prof1_1")).one()
+        admin = db.scalars(select(AdminDepartamento).where(AdminDepartamento.username == f"{PREFIJO}_depto1")).one()
+        materia_id = db.scalar(select(Cursada.materia_id).where(Cursada.profesor_id == profesor.id))
+
+        adaptador = TypeAdapter(List[ResultadoCursada])
+        payloads = [
+            ("profesor.mis_resultados", adaptador,
+             encuestas_services.obtener_resultados_agregados_profesor(db, profesor.id)),
+            ("profesor.mis_resultados (5 coment.)", adaptador,
+             encuestas_services.obtener_resultados_agregados_profesor(db, profesor.id, max_comentarios=5)),
+            ("depto.estadisticas_materia", adaptador,
+             encuestas_services.obtener_resultados_agregados_para_materia(db, materia_id, admin.departamento_id)),
+        ]
+    finally:
+        db.close()
+
+    filas = []
+    for nombre, adaptador, valor in payloads:
+        cuerpo = a_json(adaptador, valor)
+        fila = {
+            "nombre": nombre,
+            "fastapi_ms": _medir_ms(lambda: JSONResponse(content=jsonable_encoder(valor)).body, args.repeticiones),
+            "directo_ms": _medir_ms(lambda: a_json(adaptador, valor), args.repeticiones),
+            "bytes": len(cuerpo),
+            "gzip": len(comprimir(cuerpo, "gzip")),
+            "gzip_ms": _medir_ms(lambda: comprimir(cuerpo, "gzip"), args.repeticiones),
+            "br": len(comprimir(cuerpo, "br")) if brotli else None,
+        }
+        filas.append(fila)
+    return filas
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    filas = ejecutar(args)
+    print()
+    for f in filas:
+        br = f"br={f['br']:9d}" if f["br"] is not None else "br=   (sin brotli)"
+        print(
+            f"   {f['nombre']:38s} fastapi={f['fastapi_ms']:8.2f}ms directo={f['directo_ms']:8.2f}ms "
+            f"bytes={f['bytes']:9d} gzip={f['gzip']:9d} ({f['gzip_ms']:.2f}ms) {br}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
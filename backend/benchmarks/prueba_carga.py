@@ -0,0 +1,457 @@
+"""
+Prueba de carga de la semana de encuestas.
+
+Levanta la app con uvicorn en un hilo de este proceso (o usa un servidor ya
+corriendo con --url) y la somete durante --duracion segundos a --usuarios
+usuarios virtuales concurrentes. Cada usuario repite sesiones elegidas al
+azar según --mezcla:
+
+  - alumno:       login → mis encuestas activas → detalles → responder
+  - profesor:     login → dashboard → reportes activos → mis resultados
+  - departamento: login → estadísticas generales → informes → tendencias
+  - secretaria:   login → encuestas activas → cursadas disponibles
+
+Informa por paso cantidad, errores y latencias p50/p95/p99, el throughput
+total, y la contención de la base según /system/metrics: escrituras, tiempo
+en escrituras (donde SQLite espera el lock), "database is locked" y espera
+de conexiones del pool.
+
+El dataset es el de src/seed_sintetico.py con semilla fija, y el orden de las
+sesiones sale de --semilla: dos corridas con los mismos parámetros hacen las
+mismas sesiones (los tiempos, por supuesto, varían). Cada alumno responde una
+sola vez; cuando no quedan alumnos con encuestas pendientes, las sesiones de
+alumno terminan después de listar sus encuestas.
+
+Uso (desde 'backend'):
+    python benchmarks/prueba_carga.py
+    python benchmarks/prueba_carga.py --usuarios 50 --duracion 120 --alumnos 300
+    python benchmarks/prueba_carga.py --mezcla alumno=1 --pausa 0.5 --salida carga.json
+    # Contra un servidor ya levantado sobre una base generada con seed_sintetico:
+    python benchmarks/prueba_carga.py --url http://127.0.0.1:8000 --db ./sintetico.db
+"""
+import os
+import sys
+import json
+import time
+import random
+import socket
+import argparse
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+if BENCH_DIR not in sys.path:
+    sys.path.insert(0, BENCH_DIR)
+
+from benchmark_endpoints import BACKEND_ROOT, _preparar_base, _percentil  # noqa: E402
+
+MEZCLA_DEFAULT = "alumno=85,profesor=8,departamento=5,secretaria=2"
+
+# Series de /system/metrics que se informan como diferencia entre el inicio y el fin
+SERIES_BASE = (
+    "ra_db_writes_total",
+    "ra_db_write_seconds_total",
+    "ra_db_write_max_seconds",
+    "ra_db_lock_errors_total",
+    "ra_db_pool_checkout_wait_seconds_total",
+    "ra_db_pool_checkout_wait_max_seconds",
+)
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga con mezcla de tráfico de la semana de encuestas.")
+    parser.add_argument("--url", default=None, help="Servidor ya levantado (por defecto se levanta uno en este proceso)")
+    parser.add_argument("--db", default=None,
+                        help="Archivo SQLite: se crea con el dataset (sin --url) o se lee para elegir usuarios (con --url)")
+    parser.add_argument("--usuarios", type=int, default=20, help="Usuarios virtuales concurrentes")
+    parser.add_argument("--duracion", type=float, default=60.0, help="Segundos de carga")
+    parser.add_argument("--pausa", type=float, default=0.0, help="Segundos entre pasos de una sesión")
+    parser.add_argument("--mezcla", default=MEZCLA_DEFAULT, help="Pesos de cada tipo de sesión (rol=peso,...)")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", default=None, help="Guarda el resultado en JSON")
+    parser.add_argument("--departamentos", type=int, default=2)
+    parser.add_argument("--materias", type=int, default=4)
+    parser.add_argument("--cursadas", type=int, default=1)
+    parser.add_argument("--anios", type=int, default=2)
+    parser.add_argument("--alumnos", type=int, default=150)
+    parser.add_argument("--tasa-respuesta", type=float, default=0.2,
+                        help="Fracción de inscriptos que ya respondió al empezar")
+    return parser.parse_args(argv)
+
+
+def _parse_mezcla(texto: str) -> Dict[str, float]:
+    mezcla = {}
+    for parte in texto.split(","):
+        rol, _, peso = parte.partition("=")
+        if rol.strip() not in ESCENARIOS:
+            raise SystemExit(f"Rol desconocido en --mezcla: '{rol.strip()}' (válidos: {', '.join(ESCENARIOS)})")
+        mezcla[rol.strip()] = float(peso or 1)
+    return mezcla
+
+
+def _puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _leer_series(cliente) -> Dict[str, float]:
+    """Suma, por nombre, las series de /system/metrics que interesan (sin importar las etiquetas)."""
+    valores: Dict[str, float] = defaultdict(float)
+    for linea in cliente.get("/system/metrics").text.splitlines():
+        if linea.startswith("#") or not linea.strip():
+            continue
+        nombre_etiquetas, _, valor = linea.rpartition(" ")
+        nombre = nombre_etiquetas.split("{", 1)[0]
+        if nombre in SERIES_BASE:
+            if nombre.endswith("_max_seconds"):
+                valores[nombre] = max(valores[nombre], float(valor))
+            else:
+                valores[nombre] += float(valor)
+    return valores
+
+
+# --- Datos del dataset ---
+
+def _datos_dataset(db) -> dict:
+    """Usuarios por rol e ids que usan las sesiones (se leen una vez, antes de la carga)."""
+    from sqlalchemy import select
+    from src.seed_sintetico import PREFIJO, PASSWORD
+    from src.enumerados import EstadoInstancia
+    from src.persona.models import Profesor, Alumno, AdminDepartamento, Inscripcion
+    from src.materia.models import Cursada
+    from src.encuestas.models import EncuestaInstancia
+
+    pendientes = db.execute(
+        select(Alumno.username)
+        .join(Inscripcion, Inscripcion.alumno_id == Alumno.id)
+        .join(EncuestaInstancia, EncuestaInstancia.cursada_id == Inscripcion.cursada_id)
+        .where(EncuestaInstancia.estado == EstadoInstancia.ACTIVA, Inscripcion.ha_respondido == False)  # noqa: E712
+        .distinct()
+        .order_by(Alumno.username)
+    ).scalars().all()
+    profesores = db.execute(
+        select(Profesor.username, Profesor.id)
+        .where(Profesor.username.like(f"{PREFIJO}_prof%"))
+        .order_by(Profesor.username)
+    ).all()
+    materias_profesor = dict(db.execute(select(Cursada.profesor_id, Cursada.materia_id)).all())
+    deptos = db.execute(
+        select(AdminDepartamento.username).where(AdminDepartamento.username.like(f"{PREFIJO}_depto%"))
+    ).scalars().all()
+    return {
+        "alumnos": list(pendientes),
+        "profesores": [(username, pid, materias_profesor.get(pid)) for username, pid in profesores],
+        "departamentos": list(deptos),
+        "secretarias": [f"{PREFIJO}_secretaria"],
+        "password": PASSWORD,
+    }
+
+
+# --- Sesiones ---
+
+class Registro:
+    """Latencias y errores por paso, compartido entre los hilos."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias: Dict[str, List[float]] = defaultdict(list)
+        self.errores: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.sesiones: Dict[str, int] = defaultdict(int)
+
+    def agregar(self, paso: str, ms: float, error: Optional[str]) -> None:
+        with self._lock:
+            self.latencias[paso].append(ms)
+            if error:
+                self.errores[paso][error] += 1
+
+    def sesion(self, rol: str) -> None:
+        with self._lock:
+            self.sesiones[rol] += 1
+
+
+class Sesion:
+    """Un cliente HTTP con su token; cada paso se mide y se registra."""
+
+    def __init__(self, cliente, registro: Registro, pausa: float):
+        self.cliente = cliente
+        self.registro = registro
+        self.pausa = pausa
+        self.headers = {}
+
+    def paso(self, nombre: str, metodo: str, url: str, **kwargs):
+        if self.pausa and nombre != "login":
+            time.sleep(self.pausa)
+        inicio = time.perf_counter()
+        try:
+            resp = self.cliente.request(metodo, url, headers=self.headers, **kwargs)
+        except Exception as e:
+            self.registro.agregar(nombre, (time.perf_counter() - inicio) * 1000, type(e).__name__)
+            return None
+        ms = (time.perf_counter() - inicio) * 1000
+        self.registro.agregar(nombre, ms, f"HTTP {resp.status_code}" if resp.status_code >= 400 else None)
+        return resp if resp.status_code < 400 else None
+
+    def login(self, username: str, password: str) -> bool:
+        resp = self.paso("login", "POST", "/auth/token", data={"username": username, "password": password})
+        if resp is None:
+            return False
+        self.headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+        return True
+
+
+def _body_respuestas(plantilla: dict, rng: random.Random) -> dict:
+    respuestas = []
+    for seccion in plantilla.get("secciones") or []:
+        for pregunta in seccion.get("preguntas") or []:
+            if pregunta.get("opciones"):
+                respuestas.append({"pregunta_id": pregunta["id"], "opcion_id": rng.choice(pregunta["opciones"])["id"]})
+            else:
+                respuestas.append({"pregunta_id": pregunta["id"], "texto": "Comentario de prueba de carga."})
+    return {"respuestas": respuestas}
+
+
+def sesion_alumno(s: Sesion, datos: dict, rng: random.Random) -> None:
+    with datos["lock"]:
+        username = datos["alumnos"].pop() if datos["alumnos"] else None
+    if username is None:
+        # Sin pendientes: un alumno que ya respondió y solo mira su inicio
+        username = rng.choice(datos["respondieron"]) if datos["respondieron"] else None
+        if username is None or not s.login(username, datos["password"]):
+            return
+        s.paso("alumno.mis_instancias_activas", "GET", "/encuestas-abiertas/mis-instancias-activas")
+        return
+    if not s.login(username, datos["password"]):
+        return
+    resp = s.paso("alumno.mis_instancias_activas", "GET", "/encuestas-abiertas/mis-instancias-activas")
+    if resp is None:
+        return
+    for encuesta in resp.json():
+        if encuesta["ha_respondido"]:
+            continue
+        instancia_id = encuesta["instancia_id"]
+        detalles = s.paso("alumno.detalles", "GET", f"/encuestas-abiertas/instancia/{instancia_id}/detalles")
+        if detalles is None:
+            continue
+        s.paso("alumno.responder", "POST", f"/encuestas-abiertas/instancia/{instancia_id}/responder",
+               json=_body_respuestas(detalles.json(), rng))
+    with datos["lock"]:
+        datos["respondieron"].append(username)
+
+
+def sesion_profesor(s: Sesion, datos: dict, rng: random.Random) -> None:
+    username, _, _ = rng.choice(datos["profesores"])
+    if not s.login(username, datos["password"]):
+        return
+    s.paso("profesor.dashboard", "GET", "/encuestas-abiertas/dashboard")
+    s.paso("profesor.reportes_activos", "GET", "/encuestas-abiertas/mis-instancias-activas-profesor")
+    s.paso("profesor.mis_resultados", "GET", "/profesor/mis-resultados", params={"max_comentarios": 5})
+
+
+def sesion_departamento(s: Sesion, datos: dict, rng: random.Random) -> None:
+    if not s.login(rng.choice(datos["departamentos"]), datos["password"]):
+        return
+    _, profesor_id, materia_id = rng.choice(datos["profesores"])
+    s.paso("departamento.estadisticas_generales", "GET", "/departamento/estadisticas-generales")
+    s.paso("departamento.informes_curriculares", "GET", "/departamento/mis-informes-curriculares")
+    s.paso("departamento.tendencias_profesor", "GET", f"/departamento/tendencias/profesor/{profesor_id}")
+    if materia_id is not None:
+        s.paso("departamento.tendencias_materia", "GET", f"/departamento/tendencias/materia/{materia_id}")
+
+
+def sesion_secretaria(s: Sesion, datos: dict, rng: random.Random) -> None:
+    if not s.login(rng.choice(datos["secretarias"]), datos["password"]):
+        return
+    s.paso("secretaria.activas", "GET", "/admin/gestion-encuestas/activas")
+    s.paso("secretaria.cursadas_disponibles", "GET", "/admin/gestion-encuestas/cursadas-disponibles")
+
+
+ESCENARIOS = {
+    "alumno": sesion_alumno,
+    "profesor": sesion_profesor,
+    "departamento": sesion_departamento,
+    "secretaria": sesion_secretaria,
+}
+
+
+# --- Ejecución ---
+
+def _levantar_servidor():
+    """uvicorn en un hilo de este proceso; devuelve (url, servidor)."""
+    import uvicorn
+    from src.main import app
+
+    puerto = _puerto_libre()
+    servidor = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=puerto, log_level="warning"))
+    hilo = threading.Thread(target=servidor.run, name="uvicorn", daemon=True)
+    hilo.start()
+    while not servidor.started:
+        if not hilo.is_alive():
+            raise SystemExit("No se pudo levantar el servidor.")
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{puerto}", servidor
+
+
+def ejecutar(args) -> dict:
+    import httpx
+
+    if args.url:
+        if not args.db:
+            raise SystemExit("Con --url hace falta --db (la base del servidor) para elegir los usuarios.")
+        os.environ["DB_URL"] = f"sqlite:///{os.path.abspath(args.db)}"
+        os.environ.setdefault("ENV", "bench")
+        if BACKEND_ROOT not in sys.path:
+            sys.path.insert(0, BACKEND_ROOT)
+    else:
+        ruta_db = _preparar_base(args)
+
+    from src.database import SessionLocal, engine
+    from src.models import ModeloBase
+
+    servidor = None
+    if not args.url:
+        import logging
+        from src.seed_plantilla import seed_plantillas_data
+        from src.seed_sintetico import ParametrosDataset, generar_dataset
+        from src.system import metrics
+
+        # Los excesos de presupuesto de consultas no interesan acá
+        logging.getLogger(metrics.__name__).setLevel(logging.ERROR)
+        print(f"📦 Generando dataset en {ruta_db}...")
+        ModeloBase.metadata.create_all(bind=engine)
+        seed_plantillas_data(SessionLocal())
+        params = ParametrosDataset(
+            departamentos=args.departamentos,
+            materias_por_departamento=args.materias,
+            cursadas_por_anio=args.cursadas,
+            anios=args.anios,
+            alumnos_por_cursada=args.alumnos,
+            tasa_respuesta=args.tasa_respuesta,
+        )
+        db = SessionLocal()
+        try:
+            print(f"   {generar_dataset(db, params)}")
+        finally:
+            db.close()
+
+    db = SessionLocal()
+    try:
+        datos = _datos_dataset(db)
+    finally:
+        db.close()
+    rng_global = random.Random(args.semilla)
+    rng_global.shuffle(datos["alumnos"])
+    datos["respondieron"] = []
+    datos["lock"] = threading.Lock()
+    mezcla = _parse_mezcla(args.mezcla)
+    print(f"👥 {len(datos['alumnos'])} alumnos con encuestas pendientes, {len(datos['profesores'])} profesores.")
+
+    url = args.url
+    if url is None:
+        url, servidor = _levantar_servidor()
+
+    registro = Registro()
+    fin = [0.0]
+
+    def usuario_virtual(numero: int) -> None:
+        rng = random.Random(args.semilla * 1000 + numero)
+        roles, pesos = list(mezcla), list(mezcla.values())
+        with httpx.Client(base_url=url, timeout=60.0) as cliente:
+            while time.perf_counter() < fin[0]:
+                rol = rng.choices(roles, pesos)[0]
+                ESCENARIOS[rol](Sesion(cliente, registro, args.pausa), datos, rng)
+                registro.sesion(rol)
+
+    try:
+        with httpx.Client(base_url=url, timeout=30.0) as cliente:
+            # /system/metrics pide Secretaría (o METRICS_TOKEN)
+            token = cliente.post(
+                "/auth/token", data={"username": datos["secretarias"][0], "password": datos["password"]}
+            ).json()["access_token"]
+            cliente.headers["Authorization"] = f"Bearer {token}"
+            antes = _leer_series(cliente)
+            print(f"🚀 {args.usuarios} usuarios durante {args.duracion:.0f}s contra {url} (mezcla {args.mezcla})...")
+            inicio = time.perf_counter()
+            fin[0] = inicio + args.duracion
+            hilos = [
+                threading.Thread(target=usuario_virtual, args=(i,), name=f"usuario-{i}")
+                for i in range(args.usuarios)
+            ]
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+            transcurrido = time.perf_counter() - inicio
+            despues = _leer_series(cliente)
+    finally:
+        if servidor is not None:
+            servidor.should_exit = True
+
+    pasos = {}
+    for paso, latencias in sorted(registro.latencias.items()):
+        errores = dict(registro.errores.get(paso, {}))
+        pasos[paso] = {
+            "requests": len(latencias),
+            "errores": sum(errores.values()),
+            "detalle_errores": errores,
+            "p50_ms": round(_percentil(latencias, 0.50), 2),
+            "p95_ms": round(_percentil(latencias, 0.95), 2),
+            "p99_ms": round(_percentil(latencias, 0.99), 2),
+        }
+    total = sum(p["requests"] for p in pasos.values())
+    base = {
+        nombre: (despues.get(nombre, 0.0) if nombre.endswith("_max_seconds")
+                 else despues.get(nombre, 0.0) - antes.get(nombre, 0.0))
+        for nombre in SERIES_BASE
+    }
+    return {
+        "parametros": {k: v for k, v in vars(args).items() if k not in ("salida",)},
+        "duracion_s": round(transcurrido, 2),
+        "requests": total,
+        "throughput_rps": round(total / transcurrido, 2),
+        "errores": sum(p["errores"] for p in pasos.values()),
+        "sesiones": dict(registro.sesiones),
+        "alumnos_que_respondieron": len(datos["respondieron"]),
+        "pasos": pasos,
+        "base": base,
+    }
+
+
+def imprimir(resultado: dict) -> None:
+    print()
+    print(f"   {'paso':38s} {'requests':>8s} {'errores':>8s} {'p50':>10s} {'p95':>10s} {'p99':>10s}")
+    for paso, p in resultado["pasos"].items():
+        print(
+            f"   {paso:38s} {p['requests']:8d} {p['errores']:8d} "
+            f"{p['p50_ms']:8.1f}ms {p['p95_ms']:8.1f}ms {p['p99_ms']:8.1f}ms"
+        )
+        for error, cantidad in p["detalle_errores"].items():
+            print(f"      ⚠️ {error}: {cantidad}")
+    tasa_error = resultado["errores"] / resultado["requests"] if resultado["requests"] else 0.0
+    print()
+    print(f"   Throughput: {resultado['throughput_rps']:.1f} req/s ({resultado['requests']} requests "
+          f"en {resultado['duracion_s']:.1f}s), errores {tasa_error:.2%}")
+    print(f"   Sesiones: {resultado['sesiones']} — alumnos que respondieron: {resultado['alumnos_que_respondieron']}")
+    b = resultado["base"]
+    promedio = b["ra_db_write_seconds_total"] / b["ra_db_writes_total"] * 1000 if b["ra_db_writes_total"] else 0.0
+    print(f"   Escrituras: {b['ra_db_writes_total']:.0f} (promedio {promedio:.2f}ms, "
+          f"máx {b['ra_db_write_max_seconds'] * 1000:.1f}ms), 'database is locked': {b['ra_db_lock_errors_total']:.0f}")
+    print(f"   Espera de pool: {b['ra_db_pool_checkout_wait_seconds_total']:.2f}s en total, "
+          f"máx {b['ra_db_pool_checkout_wait_max_seconds'] * 1000:.1f}ms")
+
+
+def main(argv=None):
+    args = _parse_args(argv)
+    resultado = ejecutar(args)
+    imprimir(resultado)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"💾 Resultado guardado en {args.salida}")
+    return 1 if resultado["errores"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+import os
+import tempfile
+from dataclasses import asdict
+
+from sqlalchemy.orm import Session
+
+from src.carga_masiva.siu import ResultadoImportacion, importar_inscripciones, leer_csv_siu
+from src.system.jobs import registrar_trabajo, Progreso
+from src.system.cache import invalidar, TAG_CURSADAS, TAG_ENCUESTAS
+
+
+def contar_filas(ruta: str) -> int:
+    # Contar líneas es barato (el archivo ya está en disco) y permite informar un porcentaje
+    with open(ruta, "rb") as f:
+        return max(0, sum(1 for _ in f) - 1)
+
+
+def guardar_clave(hashed_password: str) -> str:
+    """
+    Guarda el hash de la contraseña inicial en un archivo temporal (sólo legible
+    por el proceso) y devuelve la ruta: en los parámetros del trabajo, que se
+    guardan en la tabla `trabajos`, queda sólo la referencia.
+    """
+    fd, ruta = tempfile.mkstemp(prefix="importacion_", suffix=".clave")
+    with os.fdopen(fd, "w") as f:
+        f.write(hashed_password)
+    return ruta
+
+
+def borrar_archivos(ruta: str, ruta_clave: str, **_) -> None:
+    """Borra el CSV y la clave temporales cuando el trabajo ya no se va a reintentar."""
+    for archivo in (ruta, ruta_clave):
+        try:
+            os.remove(archivo)
+        except FileNotFoundError:
+            pass
+
+
+@registrar_trabajo("importar_inscripciones", al_terminar=borrar_archivos)
+def trabajo_importar_inscripciones(
+    db: Session,
+    progreso: Progreso,
+    ruta: str,
+    ruta_clave: str,
+    archivo: str,
+    total_filas: int
+) -> dict:
+    """
+    Importa el CSV guardado en `ruta`. Si falla se reintenta desde el principio
+    (la importación es un upsert, lo ya confirmado no se duplica); los archivos
+    temporales se borran cuando el trabajo termina, bien o agotados los intentos.
+    """
+    def _progreso(resultado: ResultadoImportacion):
+        porcentaje = 100 * resultado.filas / total_filas if total_filas else 100
+        progreso(porcentaje, f"{resultado.filas} de {total_filas} filas procesadas ({resultado.cantidad_errores} con errores)")
+
+    with open(ruta_clave) as f:
+        hashed_password_inicial = f.read()
+    with open(ruta, encoding="utf-8-sig", newline="") as f:
+        resultado = importar_inscripciones(db, leer_csv_siu(f), hashed_password_inicial, progreso=_progreso)
+    # Cursadas y asignaciones nuevas: listados de materias, profesores y cursadas disponibles
+    invalidar(TAG_CURSADAS, TAG_ENCUESTAS)
+    return {"archivo": archivo, **asdict(resultado)}
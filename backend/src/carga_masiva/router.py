@@ -0,0 +1,52 @@
+import os
+import shutil
+import tempfile
+from fastapi import APIRouter, Depends, File, Form, UploadFile, status
+from sqlalchemy.orm import Session
+
+from src.auth.services import get_password_hash
+from src.carga_masiva import importaciones
+from src.database import get_db
+from src.dependencies import get_current_admin_secretaria
+from src.exceptions import BadRequest
+from src.persona.models import AdminSecretaria
+from src.system import schemas as system_schemas
+from src.system.jobs import encolar_trabajo
+
+router = APIRouter(
+    prefix="/admin/importaciones",
+    tags=["Admin - Importaciones"],
+)
+
+
+@router.post("/inscripciones", response_model=system_schemas.Trabajo, status_code=status.HTTP_202_ACCEPTED)
+def importar_inscripciones_csv(
+    archivo: UploadFile = File(...),
+    password_inicial: str = Form(..., min_length=6),
+    db: Session = Depends(get_db),
+    admin: AdminSecretaria = Depends(get_current_admin_secretaria)
+):
+    """
+    Recibe un CSV exportado de SIU Guaraní (legajo, nombre, materia, anio, periodo, docente)
+    y lo importa como trabajo en segundo plano. El progreso, el resumen y los errores por
+    fila se consultan en GET /system/jobs/{id}.
+    """
+    if not (archivo.filename or "").lower().endswith(".csv"):
+        raise BadRequest("El archivo debe ser un CSV.")
+
+    # Se copia a disco por bloques: no se carga el archivo entero en memoria
+    fd, ruta = tempfile.mkstemp(prefix="importacion_", suffix=".csv")
+    with os.fdopen(fd, "wb") as destino:
+        shutil.copyfileobj(archivo.file, destino)
+
+    return encolar_trabajo(
+        db,
+        "importar_inscripciones",
+        {
+            "ruta": ruta,
+            "archivo": archivo.filename,
+            "total_filas": importaciones.contar_filas(ruta),
+            "ruta_clave": importaciones.guardar_clave(get_password_hash(password_inicial)),
+        },
+        creado_por_id=admin.id
+    )
@@ -0,0 +1,261 @@
+from collections import Counter, defaultdict
+from datetime import datetime
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Table, func, inspect, select
+from sqlalchemy.orm import Session
+
+from src.models import ModeloBase
+from src.enumerados import TipoPregunta
+from src.respuesta.models import RespuestaSet, Respuesta, RespuestaMultipleChoice, RespuestaRedaccion
+# Importados para que la metadata tenga todas las tablas (orden de FKs en flush)
+from src.materia import models as _materia_models  # noqa: F401
+from src.persona import models as _persona_models  # noqa: F401
+from src.encuestas import models as _encuestas_models  # noqa: F401
+from src.seccion import models as _seccion_models  # noqa: F401
+from src.pregunta import models as _pregunta_models  # noqa: F401
+
+# Filas acumuladas (entre todas las tablas) antes de mandar un lote a la BBDD
+TAMANIO_LOTE = 5000
+
+# (pregunta_id, opcion_id, texto): opcion_id para multiple choice, texto para redacción
+RespuestaCruda = Tuple[int, Optional[int], Optional[str]]
+
+
+def _memoizar(proc: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    cache: Dict[Any, Any] = {}
+
+    def _procesar(valor):
+        if valor is None:
+            return None
+        try:
+            return cache[valor]
+        except KeyError:
+            cache[valor] = resultado = proc(valor)
+            return resultado
+        except TypeError:  # valor no hasheable
+            return proc(valor)
+    return _procesar
+
+
+class CargadorMasivo:
+    """
+    Carga de datos en volumen usando INSERTs de Core por lotes en lugar de
+    `db.add` objeto por objeto.
+
+    Para los modelos con PK `id` hay dos formas de obtener el id:
+
+    - `reservar_ids=False` (por defecto): la fila de la tabla base se inserta
+      en el momento y el id lo asigna la BBDD; las tablas hijas y las que no
+      tienen `id` (Inscripcion...) se encolan. Es lo que corresponde dentro de
+      la API, donde hay otros escritores concurrentes.
+    - `reservar_ids=True`: el id se calcula acá (MAX(id) + 1 al primer uso) y
+      todas las filas se encolan. Es bastante más rápido, pero la carga tiene
+      que ser el único escritor de esas tablas mientras dura la transacción:
+      sólo para scripts fuera de línea (seeds).
+
+    No hace commit: el que llama decide cuándo confirmar (luego de `flush()`).
+    Las filas no pasan por la sesión: no quedan objetos ORM en memoria.
+    """
+
+    def __init__(self, db: Session, tamanio_lote: int = TAMANIO_LOTE, reservar_ids: bool = False):
+        self.db = db
+        self.reservar_ids = reservar_ids
+        self.tamanio_lote = tamanio_lote
+        self.contadores: Counter = Counter()
+        self._proximo_id: Dict[str, int] = {}
+        self._pendientes: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._cantidad_pendiente = 0
+        self._planes: Dict[type, tuple] = {}
+        self._tablas = {t.name: t for t in ModeloBase.metadata.sorted_tables}
+
+    # --- Ids ---
+
+    def reservar_id(self, tabla: Table) -> int:
+        """Devuelve el próximo id libre de la tabla (sin insertar nada)."""
+        if not self.reservar_ids:
+            raise RuntimeError("reservar_id exige un CargadorMasivo(..., reservar_ids=True)")
+        if tabla.name not in self._proximo_id:
+            maximo = self.db.execute(select(func.max(tabla.c.id))).scalar()
+            self._proximo_id[tabla.name] = (maximo or 0) + 1
+        nuevo_id = self._proximo_id[tabla.name]
+        self._proximo_id[tabla.name] += 1
+        return nuevo_id
+
+    # --- Carga genérica ---
+
+    def _plan(self, modelo: type) -> tuple:
+        """(tablas de la jerarquía, columnas por tabla, discriminador) de un modelo, cacheado."""
+        if modelo not in self._planes:
+            mapper = inspect(modelo)
+            tablas = list(mapper.tables)
+            columnas = [(tabla, frozenset(c.key for c in tabla.columns)) for tabla in tablas]
+            discriminador = None
+            if mapper.polymorphic_on is not None and mapper.polymorphic_identity is not None:
+                discriminador = (mapper.polymorphic_on.key, mapper.polymorphic_identity)
+            con_id = "id" in tablas[0].c and tablas[0].c.id.primary_key
+            self._planes[modelo] = (tablas, columnas, discriminador, con_id)
+        return self._planes[modelo]
+
+    def agregar(self, modelo: type, **valores: Any) -> Optional[int]:
+        """
+        Encola una fila del modelo. Si el modelo tiene PK `id` y no se pasa,
+        se asigna una nueva. Devuelve el id (None para tablas sin `id`, ej: Inscripcion).
+        """
+        tablas, columnas, discriminador, con_id = self._plan(modelo)
+        if discriminador:
+            valores.setdefault(*discriminador)
+        pendientes = []
+        usadas = set()
+        for tabla, claves in columnas:
+            fila = {k: v for k, v in valores.items() if k in claves}
+            usadas.update(fila)
+            pendientes.append((tabla, fila))
+        sobrantes = set(valores) - usadas
+        if sobrantes:
+            raise ValueError(f"{modelo.__name__} no tiene las columnas: {', '.join(sorted(sobrantes))}")
+
+        nuevo_id = valores.get("id") if con_id else None
+        if con_id and nuevo_id is None:
+            if self.reservar_ids:
+                nuevo_id = self.reservar_id(tablas[0])
+            else:
+                # La fila base va ya a la BBDD; las hijas se encolan con el id obtenido
+                nuevo_id = self._insertar_base(*pendientes.pop(0))
+            for _, fila in pendientes:
+                fila["id"] = nuevo_id
+        for tabla, fila in pendientes:
+            self._encolar(tabla, fila)
+
+        self.contadores[modelo.__tablename__] += 1
+        if self._cantidad_pendiente >= self.tamanio_lote:
+            self.flush()
+        return nuevo_id
+
+    def _insertar_base(self, tabla: Table, fila: Dict[str, Any]) -> int:
+        """INSERT inmediato de la fila de la tabla base; devuelve el id que asignó la BBDD."""
+        resultado = self.db.connection().execute(tabla.insert().values(**fila))
+        return resultado.inserted_primary_key[0]
+
+    def agregar_fila(self, tabla: Table, **valores: Any) -> None:
+        """Encola una fila en una tabla sin modelo (ej: tablas de asociación)."""
+        self._encolar(tabla, valores)
+        self.contadores[tabla.name] += 1
+        if self._cantidad_pendiente >= self.tamanio_lote:
+            self.flush()
+
+    def _encolar(self, tabla: Table, fila: Dict[str, Any]) -> None:
+        self._pendientes[tabla.name].append(fila)
+        self._cantidad_pendiente += 1
+
+    def confirmar(self) -> None:
+        """
+        flush + commit. Con ids reservados, después del commit se vuelven a leer
+        los MAX(id): entre una transacción y la siguiente otro proceso pudo
+        haber insertado filas.
+        """
+        self.flush()
+        self.db.commit()
+        self._proximo_id.clear()
+
+    def flush(self) -> None:
+        """Envía lo pendiente respetando el orden de las FKs entre tablas."""
+        if not self._cantidad_pendiente:
+            return
+        conn = self.db.connection()
+        for nombre, tabla in self._tablas.items():
+            filas = self._pendientes.pop(nombre, None)
+            if not filas:
+                continue
+            # executemany exige que todas las filas tengan las mismas claves
+            por_claves: Dict[Tuple[str, ...], List[Dict[str, Any]]] = defaultdict(list)
+            for fila in filas:
+                por_claves[tuple(fila)].append(fila)
+            for claves, grupo in por_claves.items():
+                self._insertar(conn, tabla, claves, grupo)
+        self._cantidad_pendiente = 0
+
+    def _insertar(self, conn, tabla: Table, claves: Tuple[str, ...], filas: List[Dict[str, Any]]) -> None:
+        """
+        executemany directo sobre el driver con el INSERT compilado una sola vez.
+        Con `conn.execute(tabla.insert(), filas)` SQLAlchemy arma los parámetros
+        fila por fila y eso termina costando más que el propio INSERT.
+        """
+        dialecto = conn.dialect
+        compilado = tabla.insert().compile(dialect=dialecto, column_keys=list(claves))
+        orden = list(compilado.positiontup) if compilado.positional else list(claves)
+        procesadores = [tabla.c[k].type.dialect_impl(dialecto).bind_processor(dialecto) for k in orden]
+
+        # Columnas con default de Python (ej: ha_respondido=False) que no vinieron en las filas
+        defaults = {k: self._default(tabla.c[k]) for k in orden if k not in claves}
+        if defaults:
+            filas = [{**defaults, **f} for f in filas]
+
+        getter = itemgetter(*orden)
+        parametros = [getter(f) for f in filas] if len(orden) > 1 else [(getter(f),) for f in filas]
+        if any(procesadores):
+            # Se procesa por columna: los valores se repiten mucho (enums, fechas)
+            columnas = list(zip(*parametros))
+            for i, proc in enumerate(procesadores):
+                if proc is not None:
+                    columnas[i] = map(_memoizar(proc), columnas[i])
+            parametros = list(zip(*columnas))
+        if not compilado.positional:
+            parametros = [dict(zip(orden, p)) for p in parametros]
+        conn.exec_driver_sql(compilado.string, parametros)
+
+    @staticmethod
+    def _default(columna) -> Any:
+        default = columna.default
+        if default is None:
+            return None
+        if default.is_scalar:
+            return default.arg
+        if default.is_callable:
+            return default.arg(None)
+        raise ValueError(f"No se puede calcular el default de {columna}: hay que pasar el valor explícito.")
+
+    # --- Atajos para respuestas ---
+
+    def agregar_respuesta_set(
+        self,
+        instancia_id: int,
+        respuestas: Iterable[RespuestaCruda],
+        created_at: Optional[datetime] = None
+    ) -> int:
+        """
+        Encola un RespuestaSet con todas sus respuestas (tabla base + tabla hija)
+        sin consultar preguntas ni opciones: los ids se asumen válidos.
+        """
+        valores_set = {"instrumento_instancia_id": instancia_id}
+        if created_at is not None:
+            valores_set["created_at"] = created_at
+        set_id = self.agregar(RespuestaSet, **valores_set)
+
+        # Camino rápido: las respuestas son la gran mayoría de las filas, así que
+        # se encolan directo en las dos tablas sin pasar por `agregar`.
+        base = Respuesta.__table__
+        tabla_mc = RespuestaMultipleChoice.__table__
+        tabla_redaccion = RespuestaRedaccion.__table__
+        cantidad = 0
+        for pregunta_id, opcion_id, texto in respuestas:
+            respuesta_id = self.reservar_id(base)
+            fila = {"id": respuesta_id, "respuesta_set_id": set_id, "pregunta_id": pregunta_id}
+            if created_at is not None:
+                fila["created_at"] = created_at
+            if opcion_id is not None:
+                fila["tipo"] = TipoPregunta.MULTIPLE_CHOICE
+                self._encolar(tabla_mc, {"id": respuesta_id, "opcion_id": opcion_id})
+                self.contadores[tabla_mc.name] += 1
+            else:
+                fila["tipo"] = TipoPregunta.REDACCION
+                self._encolar(tabla_redaccion, {"id": respuesta_id, "texto": texto or ""})
+                self.contadores[tabla_redaccion.name] += 1
+            self._encolar(base, fila)
+            cantidad += 1
+        self.contadores[base.name] += cantidad
+
+        if self._cantidad_pendiente >= self.tamanio_lote:
+            self.flush()
+        return set_id
@@ -0,0 +1,251 @@
+"""
+Importación de inscripciones desde exportaciones de SIU Guaraní.
+
+Se espera un CSV (separado por coma o punto y coma, UTF-8) con una fila por
+inscripción y estas columnas:
+
+    legajo, nombre, materia, anio, periodo, docente
+
+- legajo / nombre: identifican al alumno (el legajo se usa como username).
+- materia: nombre exacto de la materia ya cargada en el sistema.
+- anio / periodo: año lectivo y período ("1C", "2C", "anual", "primero", ...).
+- docente: username del profesor a cargo de la cursada.
+
+Las materias y los docentes tienen que existir. El resto es un upsert:
+alumnos, cuatrimestres, cursadas e inscripciones que falten se crean, y si el
+alumno ya existe con otro nombre se actualiza (una inscripción existente no se
+toca, así no se pierde `ha_respondido`). Todo se resuelve con mapas en memoria
+cargados una sola vez; las filas nuevas se insertan por lotes con
+CargadorMasivo y se confirma cada `filas_por_lote` filas.
+
+Uso (desde 'backend'):
+    python -m src.carga_masiva.siu inscripciones.csv --password-inicial <clave>
+"""
+import sys
+import os
+import csv
+import argparse
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+# --- Configuración de Path ---
+script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+backend_root = os.path.dirname(script_dir)
+if backend_root not in sys.path:
+    sys.path.insert(0, backend_root)
+
+from src.enumerados import TipoCuatrimestre
+from src.materia.models import Materia, Cuatrimestre, Cursada
+from src.persona.models import Persona, Profesor, Alumno, Inscripcion
+from src.carga_masiva.services import CargadorMasivo
+from src.encuestas.bandeja import agregar_a_bandeja
+
+COLUMNAS_SIU = ("legajo", "nombre", "materia", "anio", "periodo", "docente")
+
+# Filas procesadas por transacción: acota el tiempo que se retiene el lock de escritura
+FILAS_POR_LOTE = 2000
+
+# Errores guardados como máximo (el resto solo se cuenta)
+MAX_ERRORES = 500
+
+PERIODOS_SIU = {
+    "1c": TipoCuatrimestre.PRIMERO,
+    "1": TipoCuatrimestre.PRIMERO,
+    "primero": TipoCuatrimestre.PRIMERO,
+    "primer cuatrimestre": TipoCuatrimestre.PRIMERO,
+    "2c": TipoCuatrimestre.SEGUNDO,
+    "2": TipoCuatrimestre.SEGUNDO,
+    "segundo": TipoCuatrimestre.SEGUNDO,
+    "segundo cuatrimestre": TipoCuatrimestre.SEGUNDO,
+    "a": TipoCuatrimestre.ANUAL,
+    "anual": TipoCuatrimestre.ANUAL,
+}
+
+
+@dataclass
+class ErrorFila:
+    linea: int
+    mensaje: str
+
+
+@dataclass
+class ResultadoImportacion:
+    filas: int = 0
+    alumnos_creados: int = 0
+    alumnos_actualizados: int = 0
+    cuatrimestres_creados: int = 0
+    cursadas_creadas: int = 0
+    inscripciones_creadas: int = 0
+    inscripciones_existentes: int = 0
+    cantidad_errores: int = 0
+    errores: List[ErrorFila] = field(default_factory=list)
+
+    def agregar_error(self, linea: int, mensaje: str) -> None:
+        self.cantidad_errores += 1
+        if len(self.errores) < MAX_ERRORES:
+            self.errores.append(ErrorFila(linea=linea, mensaje=mensaje))
+
+
+def leer_csv_siu(archivo: Iterable[str]) -> Iterator[Dict[str, str]]:
+    """Lee el CSV fila por fila (sin cargarlo entero), normalizando los encabezados."""
+    lineas = iter(archivo)
+    primera = next(lineas, "")
+    delimitador = ";" if primera.count(";") > primera.count(",") else ","
+
+    def _todas():
+        yield primera
+        yield from lineas
+
+    lector = csv.DictReader(_todas(), delimiter=delimitador)
+    lector.fieldnames = [(c or "").strip().lower() for c in (lector.fieldnames or [])]
+    faltantes = [c for c in COLUMNAS_SIU if c not in lector.fieldnames]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el archivo: {', '.join(faltantes)}")
+    for fila in lector:
+        yield {k: (v or "").strip() for k, v in fila.items() if k}
+
+
+def _cargar_mapas(db: Session):
+    usuarios = dict(db.execute(select(Persona.username, Persona.id)).all())
+    alumnos = dict(db.execute(select(Alumno.id, Alumno.nombre)).all())
+    profesores = dict(db.execute(select(Profesor.username, Profesor.id)).all())
+    materias = dict(db.execute(select(Materia.nombre, Materia.id)).all())
+    cuatrimestres = {
+        (anio, periodo): cid
+        for cid, anio, periodo in db.execute(select(Cuatrimestre.id, Cuatrimestre.anio, Cuatrimestre.periodo)).all()
+    }
+    cursadas = {
+        (mid, cid, pid): id_
+        for id_, mid, cid, pid in db.execute(
+            select(Cursada.id, Cursada.materia_id, Cursada.cuatrimestre_id, Cursada.profesor_id)
+        ).all()
+    }
+    inscripciones = set(db.execute(select(Inscripcion.alumno_id, Inscripcion.cursada_id)).all())
+    return usuarios, alumnos, profesores, materias, cuatrimestres, cursadas, inscripciones
+
+
+def importar_inscripciones(
+    db: Session,
+    filas: Iterable[Dict[str, str]],
+    hashed_password_inicial: str,
+    filas_por_lote: int = FILAS_POR_LOTE,
+    progreso: Optional[Callable[[ResultadoImportacion], None]] = None
+) -> ResultadoImportacion:
+    """
+    Importa (upsert) inscripciones. Las filas inválidas se saltean y quedan en
+    `errores` con su número de línea; las válidas se confirman de a lotes, así
+    que si el proceso se corta a mitad de camino lo ya confirmado queda y se
+    puede volver a correr el mismo archivo sin duplicar nada.
+    """
+    cargador = CargadorMasivo(db)
+    resultado = ResultadoImportacion()
+    usuarios, alumnos, profesores, materias, cuatrimestres, cursadas, inscripciones = _cargar_mapas(db)
+    renombrar: Dict[int, str] = {}
+    cursadas_con_altas: Set[int] = set()
+
+    def _confirmar_lote():
+        if renombrar:
+            db.execute(update(Persona), [{"id": pid, "nombre": nombre} for pid, nombre in renombrar.items()])
+            renombrar.clear()
+        # Inscriptos nuevos en cursadas con la encuesta ya abierta: a la bandeja en el mismo commit
+        cargador.flush()
+        agregar_a_bandeja(db, cursada_ids=cursadas_con_altas)
+        cursadas_con_altas.clear()
+        cargador.confirmar()
+        if progreso:
+            progreso(resultado)
+
+    for linea, fila in enumerate(filas, start=2):  # la línea 1 es el encabezado
+        resultado.filas += 1
+        if resultado.filas % filas_por_lote == 0:
+            _confirmar_lote()
+
+        legajo = fila.get("legajo", "")
+        nombre = fila.get("nombre") or legajo
+        if not legajo:
+            resultado.agregar_error(linea, "Falta el legajo.")
+            continue
+        materia_id = materias.get(fila.get("materia", ""))
+        if materia_id is None:
+            resultado.agregar_error(linea, f"La materia '{fila.get('materia')}' no existe.")
+            continue
+        profesor_id = profesores.get(fila.get("docente", ""))
+        if profesor_id is None:
+            resultado.agregar_error(linea, f"El docente '{fila.get('docente')}' no existe.")
+            continue
+        periodo = PERIODOS_SIU.get(fila.get("periodo", "").lower())
+        try:
+            anio = int(fila.get("anio", ""))
+        except ValueError:
+            anio = None
+        if periodo is None or anio is None:
+            resultado.agregar_error(linea, f"Año/período inválido ('{fila.get('anio')}', '{fila.get('periodo')}').")
+            continue
+
+        alumno_id = usuarios.get(legajo)
+        if alumno_id is None:
+            alumno_id = cargador.agregar(
+                Alumno, nombre=nombre, username=legajo, hashed_password=hashed_password_inicial
+            )
+            usuarios[legajo] = alumno_id
+            alumnos[alumno_id] = nombre
+            resultado.alumnos_creados += 1
+        elif alumno_id not in alumnos:
+            resultado.agregar_error(linea, f"El usuario '{legajo}' existe y no es un alumno.")
+            continue
+        elif alumnos[alumno_id] != nombre:
+            renombrar[alumno_id] = nombre
+            alumnos[alumno_id] = nombre
+            resultado.alumnos_actualizados += 1
+
+        cuatri_id = cuatrimestres.get((anio, periodo))
+        if cuatri_id is None:
+            cuatri_id = cargador.agregar(Cuatrimestre, anio=anio, periodo=periodo)
+            cuatrimestres[(anio, periodo)] = cuatri_id
+            resultado.cuatrimestres_creados += 1
+
+        clave_cursada = (materia_id, cuatri_id, profesor_id)
+        cursada_id = cursadas.get(clave_cursada)
+        if cursada_id is None:
+            cursada_id = cargador.agregar(Cursada, materia_id=materia_id, cuatrimestre_id=cuatri_id, profesor_id=profesor_id)
+            cursadas[clave_cursada] = cursada_id
+            resultado.cursadas_creadas += 1
+
+        if (alumno_id, cursada_id) in inscripciones:
+            resultado.inscripciones_existentes += 1
+            continue
+        cargador.agregar(Inscripcion, alumno_id=alumno_id, cursada_id=cursada_id, ha_respondido=False)
+        inscripciones.add((alumno_id, cursada_id))
+        cursadas_con_altas.add(cursada_id)
+        resultado.inscripciones_creadas += 1
+
+    _confirmar_lote()
+    return resultado
+
+
+if __name__ == "__main__":
+    from src.database import SessionLocal
+    from src.auth.services import get_password_hash
+
+    parser = argparse.ArgumentParser(description="Importa inscripciones desde un CSV de SIU Guaraní.")
+    parser.add_argument("archivo")
+    parser.add_argument("--password-inicial", required=True, help="Contraseña asignada a los alumnos nuevos")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        with open(args.archivo, encoding="utf-8-sig", newline="") as f:
+            resultado = importar_inscripciones(db, leer_csv_siu(f), get_password_hash(args.password_inicial))
+        print(f"✅ {resultado.filas} filas: {resultado.alumnos_creados} alumnos nuevos "
+              f"({resultado.alumnos_actualizados} actualizados), {resultado.cursadas_creadas} cursadas, "
+              f"{resultado.inscripciones_creadas} inscripciones nuevas ({resultado.inscripciones_existentes} ya existían).")
+        for error in resultado.errores:
+            print(f"   ⚠️ Línea {error.linea}: {error.mensaje}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
@@ -1,20 +1,301 @@
+"""
+Engines y sesiones.
+
+- `engine` / `SessionLocal`: escrituras y todo lo que no declare otra cosa.
+- `engine_lectura` / `SessionLectura`: un pool aparte para requests de solo
+  lectura (DB_URL_LECTURA si está definida, ej: una réplica de PostgreSQL;
+  si no, la misma base), así las lecturas pesadas no esperan conexiones
+  detrás de los envíos.
+- `replica`: con SQLite y DB_REPLICA_ARCHIVO, una copia local de la base que
+  se refresca con la API de backup; `get_db_lectura` la usa mientras no tenga
+  más de DB_REPLICA_MAX_ATRASO_SEGUNDOS de atraso (si no, cae al pool de
+  lectura sobre la base principal).
+
+Las bases SQLite en archivo se abren en modo WAL: los lectores (requests de
+lectura, el backup de la réplica) no bloquean a los envíos ni al revés.
+
+Las sesiones no piden conexión hasta la primera consulta: un endpoint que
+recibe `get_db` pero termina antes (ej: un 404 por validación) no toma nada
+del pool. El PRAGMA de FKs de SQLite se ejecuta una vez por conexión física
+(evento "connect"), no en cada request.
+
+El pool registra cuánto espera cada request para obtener una conexión y
+cuánto la retiene (ver src/system/metrics.py: ra_db_pool_*).
+"""
+import glob
 import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from src.system import metrics
 
 load_dotenv()
 
-engine = create_engine(os.getenv("DB_URL"), connect_args={"check_same_thread": False})
+DB_URL = os.getenv("DB_URL")
+DB_URL_LECTURA = os.getenv("DB_URL_LECTURA") or DB_URL
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+POOL_MAX_OVERFLOW = int(os.getenv("DB_POOL_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+DB_REPLICA_ARCHIVO = os.getenv("DB_REPLICA_ARCHIVO")
+REPLICA_MAX_ATRASO = float(os.getenv("DB_REPLICA_MAX_ATRASO_SEGUNDOS", "60"))
+# La copia se hace de a tantas páginas, con una pausa entre pasos
+REPLICA_PAGINAS_POR_PASO = int(os.getenv("DB_REPLICA_PAGINAS_POR_PASO", "1024"))
+REPLICA_PAUSA_SEGUNDOS = float(os.getenv("DB_REPLICA_PAUSA_SEGUNDOS", "0.005"))
+# Si la base cambia entre pasos el backup vuelve a empezar; después de tantos
+# reinicios se copia en un solo paso (en WAL no bloquea a los que escriben)
+REPLICA_MAX_REINICIOS = 3
+
+
+class PoolMedido(QueuePool):
+    """QueuePool que informa a las métricas el tiempo de espera de cada checkout."""
+
+    _nombre = "escritura"
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.registrar_espera_pool(self._nombre, time.perf_counter() - inicio)
+
+
+def _es_sqlite_en_memoria(url: str) -> bool:
+    return url.startswith("sqlite") and (":memory:" in url or url.rstrip("/") in ("sqlite:", "sqlite://"))
+
+
+def _crear_engine(url: str, nombre: str, solo_lectura: bool = False, creator=None) -> Engine:
+    es_sqlite = url.startswith("sqlite")
+    en_memoria = _es_sqlite_en_memoria(url)
+    opciones = {"connect_args": {"check_same_thread": False}} if es_sqlite else {}
+    if creator is not None:
+        opciones["creator"] = creator
+    if not en_memoria:
+        opciones.update(
+            poolclass=type(f"PoolMedido_{nombre}", (PoolMedido,), {"_nombre": nombre}),
+            pool_size=POOL_SIZE,
+            max_overflow=POOL_MAX_OVERFLOW,
+            pool_timeout=POOL_TIMEOUT,
+        )
+    nuevo = create_engine(url, **opciones)
+
+    if es_sqlite:
+        @event.listens_for(nuevo, "connect")
+        def _configurar_conexion(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            # Para usar restricciones de FK en SQLite hay que habilitarlas en cada conexión
+            cursor.execute("PRAGMA foreign_keys = ON")
+            if solo_lectura:
+                cursor.execute("PRAGMA query_only = ON")
+            elif not en_memoria:
+                # Queda guardado en el archivo: basta con que lo pida el engine de escritura
+                cursor.execute("PRAGMA journal_mode = WAL")
+            cursor.close()
+
+    @event.listens_for(nuevo, "checkout")
+    def _marcar_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["_tomada_en"] = time.perf_counter()
+
+    @event.listens_for(nuevo, "checkin")
+    def _marcar_checkin(dbapi_connection, connection_record):
+        tomada_en = connection_record.info.pop("_tomada_en", None)
+        if tomada_en is not None:
+            metrics.registrar_conexion_retenida(nombre, time.perf_counter() - tomada_en)
+
+    metrics.registrar_engine(nombre, nuevo)
+    return nuevo
+
+
+class SesionLectura(Session):
+    """Sesión de solo lectura: nunca hace flush y falla si se le agregan cambios."""
+
+    def flush(self, objects=None):
+        if self.new or self.dirty or self.deleted:
+            raise RuntimeError("Sesión de solo lectura: usar get_db para modificar datos.")
+
+
+class ReplicaSQLite:
+    """
+    Copia local de la base SQLite para las lecturas pesadas (estadísticas al
+    cierre del cuatrimestre), así no toman locks de la base que reciben los
+    envíos. Cada refresco copia la base con `sqlite3.Connection.backup` a un
+    archivo nuevo, de a REPLICA_PAGINAS_POR_PASO páginas con una pausa entre
+    pasos, y después lo publica como la copia vigente.
+
+    Hay un solo engine: las conexiones se abren sobre la copia vigente y, al
+    sacarlas del pool, las que apuntan a una copia anterior se descartan y se
+    reabren. Las lecturas en curso terminan sobre la copia con la que
+    empezaron y nunca se escribe un archivo que alguien está leyendo.
+    """
+
+    def __init__(self, url_origen: str, archivo: str, max_atraso: float = REPLICA_MAX_ATRASO):
+        self.ruta_origen = make_url(url_origen).database
+        self.archivo = archivo
+        self.max_atraso = max_atraso
+        self.intervalo = max_atraso / 2
+        self._ruta_actual: Optional[str] = None
+        self._refrescada_en: Optional[float] = None
+        self._generacion = 0
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+        self._engine = _crear_engine(f"sqlite:///{archivo}", "replica", solo_lectura=True, creator=self._conectar)
+        self._sesiones = sessionmaker(
+            class_=SesionLectura, autocommit=False, autoflush=False, expire_on_commit=False, bind=self._engine
+        )
+        metrics.instrumentar_engine(self._engine, self._sesiones)
+        event.listen(self._engine, "connect", self._anotar_ruta)
+        event.listen(self._engine, "checkout", self._descartar_si_vieja)
+
+    def _conectar(self) -> sqlite3.Connection:
+        with self._lock:
+            ruta = self._ruta_actual
+        return sqlite3.connect(ruta, check_same_thread=False)
+
+    @staticmethod
+    def _anotar_ruta(dbapi_connection, connection_record):
+        # PRAGMA database_list: (seq, nombre, archivo) de la base "main"
+        connection_record.info["ruta"] = dbapi_connection.execute("PRAGMA database_list").fetchone()[2]
+
+    def _descartar_si_vieja(self, dbapi_connection, connection_record, connection_proxy):
+        if os.path.abspath(connection_record.info.get("ruta") or "") != os.path.abspath(self._ruta_actual or ""):
+            # El pool la invalida y abre otra (con _conectar, sobre la copia vigente)
+            raise exc.DisconnectionError("La réplica se refrescó")
+
+    def _ruta_generacion(self, generacion: int) -> str:
+        base, extension = os.path.splitext(self.archivo)
+        return f"{base}-{generacion}{extension}"
+
+    def atraso(self) -> Optional[float]:
+        """Segundos desde la copia vigente (None si todavía no hay)."""
+        refrescada_en = self._refrescada_en
+        return None if refrescada_en is None else time.monotonic() - refrescada_en
+
+    def _copiar(self, origen: sqlite3.Connection, copia: sqlite3.Connection) -> None:
+        """
+        Backup por pasos: entre paso y paso el lock de lectura se suelta. Si
+        la base se modifica en el medio, SQLite reinicia la copia; con mucha
+        escritura podría no terminar nunca, así que después de
+        REPLICA_MAX_REINICIOS se copia en un solo paso (una transacción de
+        lectura, que en WAL no frena a los que escriben).
+        """
+        estado = {"restantes": None, "reinicios": 0}
+
+        class _Reiniciada(Exception):
+            pass
+
+        def progreso(status, restantes, total):
+            if estado["restantes"] is not None and restantes > estado["restantes"]:
+                estado["reinicios"] += 1
+                if estado["reinicios"] > REPLICA_MAX_REINICIOS:
+                    raise _Reiniciada()
+            estado["restantes"] = restantes
+            # `sleep` de backup() solo espera si la base está ocupada: la pausa entre pasos va acá
+            if restantes:
+                time.sleep(REPLICA_PAUSA_SEGUNDOS)
+
+        try:
+            origen.backup(copia, pages=REPLICA_PAGINAS_POR_PASO, progress=progreso, sleep=REPLICA_PAUSA_SEGUNDOS)
+        except _Reiniciada:
+            origen.backup(copia)
+
+    def refrescar(self) -> None:
+        self._generacion += 1
+        destino = self._ruta_generacion(self._generacion)
+        inicio = time.monotonic()
+        origen = sqlite3.connect(self.ruta_origen)
+        copia = sqlite3.connect(destino)
+        try:
+            self._copiar(origen, copia)
+            # La copia no necesita WAL (nadie escribe) y así es un solo archivo, sin -wal/-shm
+            copia.execute("PRAGMA journal_mode = DELETE")
+        finally:
+            copia.close()
+            origen.close()
+
+        with self._lock:
+            ruta_anterior = self._ruta_actual
+            self._ruta_actual, self._refrescada_en = destino, inicio
+        if ruta_anterior is not None:
+            # Las lecturas en curso siguen con el archivo abierto; las conexiones
+            # libres del pool se reabren sobre la copia nueva en el próximo checkout
+            try:
+                os.remove(ruta_anterior)
+            except OSError:
+                pass
+
+    def sesion(self) -> Optional[Session]:
+        """Sesión sobre la copia, o None si no hay o está más atrasada que el límite."""
+        atraso = self.atraso()
+        if atraso is None or atraso > self.max_atraso:
+            return None
+        return self._sesiones()
+
+    def _bucle(self) -> None:
+        while not self._detener.wait(self.intervalo):
+            try:
+                self.refrescar()
+            except Exception as e:
+                print(f"Error al refrescar la réplica de lectura: {e}")
+
+    def iniciar(self) -> None:
+        for viejo in glob.glob(self._ruta_generacion("*")):
+            os.remove(viejo)
+        self.refrescar()
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="replica-lectura", daemon=True)
+        self._hilo.start()
+
+    def detener(self) -> None:
+        self._detener.set()
+        if self._hilo:
+            self._hilo.join(timeout=5)
+
+
+engine = _crear_engine(DB_URL, "escritura")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+engine_lectura = _crear_engine(DB_URL_LECTURA, "lectura", solo_lectura=True)
+SessionLectura = sessionmaker(
+    class_=SesionLectura, autocommit=False, autoflush=False, expire_on_commit=False, bind=engine_lectura
+)
+
+replica: Optional[ReplicaSQLite] = None
+if DB_REPLICA_ARCHIVO and DB_URL.startswith("sqlite") and not _es_sqlite_en_memoria(DB_URL):
+    replica = ReplicaSQLite(DB_URL, DB_REPLICA_ARCHIVO)
+    metrics.registrar_indicador(
+        "ra_db_replica_lag_seconds", "Segundos desde el último refresco de la réplica de lectura.",
+        lambda: float("nan") if (atraso := replica.atraso()) is None else atraso
+    )
+
+
 # Dependency
 def get_db():
     db = SessionLocal()
-    # Para usar restricciones de FK en SQLite, debemos habilitar la siguiente opción:
-    db.execute(text("PRAGMA foreign_keys = ON"))
     try:
         yield db
     finally:
         db.close()
 
+
+def get_db_lectura():
+    """
+    Sesión para endpoints que solo leen (estadísticas, listados): la réplica si
+    está al día, si no el pool de lectura. Los datos pueden tener hasta
+    DB_REPLICA_MAX_ATRASO_SEGUNDOS de atraso: no usar para leer lo recién escrito.
+    """
+    db = (replica.sesion() if replica else None) or SessionLectura()
+    try:
+        yield db
+    finally:
+        db.close()
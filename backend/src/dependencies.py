@@ -1,3 +1,7 @@
+import hmac
+import os
+from typing import Optional
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
@@ -18,6 +22,10 @@ from src.auth.services import SECRET_KEY, ALGORITHM
 from src.exceptions import NotAuthenticated, PermissionDenied
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
+oauth2_scheme_opcional = OAuth2PasswordBearer(tokenUrl="/auth/token", auto_error=False)
+
+# Token fijo para que Prometheus (u otro scraper) lea /system/metrics sin usuario
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
 
 async def get_current_user(
         token: str = Depends(oauth2_scheme),
@@ -102,4 +110,22 @@ async def get_current_admin_departamento_o_secretaria(
             detail="Se requieren permisos de Administrador de Departamento o Secretaría"
         )
     # Devolvemos el usuario, ya que ambos roles son válidos
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+# --- Guardia para /system/metrics ---
+async def get_acceso_metricas(
+        token: Optional[str] = Depends(oauth2_scheme_opcional),
+        db: Session = Depends(get_db)
+) -> None:
+    """
+    Las métricas listan todas las rutas con sus consultas y latencias: las
+    lee el scraper con METRICS_TOKEN como Bearer, o un Admin de Secretaría.
+    """
+    if not token:
+        raise NotAuthenticated(detail="no se pueden validar las credenciales")
+    if METRICS_TOKEN and hmac.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+        return
+    current_user = await get_current_user(token, db)
+    if current_user.tipo != TipoPersona.ADMIN_SECRETARIA:
+        raise PermissionDenied(detail="No tienes permisos de Administrador de Secretaría")
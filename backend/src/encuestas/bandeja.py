@@ -0,0 +1,148 @@
+"""
+Bandeja de encuestas activas de cada alumno.
+
+La página de inicio del alumno pide sus encuestas activas en cada visita, y
+en la semana de encuestas son miles de alumnos a la vez. En lugar de armar la
+lista con joins (inscripción → instancia → plantilla, cursada, materia,
+profesor) en cada request, `bandeja_alumno` guarda una fila por (alumno,
+instancia activa) con lo que muestra la página, y la lectura es un SELECT por
+alumno_id.
+
+Se mantiene en la misma transacción que el cambio que la afecta:
+  - activar una instancia: `agregar_a_bandeja(instancia_id=...)`
+  - cerrarla: `quitar_de_bandeja`
+  - responder: `marcar_respondida`
+  - inscripciones nuevas (importación SIU): `agregar_a_bandeja(cursada_ids=...)`
+Al arrancar, la app solo la arma si está vacía (tabla recién creada o base
+anterior a la bandeja): reconstruirla entera es una transacción de escritura
+del tamaño de las inscripciones y no tiene que repetirse en cada reinicio. Lo
+que se carga por fuera de los servicios (seeds, scripts) se pone al día con
+`reconstruir_bandeja`, o a mano con:
+
+    python -m src.encuestas.bandeja
+
+Los nombres quedan como estaban al activar: renombrar una materia o un
+profesor con la encuesta abierta no cambia la bandeja hasta que se
+reconstruye.
+"""
+from typing import Iterable, List, Optional
+
+from sqlalchemy import select, insert, update, delete, exists
+from sqlalchemy.orm import Session
+
+from src.encuestas.models import BandejaAlumno, Encuesta, EncuestaInstancia
+from src.enumerados import EstadoInstancia
+from src.materia.models import Cursada, Materia
+from src.persona.models import Inscripcion, Persona
+
+_COLUMNAS = (
+    "alumno_id", "encuesta_instancia_id", "plantilla_id", "plantilla_titulo", "plantilla_descripcion",
+    "materia_nombre", "profesor_nombre", "fecha_fin", "ha_respondido",
+)
+
+
+def _filas_activas(*filtros):
+    """SELECT con las filas de la bandeja de las instancias activas que cumplen `filtros`."""
+    return (
+        select(
+            Inscripcion.alumno_id,
+            EncuestaInstancia.id,
+            EncuestaInstancia.plantilla_id,
+            Encuesta.titulo,
+            Encuesta.descripcion,
+            Materia.nombre,
+            Persona.nombre,
+            EncuestaInstancia.fecha_fin,
+            Inscripcion.ha_respondido,
+        )
+        .select_from(EncuestaInstancia)
+        .join(Inscripcion, Inscripcion.cursada_id == EncuestaInstancia.cursada_id)
+        .join(Encuesta, Encuesta.id == EncuestaInstancia.plantilla_id)
+        .join(Cursada, Cursada.id == EncuestaInstancia.cursada_id)
+        .outerjoin(Materia, Materia.id == Cursada.materia_id)
+        .outerjoin(Persona, Persona.id == Cursada.profesor_id)
+        .where(EncuestaInstancia.estado == EstadoInstancia.ACTIVA, *filtros)
+    )
+
+
+def agregar_a_bandeja(
+    db: Session,
+    instancia_id: Optional[int] = None,
+    cursada_ids: Optional[Iterable[int]] = None
+) -> int:
+    """
+    Agrega las filas que falten de las instancias activas (una instancia, las
+    de ciertas cursadas o todas). Idempotente. No hace commit.
+    """
+    filtros = [
+        ~exists().where(
+            BandejaAlumno.alumno_id == Inscripcion.alumno_id,
+            BandejaAlumno.encuesta_instancia_id == EncuestaInstancia.id,
+        )
+    ]
+    if instancia_id is not None:
+        filtros.append(EncuestaInstancia.id == instancia_id)
+    if cursada_ids is not None:
+        cursada_ids = list(cursada_ids)
+        if not cursada_ids:
+            return 0
+        filtros.append(EncuestaInstancia.cursada_id.in_(cursada_ids))
+    return db.execute(insert(BandejaAlumno).from_select(_COLUMNAS, _filas_activas(*filtros))).rowcount
+
+
+def quitar_de_bandeja(db: Session, instancia_id: int) -> int:
+    """Saca la instancia de la bandeja de todos sus alumnos. No hace commit."""
+    return db.execute(
+        delete(BandejaAlumno).where(BandejaAlumno.encuesta_instancia_id == instancia_id)
+    ).rowcount
+
+
+def marcar_respondida(db: Session, instancia_id: int, alumno_id: int) -> None:
+    """No hace commit: va en la transacción del envío."""
+    db.execute(
+        update(BandejaAlumno)
+        .where(BandejaAlumno.alumno_id == alumno_id, BandejaAlumno.encuesta_instancia_id == instancia_id)
+        .values(ha_respondido=True)
+    )
+
+
+def reconstruir_bandeja(db: Session) -> int:
+    """
+    Vuelve a armar toda la bandeja desde las instancias activas. Acepta una
+    Session o una Connection. No hace commit.
+    """
+    db.execute(delete(BandejaAlumno))
+    return db.execute(insert(BandejaAlumno).from_select(_COLUMNAS, _filas_activas())).rowcount
+
+
+def preparar_bandeja(conn) -> int:
+    """Arranque de la app: reconstruye solo si la bandeja está vacía."""
+    if conn.execute(select(BandejaAlumno.alumno_id).limit(1)).first() is not None:
+        return 0
+    return reconstruir_bandeja(conn)
+
+
+def obtener_bandeja(db: Session, alumno_id: int) -> List[BandejaAlumno]:
+    return db.scalars(
+        select(BandejaAlumno)
+        .where(BandejaAlumno.alumno_id == alumno_id)
+        .order_by(BandejaAlumno.encuesta_instancia_id)
+    ).all()
+
+
+if __name__ == "__main__":
+    from src.database import SessionLocal, engine
+    # Las relaciones entre modelos se resuelven por nombre: hay que importarlos todos
+    from src.seccion import models as _seccion_models  # noqa: F401
+    from src.pregunta import models as _pregunta_models  # noqa: F401
+    from src.respuesta import models as _respuesta_models  # noqa: F401
+    from src.instrumento import models as _instrumento_models  # noqa: F401
+
+    BandejaAlumno.__table__.create(engine, checkfirst=True)
+    db = SessionLocal()
+    try:
+        filas = reconstruir_bandeja(db)
+        db.commit()
+        print(f"✅ Bandeja reconstruida: {filas} filas.")
+    finally:
+        db.close()
@@ -1,7 +1,7 @@
 from __future__ import annotations
 from typing import List, TYPE_CHECKING, Optional
 from datetime import datetime
-from sqlalchemy import Integer, String, DateTime, ForeignKey
+from sqlalchemy import Integer, String, DateTime, ForeignKey, Boolean
 from sqlalchemy import Enum as SQLEnum
 from sqlalchemy.sql import func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -51,4 +51,25 @@ class EncuestaInstancia(InstrumentoInstancia):
     actividad_curricular_instancia: Mapped["ActividadCurricularInstancia"] = relationship(
         back_populates="encuesta_instancia", uselist=False,
         foreign_keys="[ActividadCurricularInstancia.encuesta_instancia_id]"
-    )
\ No newline at end of file
+    )
+
+
+class BandejaAlumno(ModeloBase):
+    """
+    Encuestas activas de cada alumno, ya armadas para la página de inicio
+    (ver src/encuestas/bandeja.py). Se mantiene al activar y cerrar instancias
+    y al responder; no tiene relaciones a propósito: se lee por alumno_id.
+    """
+    __tablename__ = "bandeja_alumno"
+
+    alumno_id: Mapped[int] = mapped_column(ForeignKey("alumno.id", ondelete="CASCADE"), primary_key=True)
+    encuesta_instancia_id: Mapped[int] = mapped_column(
+        ForeignKey("encuesta_instancia.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    plantilla_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    plantilla_titulo: Mapped[str] = mapped_column(String, nullable=False)
+    plantilla_descripcion: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    materia_nombre: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    profesor_nombre: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    fecha_fin: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    ha_respondido: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status 
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 from src.database import get_db
@@ -8,6 +8,10 @@ from src.instrumento import services as instrumento_services
 from src.encuestas.schemas import GenerarSinteticoResponse, GenerarSinteticoRequest
 from typing import List
 from src.encuestas.schemas import CerrarEncuestaBody
+from src.persona.models import Persona
+from src.system import schemas as system_schemas
+from src.system.jobs import encolar_trabajo
+from src.system.cache import cachear, TAG_CURSADAS, TAG_ENCUESTAS
 
 # --- CAMBIO 1: Importamos AMBOS guardias ---
 from src.dependencies import (
@@ -108,11 +112,88 @@ def generar_informe_sintetico_departamental(
 
 
 
+@router_gestion.post(
+    "/generar-sintetico/async",
+    response_model=system_schemas.Trabajo,
+    status_code=status.HTTP_202_ACCEPTED
+)
+def generar_informe_sintetico_departamental_async(
+    request_data: GenerarSinteticoRequest,
+    db: Session = Depends(get_db),
+    current_user: Persona = Depends(get_current_admin_departamento_o_secretaria)
+):
+    """
+    Igual que /generar-sintetico pero corre como trabajo en segundo plano.
+    El estado se consulta en GET /system/jobs/{id}.
+    """
+    fecha_fin = request_data.fecha_fin_informe.isoformat() if request_data.fecha_fin_informe else None
+    return encolar_trabajo(
+        db,
+        "generar_informe_sintetico",
+        {"departamento_id": request_data.departamento_id, "fecha_fin_informe": fecha_fin},
+        creado_por_id=current_user.id,
+        max_intentos=2
+    )
+
+
+@router_gestion.post(
+    "/recalcular-distribuciones/async",
+    response_model=system_schemas.Trabajo,
+    status_code=status.HTTP_202_ACCEPTED
+)
+def recalcular_distribuciones_async(
+    db: Session = Depends(get_db),
+    current_user: Persona = Depends(get_current_admin_secretaria)
+):
+    """
+    Recalcula en segundo plano los puntajes por pregunta de todas las encuestas
+    cerradas (los percentiles por dpto./facultad). Al cerrar una instancia se
+    actualiza sola; esto es para datos cargados por fuera (ej: importaciones).
+    """
+    return encolar_trabajo(db, "recalcular_distribuciones", creado_por_id=current_user.id)
+
+
+@router_gestion.post(
+    "/procesar-necesidades/async",
+    response_model=system_schemas.Trabajo,
+    status_code=status.HTTP_202_ACCEPTED
+)
+def procesar_necesidades_async(
+    db: Session = Depends(get_db),
+    current_user: Persona = Depends(get_current_admin_secretaria)
+):
+    """
+    Reprocesa en segundo plano las necesidades de todos los informes de
+    actividad curricular (al enviar cada informe se procesa solo).
+    """
+    return encolar_trabajo(db, "procesar_necesidades", creado_por_id=current_user.id)
+
+
+@router_gestion.post(
+    "/compactar-respuestas/async",
+    response_model=system_schemas.Trabajo,
+    status_code=status.HTTP_202_ACCEPTED
+)
+def compactar_respuestas_async(
+    conservar_previos: int = Query(0, ge=0, description="Versiones anteriores a la última que se conservan"),
+    db: Session = Depends(get_db),
+    current_user: Persona = Depends(get_current_admin_secretaria)
+):
+    """
+    Borra en segundo plano las versiones viejas de los informes (RespuestaSet
+    reemplazados por un envío posterior) y recalcula los punteros al último.
+    """
+    return encolar_trabajo(
+        db, "compactar_respuesta_sets", {"conservar_previos": conservar_previos}, creado_por_id=current_user.id
+    )
+
+
 @router_gestion.get(
     "/cursadas-disponibles", 
     response_model=List[schemas.CursadaAdminList],
     dependencies=[Depends(get_current_admin_secretaria)] 
 )
+@cachear(List[schemas.CursadaAdminList], alcance="global", tags=(TAG_CURSADAS, TAG_ENCUESTAS))
 def get_cursadas_para_activar(db: Session = Depends(get_db)):
     return services.listar_cursadas_sin_encuesta(db)
 
@@ -129,5 +210,8 @@ def get_encuestas_activas_admin(db: Session = Depends(get_db)):
     response_model=List[schemas.DepartamentoSimple],
     dependencies=[Depends(get_current_admin_secretaria)] 
 )
+# Sin tag: los departamentos solo se cargan con los seeds, no hay servicio que
+# los modifique; un cambio por fuera de la API se ve cuando vence el TTL
+@cachear(List[schemas.DepartamentoSimple], alcance="global")
 def get_lista_departamentos(db: Session = Depends(get_db)):
     return services.listar_todos_departamentos(db)
\ No newline at end of file
@@ -3,6 +3,7 @@ from typing import List, Optional
 from pydantic import BaseModel, Field
 
 from src.seccion.schemas import Seccion
+from src.necesidades.schemas import TemaNecesidad
 
 from src.enumerados import EstadoInstancia,TipoPregunta,TipoInstrumento
 
@@ -84,6 +85,7 @@ class ResultadoOpcion(BaseModel):
     opcion_id: int
     opcion_texto: str
     cantidad: int 
+    porcentaje: Optional[float] = None  # sobre el total de respuestas de la pregunta
 
 class RespuestaTextoItem(BaseModel):
     texto: str
@@ -94,6 +96,21 @@ class ResultadoPregunta(BaseModel):
     pregunta_tipo: TipoPregunta 
     resultados_opciones: Optional[List[ResultadoOpcion]] = None
     respuestas_texto: Optional[List[RespuestaTextoItem]] = None
+    # Total de comentarios de una pregunta abierta; con `max_comentarios`
+    # respuestas_texto trae solo los primeros y el resto se pide paginado.
+    cantidad_comentarios: Optional[int] = None
+
+    # Estadísticas sobre las opciones valoradas "(4)…(1)" (ver src/estadisticas).
+    # Quedan en None si la pregunta no tiene opciones valoradas o nadie las eligió.
+    cantidad_respuestas: Optional[int] = None
+    cantidad_valoradas: Optional[int] = None
+    promedio: Optional[float] = None
+    desvio_estandar: Optional[float] = None
+    mediana_opcion_id: Optional[int] = None
+    mediana_opcion_texto: Optional[str] = None
+    porcentaje_top2: Optional[float] = None  # % de respuestas en los dos valores más altos
+    intervalo_confianza_inferior: Optional[float] = None  # IC 95% del promedio
+    intervalo_confianza_superior: Optional[float] = None
 
     model_config = {"from_attributes": True} 
 
@@ -111,9 +128,19 @@ class ResultadoCursada(BaseModel):
     resultados_por_seccion: List[ResultadoSeccion]  
     
     informe_curricular_instancia_id: Optional[int] = None 
+    encuesta_instancia_id: Optional[int] = None
     fecha_cierre: Optional[datetime] = None
     model_config = {"from_attributes": True}
 
+
+class ComentariosPagina(BaseModel):
+    """Página de comentarios de una pregunta abierta de una encuesta cerrada."""
+    pregunta_id: int
+    total: int
+    offset: int
+    limit: int
+    comentarios: List[RespuestaTextoItem]
+
 class InformeSinteticoResultado(BaseModel):
     """Schema para los resultados agregados de un Informe Sintético."""
     informe_id: int
@@ -181,6 +208,9 @@ class DashboardDepartamentoStats(BaseModel):
     
     # Listado: Últimas necesidades detectadas (Sección 1)
     necesidades_recientes: List[str]
+    # Temas más mencionados en las necesidades del último año con datos
+    temas_necesidades: List[TemaNecesidad] = []
+    anio_temas_necesidades: Optional[int] = None
 
 class InformeHistoricoResponse(BaseModel):
     instancia_id: int
@@ -12,6 +12,11 @@ from src.pregunta.models import Pregunta, PreguntaMultipleChoice
 from src.enumerados import EstadoInstancia, TipoPregunta,EstadoInstrumento, EstadoInforme, TipoInstrumento
 from src.respuesta.models import Respuesta, RespuestaMultipleChoice, RespuestaRedaccion, RespuestaSet
 from src.instrumento import models as instrumento_models
+from src.estadisticas.services import (
+    invalidar_cache_distribuciones, calcular_estadisticas, actualizar_distribuciones
+)
+from src.system.cache import invalidar, TAG_PLANTILLAS, TAG_ENCUESTAS
+from src.encuestas import bandeja
 from src.materia.models import Departamento, Sede
 from datetime import datetime
 from typing import Optional
@@ -28,6 +33,7 @@ def crear_plantilla_encuesta(
     
     db.add(db_plantilla)
     db.commit()
+    invalidar(TAG_PLANTILLAS)
     db.refresh(db_plantilla)
     
     return db_plantilla
@@ -58,6 +64,7 @@ def modificar_plantilla(
             update(models.Encuesta).where(models.Encuesta.id == plantilla_id).values(**update_data)
         )
         db.commit()
+        invalidar(TAG_PLANTILLAS)
         db.refresh(db_plantilla)
     return db_plantilla
 
@@ -66,6 +73,7 @@ def actualizar_estado_plantilla(db: Session, plantilla_id: int, nuevo_estado: Es
     plantilla_db.estado = nuevo_estado
     db.add(plantilla_db)
     db.commit()
+    invalidar(TAG_PLANTILLAS)
     db.refresh(plantilla_db)
     return plantilla_db
 
@@ -73,6 +81,7 @@ def eliminar_plantilla(db: Session, plantilla_id: int) -> models.Encuesta:
     db_plantilla = obtener_plantilla_por_id(db, plantilla_id)
     db.delete(db_plantilla)
     db.commit()
+    invalidar(TAG_PLANTILLAS)
     return db_plantilla
 
 
@@ -100,51 +109,37 @@ def activar_encuesta_para_cursada(db: Session, data: schemas.EncuestaInstanciaCr
     )
     db.add(nueva_instancia)
     try:
+        db.flush()
+        if nueva_instancia.estado == EstadoInstancia.ACTIVA:
+            bandeja.agregar_a_bandeja(db, instancia_id=nueva_instancia.id)
         db.commit()
         db.refresh(nueva_instancia)
     except Exception as e:
         db.rollback()
         print(f"ERROR en commit al activar instancia: {e}")
         raise BadRequest(detail=f"Error al guardar la instancia en la base de datos: {e}")
+    invalidar(TAG_ENCUESTAS)
 
     return nueva_instancia
 
 
 def obtener_instancias_activas_alumno(db: Session, alumno_id: int) -> List[Dict[str, Any]]:
-    now = datetime.now() 
-    
-    stmt = (
-        select(models.EncuestaInstancia, Inscripcion.ha_respondido)
-        .join(Inscripcion,models.EncuestaInstancia.cursada_id == Inscripcion.cursada_id) 
-        .where(
-            Inscripcion.alumno_id == alumno_id,
-            models.EncuestaInstancia.estado == models.EstadoInstancia.ACTIVA,
-        )
-        .options(
-            joinedload(models.EncuestaInstancia.plantilla),
-            joinedload(models.EncuestaInstancia.cursada) 
-            .joinedload(Cursada.materia),
-            joinedload(models.EncuestaInstancia.cursada)
-            .joinedload(Cursada.profesor)
-        )
-        .distinct() 
-    )
-
-    results = db.execute(stmt).all()
-
-    response_list = []
-    for instancia, ha_respondido_flag in results:
-        plantilla_data = schemas.PlantillaInfo.model_validate(instancia.plantilla).model_dump()
-        response_list.append({
-            "instancia_id": instancia.id,
-            "plantilla": plantilla_data, 
-            "materia_nombre": instancia.cursada.materia.nombre if instancia.cursada and instancia.cursada.materia else None,
-            "profesor_nombre": instancia.cursada.profesor.nombre if instancia.cursada and instancia.cursada.profesor else None,
-            "fecha_fin": instancia.fecha_fin,
-            "ha_respondido": ha_respondido_flag 
-        })
-        
-    return response_list
+    """Encuestas activas del alumno, leídas de su bandeja (ver src/encuestas/bandeja.py)."""
+    return [
+        {
+            "instancia_id": fila.encuesta_instancia_id,
+            "plantilla": {
+                "id": fila.plantilla_id,
+                "titulo": fila.plantilla_titulo,
+                "descripcion": fila.plantilla_descripcion,
+            },
+            "materia_nombre": fila.materia_nombre,
+            "profesor_nombre": fila.profesor_nombre,
+            "fecha_fin": fila.fecha_fin,
+            "ha_respondido": fila.ha_respondido,
+        }
+        for fila in bandeja.obtener_bandeja(db, alumno_id)
+    ]
 
 def obtener_instancias_activas_profesor(db: Session, profesor_id: int) -> List[Dict[str, Any]]:
  
@@ -331,13 +326,94 @@ def obtener_historial_alumno_stats(db: Session, alumno_id: int):
 
 #PROFESOR
 
+# Comentarios por página en el listado paginado de una pregunta abierta
+LIMITE_COMENTARIOS_PAGINA = 50
+
+
+def _primeros_comentarios(
+    db: Session,
+    instancia_id: int,
+    max_comentarios: int
+) -> Dict[int, tuple]:
+    """
+    {pregunta_id: (total, [primeros textos])} de las preguntas abiertas de una
+    instancia, en una consulta: la ventana numera los textos de cada pregunta
+    y solo salen los primeros `max_comentarios` (el total viaja en cada fila).
+    """
+    orden = func.row_number().over(partition_by=Respuesta.pregunta_id, order_by=Respuesta.id).label("orden")
+    total = func.count().over(partition_by=Respuesta.pregunta_id).label("total")
+    numerados = (
+        select(Respuesta.pregunta_id, RespuestaRedaccion.texto, orden, total)
+        .select_from(RespuestaRedaccion)
+        .join(RespuestaSet, Respuesta.respuesta_set_id == RespuestaSet.id)
+        .where(RespuestaSet.instrumento_instancia_id == instancia_id)
+        .subquery()
+    )
+    comentarios: Dict[int, tuple] = {}
+    filas = db.execute(
+        select(numerados.c.pregunta_id, numerados.c.texto, numerados.c.total)
+        .where(numerados.c.orden <= max(max_comentarios, 1))
+        .order_by(numerados.c.pregunta_id, numerados.c.orden)
+    ).all()
+    for pregunta_id, texto, cantidad in filas:
+        _, textos = comentarios.setdefault(pregunta_id, (cantidad, []))
+        if len(textos) < max_comentarios:
+            textos.append(schemas.RespuestaTextoItem(texto=texto))
+    return comentarios
+
+
+def listar_comentarios_pregunta(
+    db: Session,
+    instancia_id: int,
+    pregunta_id: int,
+    offset: int = 0,
+    limit: int = LIMITE_COMENTARIOS_PAGINA,
+    profesor_id: Optional[int] = None,
+    departamento_id: Optional[int] = None
+) -> schemas.ComentariosPagina:
+    """
+    Comentarios de una pregunta abierta de una encuesta cerrada, por página.
+    Valida que la cursada sea del profesor o que la materia sea del departamento.
+    """
+    instancia = db.get(models.EncuestaInstancia, instancia_id)
+    if not instancia or instancia.estado != EstadoInstancia.CERRADA:
+        raise NotFound(detail=f"No hay resultados para la instancia {instancia_id}.")
+    cursada = db.get(Cursada, instancia.cursada_id)
+    if profesor_id is not None and cursada.profesor_id != profesor_id:
+        raise NotFound(detail=f"No hay resultados para la instancia {instancia_id}.")
+    if departamento_id is not None:
+        _validar_materia_en_dpto(db, cursada.materia_id, departamento_id)
+
+    filtro = (
+        select(RespuestaRedaccion.texto)
+        .join(RespuestaSet, Respuesta.respuesta_set_id == RespuestaSet.id)
+        .where(RespuestaSet.instrumento_instancia_id == instancia_id)
+        .where(Respuesta.pregunta_id == pregunta_id)
+    )
+    total = db.scalar(select(func.count()).select_from(filtro.subquery())) or 0
+    textos = db.scalars(filtro.order_by(Respuesta.id).offset(offset).limit(limit)).all()
+    return schemas.ComentariosPagina(
+        pregunta_id=pregunta_id,
+        total=total,
+        offset=offset,
+        limit=limit,
+        comentarios=[schemas.RespuestaTextoItem(texto=t) for t in textos]
+    )
+
+
 def obtener_resultados_agregados_profesor(
     db: Session,
     profesor_id: int,
     cuatrimestre_id: Optional[int] = None,
     anio: Optional[int] = None,
-    materia_id: Optional [int] = None
+    materia_id: Optional [int] = None,
+    max_comentarios: Optional[int] = None
 ) -> List[schemas.ResultadoCursada]:
+    """
+    Resultados de las encuestas cerradas de las cursadas del profesor. Con
+    `max_comentarios` las preguntas abiertas traen solo los primeros N
+    comentarios y su total (ver listar_comentarios_pregunta).
+    """
 
     stmt_cursadas = (
         select(Cursada)
@@ -393,6 +469,10 @@ def obtener_resultados_agregados_profesor(
                 selectinload(Respuesta.pregunta) 
             )
         )
+        comentarios: Dict[int, tuple] = {}
+        if max_comentarios is not None:
+            stmt_respuestas = stmt_respuestas.where(Respuesta.tipo != TipoPregunta.REDACCION)
+            comentarios = _primeros_comentarios(db, instancia.id, max_comentarios)
         todas_las_respuestas = db.execute(stmt_respuestas).scalars().all()
 
         cantidad_sets = db.query(func.count(RespuestaSet.id)).filter(RespuestaSet.instrumento_instancia_id == instancia.id).scalar() or 0
@@ -452,6 +532,9 @@ def obtener_resultados_agregados_profesor(
                     )
                 elif pregunta.tipo == TipoPregunta.REDACCION:
                     respuestas_texto_schema = pregunta_resultados["textos"] if pregunta_resultados else []
+                    cantidad_comentarios = len(respuestas_texto_schema)
+                    if max_comentarios is not None:
+                        cantidad_comentarios, respuestas_texto_schema = comentarios.get(pregunta.id, (0, []))
                     
                     preguntas_de_esta_seccion.append(
                         schemas.ResultadoPregunta(
@@ -459,7 +542,8 @@ def obtener_resultados_agregados_profesor(
                             pregunta_texto=pregunta.texto,
                             pregunta_tipo=pregunta.tipo,
                             resultados_opciones=None, 
-                            respuestas_texto=respuestas_texto_schema
+                            respuestas_texto=respuestas_texto_schema,
+                            cantidad_comentarios=cantidad_comentarios
                         )
                     )
             
@@ -489,10 +573,18 @@ def obtener_resultados_agregados_profesor(
                 cantidad_respuestas=cantidad_sets,
                 resultados_por_seccion=resultados_secciones_schema,
                 informe_curricular_instancia_id=informe_id,
+                encuesta_instancia_id=instancia.id,
                 fecha_cierre=instancia.fecha_fin
             )
         )
 
+    # Estadísticas de todas las preguntas de todas las cursadas en una sola pasada
+    calcular_estadisticas(
+        pregunta
+        for resultado in resultados_finales
+        for seccion in resultado.resultados_por_seccion
+        for pregunta in seccion.resultados_por_pregunta
+    )
     return resultados_finales
 def listar_instancias_cerradas_profesor(
     db: Session,
@@ -524,7 +616,7 @@ def _obtener_plantilla_informe_activa(db: Session) -> int:
     stmt = select(instrumento_models.ActividadCurricular.id).where(
         instrumento_models.ActividadCurricular.estado == EstadoInstrumento.PUBLICADA,
         instrumento_models.ActividadCurricular.tipo == TipoInstrumento.ACTIVIDAD_CURRICULAR
-    ).limit(1)
+    ).order_by(instrumento_models.ActividadCurricular.id.desc()).limit(1)  # la última versión publicada
     
     plantilla_id = db.execute(stmt).scalar_one_or_none()
     
@@ -556,6 +648,7 @@ def cerrar_instancia_encuesta(
         instancia.fecha_fin = datetime.now() 
 
     db.add(instancia)
+    bandeja.quitar_de_bandeja(db, instancia.id)
 
 
     try:
@@ -600,12 +693,18 @@ def cerrar_instancia_encuesta(
     
 
     try:
+        # Puntajes de esta instancia para las comparaciones por percentil
+        actualizar_distribuciones(db, [instancia.id])
         db.commit()
         db.refresh(instancia)
     except Exception as e:
         db.rollback()
         raise BadRequest(detail=f"Error al guardar el cambio de estado: {e}")
 
+    # Las tendencias (tag de encuestas) y las distribuciones solo miran encuestas cerradas: esta las cambia
+    invalidar_cache_distribuciones()
+    invalidar(TAG_ENCUESTAS)
+
     return instancia
 
 def listar_profesores_por_departamento(db: Session, departamento_id: int) -> List[Profesor]:
@@ -698,7 +797,8 @@ def _validar_materia_en_dpto(db: Session, materia_id: int, departamento_id: int)
 def obtener_resultados_agregados_para_profesor(
     db: Session,
     profesor_id: int,
-    departamento_id: int
+    departamento_id: int,
+    max_comentarios: Optional[int] = None
 ) -> List[schemas.ResultadoCursada]:
     """
     Busca todas las estadísticas de un profesor, validando
@@ -710,7 +810,9 @@ def obtener_resultados_agregados_para_profesor(
     
     _validar_profesor_en_dpto(db, profesor_id, departamento_id)
  
-    resultados = obtener_resultados_agregados_profesor(db, profesor_id=profesor_id, cuatrimestre_id=None)
+    resultados = obtener_resultados_agregados_profesor(
+        db, profesor_id=profesor_id, cuatrimestre_id=None, max_comentarios=max_comentarios
+    )
     
     if not resultados:
         raise NotFound(detail="No se encontraron resultados de encuestas cerradas para este profesor.")
@@ -721,7 +823,8 @@ def obtener_resultados_agregados_para_profesor(
 def obtener_resultados_agregados_para_materia(
     db: Session,
     materia_id: int,
-    departamento_id: int
+    departamento_id: int,
+    max_comentarios: Optional[int] = None
 ) -> List[schemas.ResultadoCursada]:
     """
     Busca todas las estadísticas de una materia, validando
@@ -777,6 +880,10 @@ def obtener_resultados_agregados_para_materia(
                 selectinload(Respuesta.pregunta) 
             )
         )
+        comentarios: Dict[int, tuple] = {}
+        if max_comentarios is not None:
+            stmt_respuestas = stmt_respuestas.where(Respuesta.tipo != TipoPregunta.REDACCION)
+            comentarios = _primeros_comentarios(db, instancia.id, max_comentarios)
         todas_las_respuestas = db.execute(stmt_respuestas).scalars().all()
         cantidad_sets = db.query(func.count(RespuestaSet.id)).filter(RespuestaSet.instrumento_instancia_id == instancia.id).scalar() or 0
         
@@ -823,13 +930,17 @@ def obtener_resultados_agregados_para_materia(
                     )
                 elif pregunta.tipo == TipoPregunta.REDACCION:
                     respuestas_texto_schema = pregunta_resultados["textos"] if pregunta_resultados else []
+                    cantidad_comentarios = len(respuestas_texto_schema)
+                    if max_comentarios is not None:
+                        cantidad_comentarios, respuestas_texto_schema = comentarios.get(pregunta.id, (0, []))
                     preguntas_de_esta_seccion.append(
                         schemas.ResultadoPregunta(
                             pregunta_id=pregunta.id,
                             pregunta_texto=pregunta.texto,
                             pregunta_tipo=pregunta.tipo,
                             resultados_opciones=None, 
-                            respuestas_texto=respuestas_texto_schema
+                            respuestas_texto=respuestas_texto_schema,
+                            cantidad_comentarios=cantidad_comentarios
                         )
                     )
             if preguntas_de_esta_seccion:
@@ -860,13 +971,21 @@ def obtener_resultados_agregados_para_materia(
                 cuatrimestre_info=cuatri_info,
                 cantidad_respuestas=cantidad_sets,
                 resultados_por_seccion=resultados_secciones_schema,
-                informe_curricular_instancia_id=informe_id 
+                informe_curricular_instancia_id=informe_id,
+                encuesta_instancia_id=instancia.id
             )
         )
 
     if not resultados_finales:
         raise NotFound(detail="No se encontraron resultados de encuestas cerradas para esta materia.")
         
+    # Estadísticas de todas las preguntas de todas las cursadas en una sola pasada
+    calcular_estadisticas(
+        pregunta
+        for resultado in resultados_finales
+        for seccion in resultado.resultados_por_seccion
+        for pregunta in seccion.resultados_por_pregunta
+    )
     return resultados_finales
 
 def listar_materias_de_profesor(db: Session, profesor_id: int) -> List[Materia]:
@@ -33,4 +33,10 @@ class TipoPregunta(StrEnum):
 class TipoInstrumento(StrEnum):
     ENCUESTA = "ENCUESTA"
     ACTIVIDAD_CURRICULAR = "ACTIVIDAD_CURRICULAR"
-    INFORME_SINTETICO = "INFORME_SINTETICO"
\ No newline at end of file
+    INFORME_SINTETICO = "INFORME_SINTETICO"
+
+class EstadoTrabajo(StrEnum):
+    PENDIENTE = "pendiente"
+    EN_CURSO = "en_curso"
+    COMPLETADO = "completado"
+    FALLIDO = "fallido"
@@ -0,0 +1,27 @@
+from __future__ import annotations
+from datetime import datetime
+
+from sqlalchemy import Integer, Float, DateTime, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.models import ModeloBase
+
+
+class PuntajePregunta(ModeloBase):
+    """
+    Puntaje promedio de una pregunta valorada "(4)…(1)" en una encuesta cerrada.
+    Es la distribución precalculada contra la que se comparan los profesores:
+    una fila por (instancia, pregunta), escrita al cerrar la instancia.
+    """
+    __tablename__ = "puntaje_pregunta"
+
+    encuesta_instancia_id: Mapped[int] = mapped_column(
+        ForeignKey("encuesta_instancia.id", ondelete="CASCADE"), primary_key=True
+    )
+    pregunta_id: Mapped[int] = mapped_column(ForeignKey("preguntas.id"), primary_key=True, index=True)
+    cursada_id: Mapped[int] = mapped_column(ForeignKey("cursada.id"), nullable=False, index=True)
+
+    puntaje: Mapped[float] = mapped_column(Float, nullable=False)
+    # Respuestas valoradas que entraron en el promedio (sin NPO)
+    cantidad: Mapped[int] = mapped_column(Integer, nullable=False)
+    actualizado_en: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, nullable=False)
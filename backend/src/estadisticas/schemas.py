@@ -0,0 +1,93 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+from src.enumerados import TipoCuatrimestre
+
+
+class OpcionTendencia(BaseModel):
+    opcion_id: int
+    opcion_texto: str
+    cantidad: int
+    porcentaje: float
+    valor: Optional[int] = None  # el "(n)" de la etiqueta, si tiene
+
+
+class PuntoTendencia(BaseModel):
+    anio: int
+    periodo: Optional[TipoCuatrimestre] = None
+    etiqueta: str  # ej: "2024 - primero"
+    cantidad_respuestas: int
+    # Promedio ponderado de los valores "(4)…(1)"; None si la pregunta no tiene opciones valoradas
+    puntaje: Optional[float] = None
+    opciones: List[OpcionTendencia]
+
+
+class SerieTendencia(BaseModel):
+    pregunta_id: int  # pregunta canónica: la misma en todas las versiones de la plantilla
+    pregunta_texto: str
+    seccion_nombre: Optional[str] = None
+    puntos: List[PuntoTendencia]
+
+
+class TendenciaResponse(BaseModel):
+    entidad: str  # "profesor" | "materia"
+    entidad_id: int
+    anio_desde: Optional[int] = None
+    anio_hasta: Optional[int] = None
+    cantidad_encuestas: int
+    series: List[SerieTendencia]
+
+
+class PercentilPregunta(BaseModel):
+    pregunta_id: int
+    pregunta_canonica_id: Optional[int] = None
+    pregunta_texto: str
+    puntaje: float
+    cantidad_respuestas: int
+    # Percentil (0-100) del puntaje dentro de todas las cursadas del ámbito
+    percentil_departamento: Optional[float] = None
+    percentil_facultad: Optional[float] = None
+    promedio_departamento: Optional[float] = None
+    promedio_facultad: Optional[float] = None
+    cursadas_departamento: int = 0
+    cursadas_facultad: int = 0
+
+
+class ComparacionCursada(BaseModel):
+    cursada_id: int
+    encuesta_instancia_id: int
+    materia_nombre: str
+    cuatrimestre_info: str
+    preguntas: List[PercentilPregunta]
+
+
+class ComparacionProfesorResponse(BaseModel):
+    profesor_id: int
+    departamento_id: int
+    cursadas: List[ComparacionCursada]
+
+
+class PuntajePreguntaInforme(BaseModel):
+    pregunta_id: int
+    pregunta_texto: str
+    puntaje: float
+    cantidad_respuestas: int
+
+
+class PuntajeSeccionInforme(BaseModel):
+    seccion_id: int
+    seccion_nombre: str
+    letra: str  # "B", "C", "D" o "E" (E tiene teoría y práctica por separado)
+    puntaje: Optional[float] = None  # promedio de las preguntas ponderado por respuestas
+    cantidad_respuestas: int  # la mayor cantidad de respuestas valoradas entre sus preguntas
+    preguntas: List[PuntajePreguntaInforme]
+
+
+class ResultadosEncuestaInforme(BaseModel):
+    """Valores de la encuesta de alumnos que se transcriben en el punto 2.B del informe."""
+    actividad_instancia_id: int
+    encuesta_instancia_id: int
+    materia_nombre: str
+    cuatrimestre_info: str
+    encuesta_cerrada: bool
+    secciones: List[PuntajeSeccionInforme]
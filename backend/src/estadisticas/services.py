@@ -0,0 +1,548 @@
+import math
+import re
+from bisect import bisect_left, bisect_right
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, func, distinct, delete, insert
+from sqlalchemy.orm import Session, aliased
+
+from src.enumerados import EstadoInstancia, TipoCuatrimestre
+from src.encuestas.models import EncuestaInstancia
+from src.instrumento.models import ActividadCurricularInstancia
+from src.exceptions import NotFound, PermissionDenied
+from src.materia.models import Cursada, Cuatrimestre, Materia, Carrera, carrera_materia_association
+from src.pregunta.models import Pregunta, Opcion, PreguntaCanonica
+from src.respuesta.models import RespuestaSet, RespuestaMultipleChoice
+from src.seccion.models import Seccion
+from src.estadisticas import schemas
+from src.estadisticas.models import PuntajePregunta
+from src.system.jobs import registrar_trabajo, Progreso
+from src.system.cache import obtener_o_calcular, TAG_ENCUESTAS, TAG_PLANTILLAS
+from src.encuestas import schemas as encuestas_schemas
+
+# Orden de los períodos dentro de un mismo año
+ORDEN_PERIODO = {TipoCuatrimestre.PRIMERO: 1, TipoCuatrimestre.SEGUNDO: 2, TipoCuatrimestre.ANUAL: 3, None: 4}
+
+# Etiquetas del tipo "Muy satisfactorio (4)" → 4
+_PATRON_VALOR = re.compile(r"\((\d+)\)\s*$")
+
+# z para un intervalo de confianza del 95% (aproximación normal)
+Z_95 = 1.96
+
+# Secciones de la encuesta que se transcriben en el punto 2.B del informe de actividad curricular
+SECCIONES_INFORME_2B = ("B", "C", "D", "E")
+
+TTL_CACHE_SEGUNDOS = 600
+
+# Distribuciones ordenadas de puntajes por ámbito (departamento_id, o None para la facultad)
+_distribuciones: Dict[Optional[int], Tuple[float, Dict[int, List[float]]]] = {}
+_distribuciones_lock = threading.Lock()
+
+
+def valor_opcion(texto: str) -> Optional[int]:
+    """Valor numérico de la opción según su etiqueta; None si no tiene (ej: 'Sí', 'NPO')."""
+    coincidencia = _PATRON_VALOR.search(texto or "")
+    return int(coincidencia.group(1)) if coincidencia else None
+
+
+def calcular_estadisticas(preguntas: Iterable[encuestas_schemas.ResultadoPregunta]) -> None:
+    """
+    Completa los campos estadísticos de cada ResultadoPregunta (y el porcentaje
+    de cada opción) a partir de sus conteos, pregunta por pregunta. Trabaja solo
+    en memoria sobre unas pocas opciones por pregunta: no hace consultas.
+    """
+    for pregunta in preguntas:
+        if pregunta.resultados_opciones:
+            _estadisticas_pregunta(pregunta)
+
+
+def _estadisticas_pregunta(pregunta: encuestas_schemas.ResultadoPregunta) -> None:
+    opciones = pregunta.resultados_opciones
+    total = sum(opcion.cantidad for opcion in opciones)
+    # Porcentaje por opción (sobre todas las respuestas, incluidas NPO / Sí / No)
+    for opcion in opciones:
+        opcion.porcentaje = round(100 * opcion.cantidad / total, 1) if total else 0.0
+
+    # Opciones valoradas, ordenadas por valor (mediana y top-2): (valor, posición, cantidad)
+    valoradas = sorted(
+        (valor, posicion, opcion.cantidad)
+        for posicion, opcion in enumerate(opciones)
+        if (valor := valor_opcion(opcion.opcion_texto)) is not None
+    )
+    n = sum(cantidad for _, _, cantidad in valoradas)
+    pregunta.cantidad_respuestas = total
+    pregunta.cantidad_valoradas = n
+    if not n:
+        return
+
+    media = sum(valor * cantidad for valor, _, cantidad in valoradas) / n
+    suma_cuadrados = sum(valor * valor * cantidad for valor, _, cantidad in valoradas)
+    # Varianza muestral; con una sola respuesta no hay dispersión que estimar
+    varianza = max(0.0, (suma_cuadrados - n * media * media) / (n - 1)) if n > 1 else 0.0
+    desvio = math.sqrt(varianza)
+    margen = Z_95 * desvio / math.sqrt(n)
+    pregunta.promedio = round(media, 3)
+    pregunta.desvio_estandar = round(desvio, 3)
+    pregunta.intervalo_confianza_inferior = round(media - margen, 3)
+    pregunta.intervalo_confianza_superior = round(media + margen, 3)
+
+    acumulado = 0
+    for _, posicion, cantidad in valoradas:
+        acumulado += cantidad
+        if acumulado >= n / 2:
+            pregunta.mediana_opcion_id = opciones[posicion].opcion_id
+            pregunta.mediana_opcion_texto = opciones[posicion].opcion_texto
+            break
+
+    dos_mayores = sorted({valor for valor, _, _ in valoradas})[-2:]
+    en_top2 = sum(cantidad for valor, _, cantidad in valoradas if valor in dos_mayores)
+    pregunta.porcentaje_top2 = round(100 * en_top2 / n, 1)
+
+
+def _canonica(pregunta_id):
+    """Id de la pregunta canónica (ver PreguntaCanonica); requiere el outerjoin a pregunta_canonica."""
+    return func.coalesce(PreguntaCanonica.canonica_id, pregunta_id)
+
+
+def _conteos_por_periodo(
+    db: Session,
+    filtro,
+    anio_desde: Optional[int],
+    anio_hasta: Optional[int]
+):
+    """
+    Una sola consulta agrupada: (anio, periodo, pregunta canónica, texto de la
+    opción) → cantidad, sobre encuestas cerradas. Agrupar por la pregunta
+    canónica y el texto junta en una misma serie las respuestas a las
+    distintas versiones de la plantilla.
+    """
+    pregunta_id = _canonica(RespuestaMultipleChoice.pregunta_id)
+    stmt = (
+        select(
+            Cuatrimestre.anio,
+            Cuatrimestre.periodo,
+            pregunta_id.label("pregunta_id"),
+            Opcion.texto,
+            func.count().label("cantidad"),
+        )
+        .select_from(RespuestaMultipleChoice)
+        .join(Opcion, RespuestaMultipleChoice.opcion_id == Opcion.id)
+        .outerjoin(PreguntaCanonica, PreguntaCanonica.pregunta_id == RespuestaMultipleChoice.pregunta_id)
+        .join(RespuestaSet, RespuestaMultipleChoice.respuesta_set_id == RespuestaSet.id)
+        .join(EncuestaInstancia, RespuestaSet.instrumento_instancia_id == EncuestaInstancia.id)
+        .join(Cursada, EncuestaInstancia.cursada_id == Cursada.id)
+        .join(Cuatrimestre, Cursada.cuatrimestre_id == Cuatrimestre.id)
+        .where(EncuestaInstancia.estado == EstadoInstancia.CERRADA, filtro)
+        .group_by(Cuatrimestre.anio, Cuatrimestre.periodo, pregunta_id, Opcion.texto)
+    )
+    if anio_desde is not None:
+        stmt = stmt.where(Cuatrimestre.anio >= anio_desde)
+    if anio_hasta is not None:
+        stmt = stmt.where(Cuatrimestre.anio <= anio_hasta)
+    return db.execute(stmt).all()
+
+
+def _cantidad_encuestas(db: Session, filtro, anio_desde: Optional[int], anio_hasta: Optional[int]) -> int:
+    stmt = (
+        select(func.count(distinct(EncuestaInstancia.id)))
+        .join(Cursada, EncuestaInstancia.cursada_id == Cursada.id)
+        .join(Cuatrimestre, Cursada.cuatrimestre_id == Cuatrimestre.id)
+        .where(EncuestaInstancia.estado == EstadoInstancia.CERRADA, filtro)
+    )
+    if anio_desde is not None:
+        stmt = stmt.where(Cuatrimestre.anio >= anio_desde)
+    if anio_hasta is not None:
+        stmt = stmt.where(Cuatrimestre.anio <= anio_hasta)
+    return db.scalar(stmt) or 0
+
+
+def _construir_series(db: Session, filas) -> List[schemas.SerieTendencia]:
+    preguntas_ids = {f.pregunta_id for f in filas}
+    if not preguntas_ids:
+        return []
+
+    # Metadatos (textos de preguntas, secciones y todas las opciones de todas
+    # las versiones) en una consulta. Se recorre de la versión más nueva a la
+    # más vieja: los textos y el orden de las opciones son los de la última, y
+    # al final van las opciones que solo existían en versiones anteriores.
+    canonica = _canonica(Pregunta.id)
+    meta = db.execute(
+        select(Opcion.id, Opcion.texto, canonica, Pregunta.texto, Seccion.nombre)
+        .join(Pregunta, Opcion.pregunta_id == Pregunta.id)
+        .outerjoin(PreguntaCanonica, PreguntaCanonica.pregunta_id == Pregunta.id)
+        .outerjoin(Seccion, Pregunta.seccion_id == Seccion.id)
+        .where(canonica.in_(preguntas_ids))
+        .order_by(Pregunta.id.desc(), Opcion.id)
+    ).all()
+    opciones_por_pregunta: Dict[int, Dict[str, int]] = defaultdict(dict)
+    info_pregunta: Dict[int, Tuple[str, Optional[str]]] = {}
+    for opcion_id, opcion_texto, pregunta_id, pregunta_texto, seccion_nombre in meta:
+        opciones_por_pregunta[pregunta_id].setdefault(opcion_texto, opcion_id)
+        info_pregunta.setdefault(pregunta_id, (pregunta_texto, seccion_nombre))
+
+    conteos: Dict[int, Dict[tuple, Dict[str, int]]] = defaultdict(lambda: defaultdict(dict))
+    for anio, periodo, pregunta_id, opcion_texto, cantidad in filas:
+        conteos[pregunta_id][(anio, periodo)][opcion_texto] = cantidad
+
+    series = []
+    for pregunta_id in sorted(conteos, key=lambda p: (info_pregunta.get(p, ("", ""))[1] or "", p)):
+        opciones = opciones_por_pregunta.get(pregunta_id, {})
+        valores = {texto: valor_opcion(texto) for texto in opciones}
+        puntos = []
+        for (anio, periodo) in sorted(conteos[pregunta_id], key=lambda k: (k[0], ORDEN_PERIODO.get(k[1], 4))):
+            por_opcion = conteos[pregunta_id][(anio, periodo)]
+            total = sum(por_opcion.values())
+            suma_valores = sum(valores[t] * c for t, c in por_opcion.items() if valores.get(t) is not None)
+            cantidad_valoradas = sum(c for t, c in por_opcion.items() if valores.get(t) is not None)
+            puntos.append(schemas.PuntoTendencia(
+                anio=anio,
+                periodo=periodo,
+                etiqueta=f"{anio} - {periodo.value}" if periodo else str(anio),
+                cantidad_respuestas=total,
+                puntaje=round(suma_valores / cantidad_valoradas, 3) if cantidad_valoradas else None,
+                opciones=[
+                    schemas.OpcionTendencia(
+                        opcion_id=oid,
+                        opcion_texto=texto,
+                        cantidad=por_opcion.get(texto, 0),
+                        porcentaje=round(100 * por_opcion.get(texto, 0) / total, 1) if total else 0.0,
+                        valor=valores[texto],
+                    )
+                    for texto, oid in opciones.items()
+                ],
+            ))
+        pregunta_texto, seccion_nombre = info_pregunta.get(pregunta_id, ("", None))
+        series.append(schemas.SerieTendencia(
+            pregunta_id=pregunta_id, pregunta_texto=pregunta_texto, seccion_nombre=seccion_nombre, puntos=puntos
+        ))
+    return series
+
+
+def obtener_tendencias(
+    db: Session,
+    entidad: str,
+    entidad_id: int,
+    anio_desde: Optional[int] = None,
+    anio_hasta: Optional[int] = None,
+    materia_id: Optional[int] = None
+) -> schemas.TendenciaResponse:
+    """
+    Series temporales por pregunta (porcentaje por opción y puntaje ponderado) de
+    todas las encuestas cerradas de un profesor o de una materia. Cacheado por
+    (entidad, id, rango) con los tags de encuestas (se invalida al cerrar una) y
+    de plantillas (vincular versiones cambia las preguntas canónicas).
+    """
+    cuerpo = obtener_o_calcular(
+        f"tendencias:{entidad}|{entidad_id}|{anio_desde}|{anio_hasta}|{materia_id}",
+        lambda: _calcular_tendencias(
+            db, entidad, entidad_id, anio_desde, anio_hasta, materia_id
+        ).model_dump_json().encode(),
+        TTL_CACHE_SEGUNDOS, (TAG_ENCUESTAS, TAG_PLANTILLAS)
+    )
+    return schemas.TendenciaResponse.model_validate_json(cuerpo)
+
+
+def _calcular_tendencias(
+    db: Session,
+    entidad: str,
+    entidad_id: int,
+    anio_desde: Optional[int],
+    anio_hasta: Optional[int],
+    materia_id: Optional[int]
+) -> schemas.TendenciaResponse:
+    if entidad == "profesor":
+        filtro = Cursada.profesor_id == entidad_id
+        if materia_id is not None:
+            filtro = filtro & (Cursada.materia_id == materia_id)
+    elif entidad == "materia":
+        filtro = Cursada.materia_id == entidad_id
+    else:
+        raise ValueError(f"Entidad de tendencia desconocida: {entidad}")
+
+    filas = _conteos_por_periodo(db, filtro, anio_desde, anio_hasta)
+    return schemas.TendenciaResponse(
+        entidad=entidad,
+        entidad_id=entidad_id,
+        anio_desde=anio_desde,
+        anio_hasta=anio_hasta,
+        cantidad_encuestas=_cantidad_encuestas(db, filtro, anio_desde, anio_hasta) if filas else 0,
+        series=_construir_series(db, filas),
+    )
+
+
+# --- Distribuciones de puntajes y percentiles ---
+
+def invalidar_cache_distribuciones() -> None:
+    with _distribuciones_lock:
+        _distribuciones.clear()
+
+
+def actualizar_distribuciones(db: Session, instancias_ids: Optional[List[int]] = None) -> int:
+    """
+    Recalcula los puntajes por (instancia, pregunta) de las encuestas cerradas
+    indicadas (todas si no se indica ninguna) y los reemplaza en la tabla
+    `puntaje_pregunta`. No hace commit. Devuelve la cantidad de filas escritas.
+    """
+    stmt = (
+        select(
+            RespuestaSet.instrumento_instancia_id,
+            EncuestaInstancia.cursada_id,
+            RespuestaMultipleChoice.pregunta_id,
+            RespuestaMultipleChoice.opcion_id,
+            func.count().label("cantidad"),
+        )
+        .select_from(RespuestaMultipleChoice)
+        .join(RespuestaSet, RespuestaMultipleChoice.respuesta_set_id == RespuestaSet.id)
+        .join(EncuestaInstancia, RespuestaSet.instrumento_instancia_id == EncuestaInstancia.id)
+        .where(EncuestaInstancia.estado == EstadoInstancia.CERRADA)
+        .group_by(
+            RespuestaSet.instrumento_instancia_id,
+            EncuestaInstancia.cursada_id,
+            RespuestaMultipleChoice.pregunta_id,
+            RespuestaMultipleChoice.opcion_id,
+        )
+    )
+    borrar = delete(PuntajePregunta)
+    if instancias_ids is not None:
+        if not instancias_ids:
+            return 0
+        stmt = stmt.where(RespuestaSet.instrumento_instancia_id.in_(instancias_ids))
+        borrar = borrar.where(PuntajePregunta.encuesta_instancia_id.in_(instancias_ids))
+    db.flush()  # las sesiones no hacen autoflush: que se vea el cambio de estado recién hecho
+    filas = db.execute(stmt).all()
+
+    opciones_ids = {f.opcion_id for f in filas}
+    valores: Dict[int, Optional[int]] = {}
+    if opciones_ids:
+        valores = {
+            oid: valor_opcion(texto)
+            for oid, texto in db.execute(select(Opcion.id, Opcion.texto).where(Opcion.id.in_(opciones_ids))).all()
+        }
+
+    # (instancia, pregunta) → [cursada, suma, cantidad], solo sobre opciones valoradas
+    acumulado: Dict[Tuple[int, int], List[int]] = {}
+    for instancia_id, cursada_id, pregunta_id, opcion_id, cantidad in filas:
+        valor = valores.get(opcion_id)
+        if valor is None:
+            continue
+        item = acumulado.setdefault((instancia_id, pregunta_id), [cursada_id, 0, 0])
+        item[1] += valor * cantidad
+        item[2] += cantidad
+
+    db.execute(borrar)
+    ahora = datetime.now()
+    nuevas = [
+        {
+            "encuesta_instancia_id": instancia_id,
+            "pregunta_id": pregunta_id,
+            "cursada_id": cursada_id,
+            "puntaje": suma / cantidad,
+            "cantidad": cantidad,
+            "actualizado_en": ahora,
+        }
+        for (instancia_id, pregunta_id), (cursada_id, suma, cantidad) in acumulado.items()
+    ]
+    if nuevas:
+        db.execute(insert(PuntajePregunta), nuevas)
+    return len(nuevas)
+
+
+@registrar_trabajo("recalcular_distribuciones")
+def trabajo_recalcular_distribuciones(db: Session, progreso: Progreso) -> dict:
+    """Recalcula todas las distribuciones (ej: después de una carga masiva de encuestas cerradas)."""
+    progreso(0, "Recalculando puntajes por pregunta")
+    filas = actualizar_distribuciones(db)
+    invalidar_cache_distribuciones()
+    return {"filas": filas}
+
+
+def _distribucion(db: Session, departamento_id: Optional[int]) -> Dict[int, List[float]]:
+    """pregunta canónica → puntajes ordenados de todas las cursadas del ámbito (cacheado)."""
+    with _distribuciones_lock:
+        en_cache = _distribuciones.get(departamento_id)
+    if en_cache and time.monotonic() - en_cache[0] < TTL_CACHE_SEGUNDOS:
+        return en_cache[1]
+
+    stmt = (
+        select(_canonica(PuntajePregunta.pregunta_id), PuntajePregunta.puntaje)
+        .outerjoin(PreguntaCanonica, PreguntaCanonica.pregunta_id == PuntajePregunta.pregunta_id)
+    )
+    if departamento_id is not None:
+        materias_dpto = (
+            select(carrera_materia_association.c.materia_id)
+            .join(Carrera, carrera_materia_association.c.carrera_id == Carrera.id)
+            .where(Carrera.departamento_id == departamento_id)
+        )
+        stmt = stmt.join(Cursada, PuntajePregunta.cursada_id == Cursada.id).where(Cursada.materia_id.in_(materias_dpto))
+
+    por_pregunta: Dict[int, List[float]] = defaultdict(list)
+    for pregunta_id, puntaje in db.execute(stmt):
+        por_pregunta[pregunta_id].append(puntaje)
+    for puntajes in por_pregunta.values():
+        puntajes.sort()
+    distribucion = dict(por_pregunta)
+    with _distribuciones_lock:
+        _distribuciones[departamento_id] = (time.monotonic(), distribucion)
+    return distribucion
+
+
+def percentil(puntajes_ordenados: List[float], puntaje: float) -> Optional[float]:
+    """Rango percentil: % de valores por debajo, contando la mitad de los empates."""
+    if not puntajes_ordenados:
+        return None
+    debajo = bisect_left(puntajes_ordenados, puntaje)
+    iguales = bisect_right(puntajes_ordenados, puntaje) - debajo
+    return round(100 * (debajo + iguales / 2) / len(puntajes_ordenados), 1)
+
+
+def obtener_comparacion_profesor(
+    db: Session,
+    profesor_id: int,
+    departamento_id: int
+) -> schemas.ComparacionProfesorResponse:
+    """
+    Para cada pregunta valorada de cada cursada cerrada del profesor, el
+    percentil de su puntaje entre las cursadas del departamento y de toda la
+    facultad. Las distribuciones salen de `puntaje_pregunta` (se actualiza al
+    cerrar cada instancia), no se recalculan las encuestas en cada request.
+    Las distribuciones son por pregunta canónica: una cursada se compara
+    también con las que respondieron otras versiones de la plantilla.
+    """
+    filas = db.execute(
+        select(
+            PuntajePregunta.encuesta_instancia_id,
+            PuntajePregunta.cursada_id,
+            PuntajePregunta.pregunta_id,
+            _canonica(PuntajePregunta.pregunta_id),
+            PuntajePregunta.puntaje,
+            PuntajePregunta.cantidad,
+            Pregunta.texto,
+            Materia.nombre,
+            Cuatrimestre.anio,
+            Cuatrimestre.periodo,
+        )
+        .join(Cursada, PuntajePregunta.cursada_id == Cursada.id)
+        .join(Materia, Cursada.materia_id == Materia.id)
+        .join(Cuatrimestre, Cursada.cuatrimestre_id == Cuatrimestre.id)
+        .join(Pregunta, PuntajePregunta.pregunta_id == Pregunta.id)
+        .outerjoin(PreguntaCanonica, PreguntaCanonica.pregunta_id == PuntajePregunta.pregunta_id)
+        .where(Cursada.profesor_id == profesor_id)
+        .order_by(Cuatrimestre.anio.desc(), Cuatrimestre.periodo.desc(), Materia.nombre, PuntajePregunta.pregunta_id)
+    ).all()
+
+    distribucion_dpto = _distribucion(db, departamento_id)
+    distribucion_facultad = _distribucion(db, None)
+
+    cursadas: Dict[int, schemas.ComparacionCursada] = {}
+    for instancia_id, cursada_id, pregunta_id, canonica_id, puntaje, cantidad, pregunta_texto, materia, anio, periodo in filas:
+        if instancia_id not in cursadas:
+            cursadas[instancia_id] = schemas.ComparacionCursada(
+                cursada_id=cursada_id,
+                encuesta_instancia_id=instancia_id,
+                materia_nombre=materia,
+                cuatrimestre_info=f"{anio} - {periodo.value}" if periodo else str(anio),
+                preguntas=[],
+            )
+        dpto = distribucion_dpto.get(canonica_id, [])
+        facultad = distribucion_facultad.get(canonica_id, [])
+        cursadas[instancia_id].preguntas.append(schemas.PercentilPregunta(
+            pregunta_id=pregunta_id,
+            pregunta_canonica_id=canonica_id,
+            pregunta_texto=pregunta_texto,
+            puntaje=round(puntaje, 3),
+            cantidad_respuestas=cantidad,
+            percentil_departamento=percentil(dpto, puntaje),
+            percentil_facultad=percentil(facultad, puntaje),
+            promedio_departamento=round(sum(dpto) / len(dpto), 3) if dpto else None,
+            promedio_facultad=round(sum(facultad) / len(facultad), 3) if facultad else None,
+            cursadas_departamento=len(dpto),
+            cursadas_facultad=len(facultad),
+        ))
+
+    return schemas.ComparacionProfesorResponse(
+        profesor_id=profesor_id,
+        departamento_id=departamento_id,
+        cursadas=list(cursadas.values()),
+    )
+
+
+def obtener_resultados_encuesta_informe(
+    db: Session,
+    actividad_instancia_id: int,
+    profesor_id: Optional[int] = None
+) -> schemas.ResultadosEncuestaInforme:
+    """
+    Puntajes de las secciones B a E de la encuesta vinculada a un informe de
+    actividad curricular, para la pregunta 2.B. Sale de `puntaje_pregunta`
+    (escrito al cerrar la encuesta): una consulta para el informe y otra para
+    los puntajes. Con `profesor_id` se valida que el informe sea suyo.
+    """
+    # Las dos instancias heredan de instrumento_instancia: el alias evita el auto-alias de SQLAlchemy
+    encuesta = aliased(EncuestaInstancia, flat=True)
+    cabecera = db.execute(
+        select(
+            ActividadCurricularInstancia.encuesta_instancia_id,
+            ActividadCurricularInstancia.profesor_id,
+            encuesta.estado,
+            Materia.nombre,
+            Cuatrimestre.anio,
+            Cuatrimestre.periodo,
+        )
+        .join(encuesta, ActividadCurricularInstancia.encuesta_instancia_id == encuesta.id)
+        .join(Cursada, ActividadCurricularInstancia.cursada_id == Cursada.id)
+        .join(Materia, Cursada.materia_id == Materia.id)
+        .join(Cuatrimestre, Cursada.cuatrimestre_id == Cuatrimestre.id)
+        .where(ActividadCurricularInstancia.id == actividad_instancia_id)
+    ).first()
+    if cabecera is None:
+        raise NotFound(detail=f"Informe de actividad curricular {actividad_instancia_id} no encontrado.")
+    encuesta_id, dueno_id, estado, materia, anio, periodo = cabecera
+    if profesor_id is not None and dueno_id != profesor_id:
+        raise PermissionDenied(detail="El informe no pertenece al profesor.")
+
+    filas = db.execute(
+        select(
+            Seccion.id,
+            Seccion.nombre,
+            PuntajePregunta.pregunta_id,
+            Pregunta.texto,
+            PuntajePregunta.puntaje,
+            PuntajePregunta.cantidad,
+        )
+        .join(Pregunta, PuntajePregunta.pregunta_id == Pregunta.id)
+        .join(Seccion, Pregunta.seccion_id == Seccion.id)
+        .where(PuntajePregunta.encuesta_instancia_id == encuesta_id)
+        .order_by(Seccion.id, Pregunta.id)
+    ).all()
+
+    secciones: Dict[int, schemas.PuntajeSeccionInforme] = {}
+    sumas: Dict[int, float] = defaultdict(float)
+    for seccion_id, seccion_nombre, pregunta_id, pregunta_texto, puntaje, cantidad in filas:
+        letra = seccion_nombre.split(":")[0].strip()
+        if letra not in SECCIONES_INFORME_2B:
+            continue
+        seccion = secciones.setdefault(seccion_id, schemas.PuntajeSeccionInforme(
+            seccion_id=seccion_id, seccion_nombre=seccion_nombre, letra=letra, cantidad_respuestas=0, preguntas=[]
+        ))
+        seccion.preguntas.append(schemas.PuntajePreguntaInforme(
+            pregunta_id=pregunta_id, pregunta_texto=pregunta_texto, puntaje=round(puntaje, 3), cantidad_respuestas=cantidad
+        ))
+        seccion.cantidad_respuestas = max(seccion.cantidad_respuestas, cantidad)
+        sumas[seccion_id] += puntaje * cantidad
+
+    for seccion_id, seccion in secciones.items():
+        total = sum(p.cantidad_respuestas for p in seccion.preguntas)
+        seccion.puntaje = round(sumas[seccion_id] / total, 3) if total else None
+
+    return schemas.ResultadosEncuestaInforme(
+        actividad_instancia_id=actividad_instancia_id,
+        encuesta_instancia_id=encuesta_id,
+        materia_nombre=materia,
+        cuatrimestre_info=f"{anio} - {periodo.value}" if periodo else str(anio),
+        encuesta_cerrada=estado == EstadoInstancia.CERRADA,
+        secciones=list(secciones.values()),
+    )
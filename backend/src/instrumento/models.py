@@ -28,6 +28,13 @@ class InstrumentoBase(ModeloBase):
           SQLEnum(EstadoInstrumento, name = "estado_instrumento_enum"), default=EstadoInstrumento.BORRADOR
     )
     tipo: Mapped[TipoInstrumento] = mapped_column(SQLEnum(TipoInstrumento), nullable=False)
+
+    # Cadena de versiones (ver src/instrumento/versiones.py). Sin FK: borrar una
+    # versión no tiene que depender de las demás.
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
+    version_anterior_id: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+    version_raiz_id: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+
     __mapper_args__ = {
         "polymorphic_identity": "instrumento_base",
         "polymorphic_on": "tipo",
@@ -74,6 +81,11 @@ class InstrumentoInstancia(ModeloBase):
         DateTime(timezone=True), nullable=True) # es nulleable ya que no conocemos cuando va a cerrar la encuesta
 
     tipo: Mapped[TipoInstrumento] = mapped_column(SQLEnum(TipoInstrumento), nullable=False)
+
+    # Último RespuestaSet de los informes (en encuestas queda vacío). Sin FK para no
+    # armar un ciclo con respuesta_set; lo mantiene src/respuesta/versiones.py.
+    ultimo_respuesta_set_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
     __mapper_args__ = {
         "polymorphic_identity": "instrumento_instancia",
         "polymorphic_on": "tipo",
@@ -0,0 +1,89 @@
+"""
+Datos de los campos dinámicos de los informes (`Pregunta.origen_datos`).
+
+Cada clave de `origen_datos` tiene un resolver que arma sus datos para una
+instancia de informe. `get_plantilla_para_instancia_reporte` junta las claves
+de la plantilla y llama a cada resolver una sola vez, así la página del
+informe sale en un request en lugar de uno por campo:
+
+    @registrar_origen("resultados_encuesta", ttl=3600, tags=(TAG_ENCUESTAS,))
+    def resolver_resultados_encuesta(db: Session, instancia: ActividadCurricularInstancia):
+        ...
+
+Con `ttl` el resultado se guarda en el cache de respuestas por (clave,
+instancia) y se descarta con `invalidar(*tags)`. Las claves sin resolver
+quedan en None (el frontend las trata como antes).
+"""
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from pydantic_core import to_json
+from sqlalchemy.orm import Session
+
+from src.instrumento.models import ActividadCurricularInstancia
+from src.estadisticas import services as estadisticas_services
+from src.system.cache import obtener_o_calcular, TAG_ENCUESTAS
+
+# Opciones del desplegable de porcentaje de las preguntas 1.x del informe
+PORCENTAJES_DESPLEGABLE = [f"{i}%" for i in range(0, 101, 5)]
+
+Resolver = Callable[[Session, ActividadCurricularInstancia], Any]
+
+
+@dataclass(frozen=True)
+class OrigenDatos:
+    clave: str
+    resolver: Resolver
+    ttl: Optional[int] = None
+    tags: Tuple[str, ...] = ()
+
+
+_registro: Dict[str, OrigenDatos] = {}
+
+
+def registrar_origen(clave: str, ttl: Optional[int] = None, tags: Tuple[str, ...] = ()):
+    """Decorador: registra el resolver de una clave de `origen_datos`."""
+    def decorador(funcion: Resolver) -> Resolver:
+        _registro[clave] = OrigenDatos(clave, funcion, ttl, tags)
+        return funcion
+    return decorador
+
+
+def _resolver(db: Session, origen: OrigenDatos, instancia: ActividadCurricularInstancia) -> Any:
+    if origen.ttl is None:
+        return json.loads(to_json(origen.resolver(db, instancia)))
+    cuerpo = obtener_o_calcular(
+        f"origen:{origen.clave}|{instancia.id}",
+        lambda: to_json(origen.resolver(db, instancia)),
+        origen.ttl, origen.tags
+    )
+    return json.loads(cuerpo)
+
+
+def resolver_origenes(
+    db: Session,
+    instancia: ActividadCurricularInstancia,
+    claves: Iterable[Optional[str]]
+) -> Dict[str, Any]:
+    """Datos de cada clave distinta de `claves` (una llamada por resolver)."""
+    datos: Dict[str, Any] = {}
+    for clave in claves:
+        if not clave or clave in datos:
+            continue
+        origen = _registro.get(clave)
+        datos[clave] = _resolver(db, origen, instancia) if origen else None
+    return datos
+
+
+# --- Resolvers ---
+
+@registrar_origen("dropdown_porcentaje_justificacion")
+def resolver_porcentajes(db: Session, instancia: ActividadCurricularInstancia) -> dict:
+    return {"opciones": PORCENTAJES_DESPLEGABLE}
+
+
+# Los puntajes se escriben al cerrar la encuesta; el cierre invalida TAG_ENCUESTAS
+@registrar_origen("resultados_encuesta", ttl=3600, tags=(TAG_ENCUESTAS,))
+def resolver_resultados_encuesta(db: Session, instancia: ActividadCurricularInstancia):
+    return estadisticas_services.obtener_resultados_encuesta_informe(db, instancia.id)
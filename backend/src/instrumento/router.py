@@ -2,7 +2,9 @@
 from fastapi import APIRouter, Depends,  HTTPException, status
 from sqlalchemy.orm import Session
 from src.database import get_db
-from src.instrumento import services, schemas
+from src.instrumento import services, schemas, versiones
+from src.estadisticas import services as estadisticas_services
+from src.exceptions import BadRequest, NotFound
 from src.enumerados import EstadoInstrumento 
 from typing import List
 # --- CAMBIO: Importar el guardia de Departamento ---
@@ -67,6 +69,55 @@ def eliminar_plantilla(plantilla_id: int, db: Session = Depends(get_db)):
         raise e
 
 
+@router.post(
+    "/{plantilla_id}/versiones",
+    response_model=schemas.InstrumentoPlantilla,
+    status_code=status.HTTP_201_CREATED
+)
+def crear_nueva_version(
+    plantilla_id: int,
+    data: schemas.NuevaVersionCreate = None,
+    db: Session = Depends(get_db)
+):
+    try:
+        return versiones.crear_nueva_version(
+            db, plantilla_id,
+            titulo=data.titulo if data else None,
+            descripcion=data.descripcion if data else None
+        )
+    except NotFound as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except BadRequest as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.post(
+    "/{plantilla_id}/version-de/{anterior_id}",
+    response_model=schemas.InstrumentoPlantilla
+)
+def registrar_como_version(plantilla_id: int, anterior_id: int, db: Session = Depends(get_db)):
+    """Para plantillas que no se crearon con /versiones: las encadena y vincula sus preguntas por texto."""
+    try:
+        plantilla = versiones.registrar_como_version(db, plantilla_id, anterior_id)
+    except NotFound as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except BadRequest as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    estadisticas_services.invalidar_cache_distribuciones()
+    return plantilla
+
+
+@router.get(
+    "/{plantilla_id}/versiones",
+    response_model=List[schemas.InstrumentoPlantilla]
+)
+def listar_versiones(plantilla_id: int, db: Session = Depends(get_db)):
+    try:
+        return versiones.listar_versiones(db, plantilla_id)
+    except NotFound as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
 @router.get(
     "/{plantilla_id}", 
     response_model=schemas.InstrumentoPlantilla
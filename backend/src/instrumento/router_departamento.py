@@ -1,18 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from src.database import get_db
+from src.database import get_db, get_db_lectura
 from src.instrumento import services, schemas
 from src.persona.models import AdminDepartamento
 from src.dependencies import get_current_admin_departamento
 from src.exceptions import NotFound, BadRequest
-from src.encuestas.schemas import InformeSinteticoResultado, ResultadoCursada
-from typing import List
+from src.encuestas.schemas import InformeSinteticoResultado, ResultadoCursada, ComentariosPagina
+from typing import List, Optional
 from src.encuestas import services as encuestas_services 
 from src.persona import schemas as persona_schemas       
 from src.materia import schemas as materia_schemas
+from src.estadisticas import services as estadisticas_services, schemas as estadisticas_schemas
+from src.necesidades import services as necesidades_services, schemas as necesidades_schemas
 from src.encuestas.schemas import GenerarSinteticoResponse
 import collections
 from src.encuestas.schemas import DashboardDepartamentoStats 
+from src.system.cache import cachear, TAG_CURSADAS
+from src.system.serializacion import serializar
 
 
 
@@ -88,9 +92,10 @@ def listar_informes_sinteticos_generados(
     "/informes-sinteticos/{informe_id}/estadisticas",
     response_model=InformeSinteticoResultado
 )
+@serializar(InformeSinteticoResultado)
 def obtener_estadisticas_agregadas(
     informe_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_lectura),
     admin: AdminDepartamento = Depends(get_current_admin_departamento)
 ):
     """
@@ -111,6 +116,7 @@ def obtener_estadisticas_agregadas(
     "/profesores",
     response_model=List[persona_schemas.Profesor]
 )   
+@cachear(List[persona_schemas.Profesor], alcance="rol", tags=(TAG_CURSADAS,))
 def listar_profesores_del_departamento(
     db: Session = Depends(get_db),
     admin: AdminDepartamento = Depends(get_current_admin_departamento)
@@ -132,6 +138,7 @@ def listar_profesores_del_departamento(
     "/materias",
     response_model=List[materia_schemas.Materia]
 )
+@cachear(List[materia_schemas.Materia], alcance="rol", tags=(TAG_CURSADAS,))
 def listar_materias_del_departamento(
     db: Session = Depends(get_db),
     admin: AdminDepartamento = Depends(get_current_admin_departamento)
@@ -153,9 +160,11 @@ def listar_materias_del_departamento(
     "/estadisticas/profesor/{profesor_id}",
     response_model=List[ResultadoCursada]
 )
+@serializar(List[ResultadoCursada])
 def get_estadisticas_por_profesor(
     profesor_id: int,
-    db: Session = Depends(get_db),
+    max_comentarios: Optional[int] = Query(None, ge=0, le=encuestas_services.LIMITE_COMENTARIOS_PAGINA),
+    db: Session = Depends(get_db_lectura),
     admin: AdminDepartamento = Depends(get_current_admin_departamento)
 ):
     """
@@ -164,7 +173,9 @@ def get_estadisticas_por_profesor(
     """
     try:
         # (Esta función la crearemos en el paso 1.4)
-        return encuestas_services.obtener_resultados_agregados_para_profesor(db, profesor_id, admin.departamento_id)
+        return encuestas_services.obtener_resultados_agregados_para_profesor(
+            db, profesor_id, admin.departamento_id, max_comentarios=max_comentarios
+        )
     except (NotFound, BadRequest) as e:
         raise HTTPException(status_code=e.STATUS_CODE, detail=e.DETAIL)
     except Exception as e:
@@ -175,9 +186,11 @@ def get_estadisticas_por_profesor(
     "/estadisticas/materia/{materia_id}",
     response_model=List[ResultadoCursada]
 )
+@serializar(List[ResultadoCursada])
 def get_estadisticas_por_materia(
     materia_id: int,
-    db: Session = Depends(get_db),
+    max_comentarios: Optional[int] = Query(None, ge=0, le=encuestas_services.LIMITE_COMENTARIOS_PAGINA),
+    db: Session = Depends(get_db_lectura),
     admin: AdminDepartamento = Depends(get_current_admin_departamento)
 ):
     """
@@ -186,7 +199,9 @@ def get_estadisticas_por_materia(
     """
     try:
         # (Esta función la crearemos en el paso 1.4)
-        return encuestas_services.obtener_resultados_agregados_para_materia(db, materia_id, admin.departamento_id)
+        return encuestas_services.obtener_resultados_agregados_para_materia(
+            db, materia_id, admin.departamento_id, max_comentarios=max_comentarios
+        )
     except (NotFound, BadRequest) as e:
         raise HTTPException(status_code=e.STATUS_CODE, detail=e.DETAIL)
     except Exception as e:
@@ -194,6 +209,120 @@ def get_estadisticas_por_materia(
         raise HTTPException(status_code=500, detail="Error al obtener estadísticas.")
     
 
+@router.get(
+    "/estadisticas/instancia/{instancia_id}/preguntas/{pregunta_id}/comentarios",
+    response_model=ComentariosPagina
+)
+def get_comentarios_pregunta(
+    instancia_id: int,
+    pregunta_id: int,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(encuestas_services.LIMITE_COMENTARIOS_PAGINA, ge=1, le=encuestas_services.LIMITE_COMENTARIOS_PAGINA),
+    db: Session = Depends(get_db_lectura),
+    admin: AdminDepartamento = Depends(get_current_admin_departamento)
+):
+    """Comentarios de una pregunta abierta de una encuesta cerrada del departamento, por página."""
+    try:
+        return encuestas_services.listar_comentarios_pregunta(
+            db, instancia_id, pregunta_id, offset, limit, departamento_id=admin.departamento_id
+        )
+    except (NotFound, BadRequest) as e:
+        raise HTTPException(status_code=e.STATUS_CODE, detail=e.DETAIL)
+
+@router.get(
+    "/tendencias/profesor/{profesor_id}",
+    response_model=estadisticas_schemas.TendenciaResponse
+)
+def get_tendencias_por_profesor(
+    profesor_id: int,
+    anio_desde: Optional[int] = None,
+    anio_hasta: Optional[int] = None,
+    db: Session = Depends(get_db_lectura),
+    admin: AdminDepartamento = Depends(get_current_admin_departamento)
+):
+    """
+    Evolución por pregunta (porcentaje por opción y puntaje) de las encuestas
+    cerradas de un profesor del dpto., a lo largo de los cuatrimestres.
+    """
+    try:
+        encuestas_services._validar_profesor_en_dpto(db, profesor_id, admin.departamento_id)
+        return estadisticas_services.obtener_tendencias(db, "profesor", profesor_id, anio_desde, anio_hasta)
+    except (NotFound, BadRequest) as e:
+        raise HTTPException(status_code=e.STATUS_CODE, detail=e.DETAIL)
+    except Exception as e:
+        print(f"Error inesperado al obtener tendencias por profesor: {e}")
+        raise HTTPException(status_code=500, detail="Error al obtener tendencias.")
+
+
+@router.get(
+    "/tendencias/materia/{materia_id}",
+    response_model=estadisticas_schemas.TendenciaResponse
+)
+def get_tendencias_por_materia(
+    materia_id: int,
+    anio_desde: Optional[int] = None,
+    anio_hasta: Optional[int] = None,
+    db: Session = Depends(get_db_lectura),
+    admin: AdminDepartamento = Depends(get_current_admin_departamento)
+):
+    """Igual que /tendencias/profesor pero para todas las cursadas de una materia del dpto."""
+    try:
+        encuestas_services._validar_materia_en_dpto(db, materia_id, admin.departamento_id)
+        return estadisticas_services.obtener_tendencias(db, "materia", materia_id, anio_desde, anio_hasta)
+    except (NotFound, BadRequest) as e:
+        raise HTTPException(status_code=e.STATUS_CODE, detail=e.DETAIL)
+    except Exception as e:
+        print(f"Error inesperado al obtener tendencias por materia: {e}")
+        raise HTTPException(status_code=500, detail="Error al obtener tendencias.")
+
+
+@router.get(
+    "/comparacion/profesor/{profesor_id}",
+    response_model=estadisticas_schemas.ComparacionProfesorResponse
+)
+def get_comparacion_profesor(
+    profesor_id: int,
+    db: Session = Depends(get_db_lectura),
+    admin: AdminDepartamento = Depends(get_current_admin_departamento)
+):
+    """
+    Percentil de cada pregunta de las cursadas cerradas del profesor frente
+    al resto de las cursadas del dpto. y de la facultad.
+    """
+    try:
+        encuestas_services._validar_profesor_en_dpto(db, profesor_id, admin.departamento_id)
+        return estadisticas_services.obtener_comparacion_profesor(db, profesor_id, admin.departamento_id)
+    except (NotFound, BadRequest) as e:
+        raise HTTPException(status_code=e.STATUS_CODE, detail=e.DETAIL)
+    except Exception as e:
+        print(f"Error inesperado al obtener la comparación del profesor: {e}")
+        raise HTTPException(status_code=500, detail="Error al obtener la comparación.")
+
+
+@router.get(
+    "/necesidades/temas",
+    response_model=necesidades_schemas.TemasNecesidadesResponse
+)
+def get_temas_necesidades(
+    anio: Optional[int] = None,
+    db: Session = Depends(get_db_lectura),
+    admin: AdminDepartamento = Depends(get_current_admin_departamento)
+):
+    """
+    Temas y términos más mencionados en las necesidades (sección 1) de los
+    informes del dpto. Sin `anio`, los del último año con datos.
+    """
+    try:
+        if not admin.departamento_id:
+            raise BadRequest(detail="Admin sin departamento asignado.")
+        return necesidades_services.obtener_temas_necesidades(db, admin.departamento_id, anio)
+    except (NotFound, BadRequest) as e:
+        raise HTTPException(status_code=e.STATUS_CODE, detail=e.DETAIL)
+    except Exception as e:
+        print(f"Error inesperado al obtener temas de necesidades: {e}")
+        raise HTTPException(status_code=500, detail="Error al obtener las necesidades.")
+
+
 @router.get(
     "/instancia/{instancia_id}/autocompletar",
     response_model=schemas.ResumenResponse
@@ -225,7 +354,7 @@ def autocompletar_seccion(
     response_model=DashboardDepartamentoStats
 )
 def get_dashboard_general_departamento(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_lectura),
     admin: AdminDepartamento = Depends(get_current_admin_departamento)
 ):
     """
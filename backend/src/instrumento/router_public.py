@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from src.database import get_db
 from src.instrumento import services, schemas
 from src.enumerados import TipoInstrumento
+from src.system.cache import cachear, TAG_PLANTILLAS
 
 router = APIRouter(prefix="/instrumentos", tags=["Instrumentos"])
 
@@ -11,6 +12,7 @@ router = APIRouter(prefix="/instrumentos", tags=["Instrumentos"])
     "/plantilla/{tipo_instrumento}", 
     response_model=schemas.InstrumentoPlantilla
 )
+@cachear(schemas.InstrumentoPlantilla, alcance="global", tags=(TAG_PLANTILLAS,))
 def get_plantilla_por_tipo(tipo_instrumento: TipoInstrumento, db: Session = Depends(get_db)):
     try:
         return services.get_plantilla_por_tipo(db, tipo_instrumento)
@@ -23,6 +25,7 @@ def get_plantilla_por_tipo(tipo_instrumento: TipoInstrumento, db: Session = Depe
     "/reportes-academicos/{id_instrumento}",
     response_model=schemas.InstrumentoCompleto,
 )
+@cachear(schemas.InstrumentoCompleto, alcance="global", tags=(TAG_PLANTILLAS,))
 def get_reporte_academico_completo(id_instrumento: int, db: Session = Depends(get_db)):
     try:
         return services.get_instrumento_completo(db, id_instrumento)
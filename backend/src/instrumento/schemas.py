@@ -1,7 +1,7 @@
 
 from pydantic import BaseModel
 from src.enumerados import TipoInstrumento, EstadoInstrumento, EstadoInforme
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from src.seccion.schemas import Seccion
 from datetime import datetime
 
@@ -15,6 +15,8 @@ class InstrumentoPlantilla(InstrumentoPlantillaCreate):
     id: int
     estado: EstadoInstrumento
     anexo: Optional[str] = None
+    version: int = 1
+    version_anterior_id: Optional[int] = None
     
     class Config:
         from_attributes = True
@@ -24,6 +26,12 @@ class InstrumentoPlantillaUpdate(BaseModel):
     descripcion: Optional[str] = None
 
 
+class NuevaVersionCreate(BaseModel):
+    """Datos opcionales de la versión nueva (por defecto, los de la anterior)."""
+    titulo: Optional[str] = None
+    descripcion: Optional[str] = None
+
+
 class InformeCurricularSimple(BaseModel):
     id: int
     materia_nombre: str
@@ -73,6 +81,9 @@ class InstrumentoCompleto(InstrumentoPlantilla):
 
     cantidad_inscriptos: Optional[int] = 0
 
+    # Datos de los campos dinámicos por clave de origen_datos (ver instrumento/origenes.py)
+    datos_origen: Dict[str, Any] = {}
+
 #Para el pdf del informe sintetico
 class PreguntaRespondida(BaseModel):
     pregunta_texto: str
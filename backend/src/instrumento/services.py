@@ -35,6 +35,12 @@ from src.respuesta.models import (
 )
 from src.seccion.models import Seccion
 from src.encuestas.models import EncuestaInstancia
+from src.system.jobs import registrar_trabajo, Progreso
+from src.estadisticas import services as estadisticas_services
+from src.necesidades import services as necesidades_services
+from src.respuesta.versiones import obtener_ultimo_set_id
+from src.system.cache import invalidar, TAG_PLANTILLAS
+from src.instrumento.origenes import resolver_origenes
 
 
 # Schemas
@@ -92,6 +98,7 @@ def crear_instrumento_plantilla(
             raise ValueError("Tipo de instrumento no válido")
     db.add(db_plantilla)
     db.commit()
+    invalidar(TAG_PLANTILLAS)
     db.refresh(db_plantilla)
     
     return db_plantilla
@@ -125,6 +132,7 @@ def publicar_plantilla(
     db_plantilla.estado = EstadoInstrumento.PUBLICADA
     db.add(db_plantilla)
     db.commit()
+    invalidar(TAG_PLANTILLAS)
     db.refresh(db_plantilla)
     return db_plantilla
 
@@ -136,6 +144,7 @@ def eliminar_plantilla(db: Session, plantilla_id: int):
     
     db.delete(db_plantilla)
     db.commit()
+    invalidar(TAG_PLANTILLAS)
     return
 
 def actualizar_plantilla(
@@ -153,6 +162,7 @@ def actualizar_plantilla(
     
     db.add(db_plantilla)
     db.commit()
+    invalidar(TAG_PLANTILLAS)
     db.refresh(db_plantilla)
     return db_plantilla
 
@@ -223,6 +233,12 @@ def get_plantilla_para_instancia_reporte(
     
     resultado.cantidad_inscriptos = cant_alumnos
 
+    # Campos dinámicos: un resolver por clave de origen_datos, no uno por pregunta
+    resultado.datos_origen = resolver_origenes(
+        db, instancia,
+        (p.origen_datos for seccion in plantilla_db.secciones for p in seccion.preguntas)
+    )
+
     return resultado
 
 def generar_informe_sintetico_para_departamento(
@@ -247,7 +263,7 @@ def generar_informe_sintetico_para_departamento(
     stmt_plantilla = select(InformeSintetico.id).where(
         InformeSintetico.estado == EstadoInstrumento.PUBLICADA,
         InformeSintetico.tipo == TipoInstrumento.INFORME_SINTETICO
-    ).limit(1)
+    ).order_by(InformeSintetico.id.desc()).limit(1)  # la última versión publicada
     
     plantilla_sintetico_id = db.scalars(stmt_plantilla).first()
     if not plantilla_sintetico_id:
@@ -307,6 +323,27 @@ def generar_informe_sintetico_para_departamento(
     return nueva_instancia_sintetica
 
 
+@registrar_trabajo("generar_informe_sintetico")
+def trabajo_generar_informe_sintetico(
+    db: Session,
+    progreso: Progreso,
+    departamento_id: int,
+    fecha_fin_informe: Optional[str] = None
+) -> dict:
+    """Versión en segundo plano de generar_informe_sintetico_para_departamento."""
+    progreso(10, "Buscando informes completados del departamento")
+    instancia = generar_informe_sintetico_para_departamento(
+        db=db,
+        departamento_id=departamento_id,
+        fecha_fin_informe=datetime.fromisoformat(fecha_fin_informe) if fecha_fin_informe else None
+    )
+    return {
+        "instancia_id": instancia.id,
+        "departamento_id": instancia.departamento_id,
+        "cantidad_informes": len(instancia.actividades_curriculares_instancia),
+    }
+
+
 def get_plantilla_para_instancia_sintetico(
     db: Session,
     instancia_id: int,
@@ -361,17 +398,15 @@ def generar_resumen_por_seccion(db: Session, instancia_sintetico_id: int, numero
         profesor_nombre = aci.profesor.nombre if aci.profesor else "Profesor"
         
         # 3. Buscar el RespuestaSet del ACI (el último creado)
-        respuesta_set = db.query(RespuestaSet).filter_by(
-            instrumento_instancia_id=aci.id
-        ).order_by(RespuestaSet.created_at.desc()).first()
+        ultimo_set_id = obtener_ultimo_set_id(db, aci.id)
 
-        if not respuesta_set:
+        if ultimo_set_id is None:
             continue
 
         # 4. Buscar Respuestas de Redacción
         respuestas_texto = db.query(RespuestaRedaccion).join(Pregunta).join(Seccion)\
             .filter(
-                RespuestaRedaccion.respuesta_set_id == respuesta_set.id,
+                RespuestaRedaccion.respuesta_set_id == ultimo_set_id,
                 Seccion.nombre.startswith(numero_seccion) 
             ).all()
 
@@ -523,6 +558,10 @@ def obtener_estadisticas_informe_sintetico(
                 resultados_por_pregunta=preguntas_de_esta_seccion
             ))
 
+    estadisticas_services.calcular_estadisticas(
+        pregunta for seccion in resultados_secciones for pregunta in seccion.resultados_por_pregunta
+    )
+
     return encuestas_schemas.InformeSinteticoResultado(
         informe_id=informe.id,
         departamento_nombre=informe.departamento.nombre if informe.departamento else "Departamento",
@@ -551,10 +590,7 @@ def obtener_dashboard_departamento(
         .options(
             selectinload(ActividadCurricularInstancia.respuesta_sets)
             .selectinload(RespuestaSet.respuestas.of_type(RespuestaMultipleChoice))
-            .selectinload(RespuestaMultipleChoice.opcion),
-            selectinload(ActividadCurricularInstancia.respuesta_sets)
-            .selectinload(RespuestaSet.respuestas.of_type(RespuestaRedaccion))
-            .selectinload(RespuestaRedaccion.pregunta)
+            .selectinload(RespuestaMultipleChoice.opcion)
         )
     ).distinct()
     
@@ -575,8 +611,6 @@ def obtener_dashboard_departamento(
         "76% - 100%": 0
     }
     
-    necesidades = []
-
     for informe in informes:
         # Solo analizamos informes con respuestas
         if not informe.respuesta_sets: continue
@@ -591,14 +625,9 @@ def obtener_dashboard_departamento(
                 texto_opcion = resp.opcion.texto
                 if texto_opcion in conteo_cobertura:
                     conteo_cobertura[texto_opcion] += 1
-            
-            # B. Detectar Necesidades (Sección 1)
-            if isinstance(resp, RespuestaRedaccion) and resp.pregunta:
-                # Filtramos por el texto de la pregunta de la Sección 1
-                if "necesidades de equipamiento" in resp.pregunta.texto.lower() and resp.texto:
-                    if len(resp.texto) > 5: # Ignorar respuestas vacías o muy cortas
-                        materia = informe.cursada.materia.nombre if informe.cursada else "Desconocida"
-                        necesidades.append(f"[{materia}] {resp.texto[:100]}...")
+
+    # B. Necesidades (Sección 1): precalculadas al enviar cada informe (ver src/necesidades)
+    temas = necesidades_services.obtener_temas_necesidades(db, admin.departamento_id, limite=5)
 
     # Formatear datos para el gráfico
     stats_cobertura = [
@@ -610,7 +639,9 @@ def obtener_dashboard_departamento(
         informes_pendientes=pendientes,
         informes_completados=completados,
         cobertura_contenidos=stats_cobertura,
-        necesidades_recientes=necesidades[:5] # Solo las 5 más recientes
+        necesidades_recientes=necesidades_services.necesidades_recientes(db, admin.departamento_id),
+        temas_necesidades=temas.temas,
+        anio_temas_necesidades=temas.anio
     )
 
 #para el pdf del informe sintetico
@@ -629,9 +660,8 @@ def obtener_informe_sintetico_respondido(
         raise BadRequest(detail="No tiene permisos para ver este informe.")
 
     # 2. Buscar las respuestas (tomamos el último set de respuestas guardado)
-    respuesta_set = db.query(RespuestaSet).filter(
-        RespuestaSet.instrumento_instancia_id == informe_id
-    ).order_by(RespuestaSet.created_at.desc()).first()
+    ultimo_set_id = obtener_ultimo_set_id(db, informe_id)
+    respuesta_set = db.get(RespuestaSet, ultimo_set_id) if ultimo_set_id is not None else None
 
     # Mapa rápido de respuestas: { pregunta_id: "Texto de respuesta" }
     respuestas_map = {}
@@ -0,0 +1,244 @@
+"""
+Versiones de las plantillas (encuestas e informes).
+
+Una plantilla publicada no se edita: para cambiarla se crea una versión nueva
+con `crear_nueva_version`, que copia secciones, preguntas y opciones a un
+borrador y lo encadena con la anterior (`version_anterior_id`, `version` y
+`version_raiz_id`, el id de la primera versión). Las instancias siguen
+apuntando a la versión con la que se crearon (plantilla_id /
+actividad_curricular_id / informe_sintetico_id), así los resultados viejos se
+leen contra las preguntas que efectivamente se respondieron. Cada pregunta
+copiada se registra en `pregunta_canonica` con el id de la pregunta original,
+y las estadísticas longitudinales (tendencias, percentiles) agrupan por ese id
+en lugar del de cada versión.
+
+La copia no pasa por el ORM: es un INSERT ... SELECT por tabla. Los ids de las
+filas copiadas son id original + desplazamiento (MAX(id) de la tabla - MIN(id)
+copiado + 1), así las FKs entre copias (pregunta → sección, opción →
+pregunta) se calculan en el mismo SELECT sin leer las filas. Como con
+CargadorMasivo, la copia tiene que ser el único escritor de esas tablas
+mientras dura la transacción: en SQLite lo es, porque el INSERT de la
+plantilla toma el lock de escritura antes de leer los MAX.
+"""
+from typing import Dict, List, Optional
+
+from sqlalchemy import Table, select, insert, func, or_, text, inspect
+from sqlalchemy.orm import Session, aliased
+
+from src.enumerados import EstadoInstrumento
+from src.exceptions import BadRequest, NotFound
+from src.instrumento.models import InstrumentoBase
+from src.seccion.models import Seccion
+from src.pregunta.models import Pregunta, PreguntaRedaccion, PreguntaMultipleChoice, Opcion, PreguntaCanonica
+from src.system.cache import invalidar, TAG_PLANTILLAS
+
+secciones = Seccion.__table__
+preguntas = Pregunta.__table__
+opciones = Opcion.__table__
+canonicas = PreguntaCanonica.__table__
+
+
+def _desplazamiento(db: Session, tabla: Table, ids_origen) -> Optional[int]:
+    """Cuánto sumarle a los ids copiados para que caigan después del último de la tabla (None si no hay filas)."""
+    maximo, minimo = db.execute(
+        select(func.max(tabla.c.id), select(func.min(ids_origen.c.id)).scalar_subquery())
+    ).one()
+    if minimo is None:
+        return None
+    return (maximo or 0) - minimo + 1
+
+
+def _copiar(db: Session, tabla: Table, origen, reemplazos: Dict[str, object]) -> int:
+    """
+    INSERT INTO tabla SELECT ... FROM origen: las columnas que no están en
+    `reemplazos` se copian tal cual (incluidas las que se agreguen al modelo).
+    """
+    columnas = [c.name for c in tabla.c]
+    filas = select(*[reemplazos.get(nombre, origen.c[nombre]) for nombre in columnas])
+    return db.execute(insert(tabla).from_select(columnas, filas)).rowcount
+
+
+def _ajustar_secuencias(db: Session, tablas: List[Table]) -> None:
+    """En PostgreSQL los ids explícitos no avanzan la secuencia: se la lleva al MAX(id)."""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for tabla in tablas:
+        db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{tabla.name}', 'id'), "
+            f"(SELECT COALESCE(MAX(id), 1) FROM {tabla.name}))"
+        ))
+
+
+def copiar_estructura(db: Session, origen_id: int, destino_id: int) -> Dict[str, int]:
+    """
+    Copia las secciones de `origen_id` (con sus preguntas y opciones) a
+    `destino_id`. Devuelve las filas copiadas por tabla. No hace commit.
+    """
+    copiadas = {}
+
+    secciones_origen = select(secciones).where(secciones.c.instrumento_id == origen_id).subquery()
+    desp_secciones = _desplazamiento(db, secciones, secciones_origen)
+    if desp_secciones is None:
+        return copiadas
+    copiadas[secciones.name] = _copiar(db, secciones, secciones_origen, {
+        "id": secciones_origen.c.id + desp_secciones,
+        "instrumento_id": destino_id,
+    })
+
+    ids_preguntas = (
+        select(preguntas.c.id)
+        .join(secciones, secciones.c.id == preguntas.c.seccion_id)
+        .where(secciones.c.instrumento_id == origen_id)
+    )
+    preguntas_origen = select(preguntas).where(preguntas.c.id.in_(ids_preguntas)).subquery()
+    desp_preguntas = _desplazamiento(db, preguntas, preguntas_origen)
+    if desp_preguntas is None:
+        return copiadas
+    copiadas[preguntas.name] = _copiar(db, preguntas, preguntas_origen, {
+        "id": preguntas_origen.c.id + desp_preguntas,
+        "seccion_id": preguntas_origen.c.seccion_id + desp_secciones,
+    })
+    # Cada copia conserva la pregunta canónica de su original (ver PreguntaCanonica)
+    db.execute(insert(canonicas).from_select(
+        ["pregunta_id", "canonica_id"],
+        select(
+            preguntas_origen.c.id + desp_preguntas,
+            func.coalesce(canonicas.c.canonica_id, preguntas_origen.c.id),
+        ).select_from(
+            preguntas_origen.outerjoin(canonicas, canonicas.c.pregunta_id == preguntas_origen.c.id)
+        )
+    ))
+    copiadas[canonicas.name] = copiadas[preguntas.name]
+    # Tablas hijas de la herencia: solo tienen el id
+    for modelo in (PreguntaRedaccion, PreguntaMultipleChoice):
+        hija = inspect(modelo).local_table
+        hijas_origen = select(hija).where(hija.c.id.in_(ids_preguntas)).subquery()
+        copiadas[hija.name] = _copiar(db, hija, hijas_origen, {"id": hijas_origen.c.id + desp_preguntas})
+
+    opciones_origen = select(opciones).where(opciones.c.pregunta_id.in_(ids_preguntas)).subquery()
+    desp_opciones = _desplazamiento(db, opciones, opciones_origen)
+    if desp_opciones is not None:
+        copiadas[opciones.name] = _copiar(db, opciones, opciones_origen, {
+            "id": opciones_origen.c.id + desp_opciones,
+            "pregunta_id": opciones_origen.c.pregunta_id + desp_preguntas,
+        })
+
+    _ajustar_secuencias(db, [secciones, preguntas, opciones])
+    return copiadas
+
+
+def crear_nueva_version(
+    db: Session,
+    plantilla_id: int,
+    titulo: Optional[str] = None,
+    descripcion: Optional[str] = None
+) -> InstrumentoBase:
+    """
+    Crea la versión siguiente de una plantilla publicada, en borrador y con
+    la misma estructura. Solo se versiona la última de la cadena.
+    """
+    origen = db.get(InstrumentoBase, plantilla_id)
+    if not origen:
+        raise NotFound(detail=f"Plantilla con id {plantilla_id} no encontrada.")
+    if origen.estado != EstadoInstrumento.PUBLICADA:
+        raise BadRequest(detail="La plantilla está en borrador: se puede editar sin crear una versión.")
+    posterior = db.scalar(select(InstrumentoBase.id).where(InstrumentoBase.version_anterior_id == origen.id))
+    if posterior is not None:
+        raise BadRequest(detail=f"La plantilla ya tiene una versión posterior (id {posterior}).")
+
+    nueva = type(origen)(
+        titulo=titulo or origen.titulo,
+        descripcion=descripcion if descripcion is not None else origen.descripcion,
+        anexo=origen.anexo,
+        estado=EstadoInstrumento.BORRADOR,
+        version=origen.version + 1,
+        version_anterior_id=origen.id,
+        version_raiz_id=origen.version_raiz_id or origen.id,
+    )
+    db.add(nueva)
+    try:
+        db.flush()
+        copiar_estructura(db, origen.id, nueva.id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    invalidar(TAG_PLANTILLAS)
+    db.refresh(nueva)
+    return nueva
+
+
+def vincular_preguntas(db: Session, plantilla_id: int, anterior_id: int) -> int:
+    """
+    Para plantillas armadas a mano (o con seed_plantilla) en lugar de
+    clonadas: cada pregunta de `plantilla_id` que todavía no tiene pregunta
+    canónica toma la de la pregunta de `anterior_id` con la misma sección,
+    texto y tipo. Un solo INSERT ... SELECT. No hace commit.
+    """
+    nueva, vieja = aliased(Pregunta), aliased(Pregunta)
+    seccion_nueva, seccion_vieja = aliased(Seccion), aliased(Seccion)
+    vieja_canonica = aliased(PreguntaCanonica)
+    filas = (
+        select(nueva.id, func.min(func.coalesce(vieja_canonica.canonica_id, vieja.id)))
+        .join(seccion_nueva, seccion_nueva.id == nueva.seccion_id)
+        .join(seccion_vieja, (seccion_vieja.nombre == seccion_nueva.nombre) & (seccion_vieja.instrumento_id == anterior_id))
+        .join(vieja, (vieja.seccion_id == seccion_vieja.id) & (vieja.texto == nueva.texto) & (vieja.tipo == nueva.tipo))
+        .outerjoin(vieja_canonica, vieja_canonica.pregunta_id == vieja.id)
+        .where(
+            seccion_nueva.instrumento_id == plantilla_id,
+            ~select(PreguntaCanonica.pregunta_id).where(PreguntaCanonica.pregunta_id == nueva.id).exists(),
+        )
+        .group_by(nueva.id)
+    )
+    return db.execute(insert(canonicas).from_select(["pregunta_id", "canonica_id"], filas)).rowcount
+
+
+def registrar_como_version(db: Session, plantilla_id: int, anterior_id: int) -> InstrumentoBase:
+    """
+    Encadena una plantilla existente como versión siguiente de `anterior_id`
+    (ej: la del año que se armó de cero) y vincula sus preguntas por texto,
+    así las tendencias la agrupan con las versiones anteriores.
+    """
+    plantilla = db.get(InstrumentoBase, plantilla_id)
+    anterior = db.get(InstrumentoBase, anterior_id)
+    if not plantilla or not anterior:
+        raise NotFound(detail=f"Plantilla con id {plantilla_id if not plantilla else anterior_id} no encontrada.")
+    if plantilla.id == anterior.id or plantilla.tipo != anterior.tipo:
+        raise BadRequest(detail="Las plantillas tienen que ser distintas y del mismo tipo.")
+    if plantilla.version_anterior_id is not None or plantilla.version_raiz_id is not None:
+        raise BadRequest(detail=f"La plantilla {plantilla_id} ya es versión de otra.")
+    sucesores = db.scalar(
+        select(func.count()).where(
+            or_(InstrumentoBase.version_anterior_id.in_([plantilla.id, anterior.id]),
+                InstrumentoBase.version_raiz_id == plantilla.id)
+        )
+    )
+    if sucesores:
+        raise BadRequest(detail="Solo se puede encadenar una plantilla sin versiones al final de una cadena.")
+
+    plantilla.version = anterior.version + 1
+    plantilla.version_anterior_id = anterior.id
+    plantilla.version_raiz_id = anterior.version_raiz_id or anterior.id
+    try:
+        db.flush()
+        vincular_preguntas(db, plantilla.id, anterior.id)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    invalidar(TAG_PLANTILLAS)
+    db.refresh(plantilla)
+    return plantilla
+
+
+def listar_versiones(db: Session, plantilla_id: int) -> List[InstrumentoBase]:
+    """Todas las versiones de la cadena de `plantilla_id`, de la primera a la última."""
+    plantilla = db.get(InstrumentoBase, plantilla_id)
+    if not plantilla:
+        raise NotFound(detail=f"Plantilla con id {plantilla_id} no encontrada.")
+    raiz_id = plantilla.version_raiz_id or plantilla.id
+    return db.scalars(
+        select(InstrumentoBase)
+        .where(or_(InstrumentoBase.id == raiz_id, InstrumentoBase.version_raiz_id == raiz_id))
+        .order_by(InstrumentoBase.version, InstrumentoBase.id)
+    ).all()
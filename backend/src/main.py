@@ -2,8 +2,10 @@ import os
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi import FastAPI
-from src.database import engine
+from src.database import engine, SessionLocal, engine_lectura, SessionLectura, replica
 from src.models import ModeloBase
+from src.respuesta.models import crear_indice_texto
+from src.encuestas.bandeja import preparar_bandeja
 
 from src.encuestas.router_admin import  router_gestion
 from src.pregunta.router import router as pregunta_router
@@ -21,6 +23,11 @@ from src.departamento.router import router as depto_router
 from fastapi.middleware.cors import CORSMiddleware
 from src.instrumento.router_departamento import router as instrumento_departamento_router
 from src.system.router import router as system_router
+from src.carga_masiva.router import router as importaciones_router
+from src.system.metrics import MetricsMiddleware, instrumentar_engine
+from src.system.jobs import PoolTrabajos
+from src.system.idempotencia import IdempotenciaMiddleware
+from src.system.compresion import CompresionMiddleware
 
 
 
@@ -32,11 +39,40 @@ ROOT_PATH = os.getenv(f"ROOT_PATH_{ENV.upper()}")
 @asynccontextmanager
 async def db_creation_lifespan(app: FastAPI):
     ModeloBase.metadata.create_all(bind=engine)
+    # Bases creadas antes del índice de texto completo: se crea y se llena acá
+    with engine.begin() as conn:
+        crear_indice_texto(conn)
+        # Bandeja de encuestas activas de los alumnos, solo si está vacía (ver src/encuestas/bandeja.py)
+        preparar_bandeja(conn)
+    # Workers de trabajos en segundo plano (ver src/system/jobs.py)
+    pool_trabajos = PoolTrabajos()
+    pool_trabajos.iniciar()
+    # Réplica local para las estadísticas (solo con DB_REPLICA_ARCHIVO, ver src/database.py)
+    if replica:
+        replica.iniciar()
     yield
+    if replica:
+        replica.detener()
+    pool_trabajos.detener()
 
 
 #app = FastAPI(root_path=ROOT_PATH, lifespan=db_creation_lifespan)
 app = FastAPI(lifespan=db_creation_lifespan)  # Sin root_path
+
+# Instrumentación: consultas SQL, tiempo y latencia por ruta (ver /system/metrics)
+instrumentar_engine(engine, SessionLocal)
+instrumentar_engine(engine_lectura, SessionLectura)
+# Reintentos de envíos con Idempotency-Key: se responden sin tocar la BBDD.
+# Las claves se guardan en la memoria de ESTE proceso: supone que la API corre
+# en un solo proceso (uvicorn sin --workers, una réplica). Con varios, un
+# reintento que cae en otro proceso llega al endpoint como un envío nuevo:
+# la encuesta del alumno lo frena el UPDATE condicional de `ha_respondido`
+# (responde 200 sin guardar nada), pero un informe queda con un set más
+# (una versión nueva, ver src/respuesta/versiones.py).
+app.add_middleware(IdempotenciaMiddleware)
+app.add_middleware(MetricsMiddleware)
+# gzip/brotli para respuestas grandes (afuera de idempotencia: se guarda el cuerpo sin comprimir)
+app.add_middleware(CompresionMiddleware)
 app.add_middleware(
     CORSMiddleware,
 allow_origins=["http://localhost:5173", "http://127.0.0.1:5173", "http://localhost:5174","https://tecno-fedora.tailef1e6a.ts.net", "https://tecno-fedora.tailef1e6a.ts.net:5173"], 
@@ -61,4 +97,5 @@ app.include_router(encuesta_profesor_router)
 app.include_router(auth_router)
 app.include_router(account_router)
 app.include_router(system_router)
-app.include_router(depto_router)
\ No newline at end of file
+app.include_router(depto_router)
+app.include_router(importaciones_router)
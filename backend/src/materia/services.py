@@ -1,10 +1,12 @@
 from sqlalchemy.orm import Session
 from src.materia import models, schemas 
+from src.system.cache import invalidar, TAG_CURSADAS
 
 def crear_materia(db: Session, materia_data: schemas.MateriaCreate) -> models.Materia:
     nueva_materia = models.Materia(**materia_data.model_dump())
     db.add(nueva_materia)
     db.commit()
+    invalidar(TAG_CURSADAS)
     db.refresh(nueva_materia) 
     return nueva_materia
 
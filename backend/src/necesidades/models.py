@@ -0,0 +1,51 @@
+from __future__ import annotations
+from datetime import datetime
+
+from sqlalchemy import Integer, String, Text, DateTime, ForeignKey, JSON
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.models import ModeloBase
+
+
+class NecesidadRespuesta(ModeloBase):
+    """
+    Respuesta a una pregunta de necesidades (sección 1 del informe de actividad
+    curricular) ya ubicada por departamento y año. Es la entrada del análisis:
+    se reemplazan cada vez que se procesa el informe.
+    """
+    __tablename__ = "necesidad_respuesta"
+
+    respuesta_id: Mapped[int] = mapped_column(ForeignKey("respuestas.id", ondelete="CASCADE"), primary_key=True)
+    # Una materia puede estar en carreras de varios departamentos: una fila por cada uno
+    departamento_id: Mapped[int] = mapped_column(ForeignKey("departamentos.id"), primary_key=True)
+    actividad_instancia_id: Mapped[int] = mapped_column(ForeignKey("instrumento_instancia.id"), nullable=False, index=True)
+    anio: Mapped[int] = mapped_column(Integer, nullable=False)
+    materia_nombre: Mapped[str] = mapped_column(String, nullable=False)
+    texto: Mapped[str] = mapped_column(Text, nullable=False)
+
+
+class TerminoNecesidad(ModeloBase):
+    """Cantidad de respuestas que mencionan un término, por departamento y año."""
+    __tablename__ = "necesidad_termino"
+
+    departamento_id: Mapped[int] = mapped_column(ForeignKey("departamentos.id"), primary_key=True)
+    anio: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # Raíz normalizada (sin tildes ni plural) y la forma más usada en los textos
+    termino: Mapped[str] = mapped_column(String(100), primary_key=True)
+    forma: Mapped[str] = mapped_column(String(100), nullable=False)
+    frecuencia: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class TemaNecesidad(ModeloBase):
+    """Grupo de respuestas de necesidades que comparten su término principal."""
+    __tablename__ = "necesidad_tema"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    departamento_id: Mapped[int] = mapped_column(ForeignKey("departamentos.id"), nullable=False, index=True)
+    anio: Mapped[int] = mapped_column(Integer, nullable=False)
+    termino: Mapped[str] = mapped_column(String(100), nullable=False)
+    etiqueta: Mapped[str] = mapped_column(String(100), nullable=False)
+    cantidad: Mapped[int] = mapped_column(Integer, nullable=False)
+    terminos_relacionados: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
+    ejemplos: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
+    actualizado_en: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, nullable=False)
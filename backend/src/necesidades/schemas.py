@@ -0,0 +1,28 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class TemaNecesidad(BaseModel):
+    etiqueta: str
+    termino: str
+    cantidad: int  # respuestas agrupadas en el tema
+    terminos_relacionados: List[str]
+    ejemplos: List[str]  # "[Materia] texto..."
+
+    model_config = {"from_attributes": True}
+
+
+class TerminoNecesidad(BaseModel):
+    termino: str
+    forma: str
+    frecuencia: int
+
+    model_config = {"from_attributes": True}
+
+
+class TemasNecesidadesResponse(BaseModel):
+    departamento_id: int
+    anio: Optional[int] = None
+    anios_disponibles: List[int]
+    temas: List[TemaNecesidad]
+    terminos: List[TerminoNecesidad]
@@ -0,0 +1,302 @@
+"""
+Análisis de las necesidades (equipamiento, bibliografía) que informan los
+profesores en la sección 1 del informe de actividad curricular.
+
+Cada vez que se envía un informe se encola un trabajo que:
+  1. guarda sus respuestas de necesidades por departamento/año (NecesidadRespuesta),
+  2. recalcula, solo para esos departamentos/año, la frecuencia de cada término
+     (TerminoNecesidad) y los temas (TemaNecesidad).
+
+Los temas agrupan las respuestas por su término principal: a cada respuesta se
+le asigna, entre sus términos, el más mencionado del departamento en el año.
+Así "proyector nuevo para el aula" y "falta un proyector" caen en "proyector".
+El dashboard lee los temas ya calculados.
+"""
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select, delete, insert
+from sqlalchemy.orm import Session
+
+from src.instrumento.models import ActividadCurricularInstancia
+from src.materia.models import Cursada, Cuatrimestre, Materia, Carrera, carrera_materia_association
+from src.pregunta.models import Pregunta
+from src.respuesta.models import RespuestaSet, RespuestaRedaccion
+from src.respuesta.versiones import obtener_ultimo_set_id
+from src.system.jobs import registrar_trabajo, Progreso
+from src.necesidades import models, schemas
+
+# Preguntas del informe que se analizan (se comparan en minúsculas contra el texto)
+PREGUNTAS_NECESIDADES = ("necesidades de",)
+
+# Respuestas más cortas que esto no se analizan ("-", "no", "ninguna")
+LARGO_MINIMO = 6
+
+TEMAS_POR_BUCKET = 20
+RELACIONADOS_POR_TEMA = 3
+EJEMPLOS_POR_TEMA = 3
+
+STOPWORDS = frozenset("""
+a al algo algun alguna algunas alguno algunos ante antes aqui asi aun aunque bien cada casi como con contra cual
+cuales cuando de del desde donde dos el ella ellas ellos en entre era es esa esas ese eso esos esta estan estar
+estas este esto estos fue fueron ha hace hacer han hasta hay la las le les lo los mas me mi mientras mismo mucho
+muy nada ni no nos nosotros o otra otras otro otros para pero poco por porque que se sea segun ser si sido sin
+sobre solo su sus tambien tan tanto te tener tiene tienen todo todos tu un una uno unos y ya
+cuenta contar falta faltan necesario necesaria necesarios necesarias necesidad necesita necesitamos necesitan
+nuevo nueva nuevos nuevas ninguna ninguno actual sera seria solicita solicitamos solicitar requiere requieren
+""".split())
+
+
+def _sin_tildes(texto: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFKD", texto) if not unicodedata.combining(c))
+
+
+def raiz(palabra: str) -> str:
+    """Singular aproximado: 'proyectores' → 'proyector', 'luces' → 'luz', 'libros' → 'libro'."""
+    if len(palabra) > 4 and palabra.endswith("ces"):
+        return palabra[:-3] + "z"
+    if len(palabra) > 4 and palabra.endswith("es") and palabra[-3] not in "aeiou":
+        return palabra[:-2]
+    if len(palabra) > 3 and palabra.endswith("s") and not palabra.endswith("ss"):
+        return palabra[:-1]
+    return palabra
+
+
+def normalizar_texto(texto: str) -> List[Tuple[str, str]]:
+    """(raíz, forma) de cada palabra significativa: minúsculas, sin tildes, sin stopwords."""
+    terminos = []
+    for palabra in re.findall(r"[^\W\d_]+", texto.lower()):
+        forma = _sin_tildes(palabra)
+        if len(forma) < 3 or forma in STOPWORDS:
+            continue
+        terminos.append((raiz(forma), palabra))
+    return terminos
+
+
+def _es_pregunta_necesidades(texto: str) -> bool:
+    texto = (texto or "").lower()
+    return any(patron in texto for patron in PREGUNTAS_NECESIDADES)
+
+
+def procesar_informe(db: Session, instancia_id: int) -> Set[Tuple[int, int]]:
+    """
+    Reemplaza las NecesidadRespuesta del informe con las de su último envío.
+    Devuelve los (departamento_id, anio) afectados. No hace commit.
+    """
+    fila = db.execute(
+        select(Cursada.materia_id, Materia.nombre, Cuatrimestre.anio)
+        .select_from(ActividadCurricularInstancia)
+        .join(Cursada, ActividadCurricularInstancia.cursada_id == Cursada.id)
+        .join(Materia, Cursada.materia_id == Materia.id)
+        .join(Cuatrimestre, Cursada.cuatrimestre_id == Cuatrimestre.id)
+        .where(ActividadCurricularInstancia.id == instancia_id)
+    ).first()
+    if fila is None:
+        raise LookupError(f"ActividadCurricularInstancia {instancia_id} no encontrada.")
+    materia_id, materia_nombre, anio = fila
+
+    departamentos = db.scalars(
+        select(Carrera.departamento_id)
+        .join(carrera_materia_association, carrera_materia_association.c.carrera_id == Carrera.id)
+        .where(carrera_materia_association.c.materia_id == materia_id)
+        .distinct()
+    ).all()
+
+    ultimo_set = obtener_ultimo_set_id(db, instancia_id)
+    respuestas = []
+    if ultimo_set is not None:
+        respuestas = [
+            (respuesta_id, texto)
+            for respuesta_id, texto, pregunta_texto in db.execute(
+                select(RespuestaRedaccion.id, RespuestaRedaccion.texto, Pregunta.texto)
+                .join(Pregunta, RespuestaRedaccion.pregunta_id == Pregunta.id)
+                .where(RespuestaRedaccion.respuesta_set_id == ultimo_set)
+            )
+            if _es_pregunta_necesidades(pregunta_texto) and len((texto or "").strip()) >= LARGO_MINIMO
+        ]
+
+    anteriores = db.execute(
+        select(models.NecesidadRespuesta.departamento_id, models.NecesidadRespuesta.anio)
+        .where(models.NecesidadRespuesta.actividad_instancia_id == instancia_id)
+        .distinct()
+    ).all()
+    db.execute(delete(models.NecesidadRespuesta).where(models.NecesidadRespuesta.actividad_instancia_id == instancia_id))
+    nuevas = [
+        {
+            "respuesta_id": respuesta_id,
+            "departamento_id": departamento_id,
+            "actividad_instancia_id": instancia_id,
+            "anio": anio,
+            "materia_nombre": materia_nombre,
+            "texto": texto.strip(),
+        }
+        for respuesta_id, texto in respuestas
+        for departamento_id in departamentos
+    ]
+    if nuevas:
+        db.execute(insert(models.NecesidadRespuesta), nuevas)
+    return {(d, anio) for d in departamentos} | {tuple(a) for a in anteriores}
+
+
+def recalcular_temas(db: Session, departamento_id: int, anio: int) -> int:
+    """Recalcula términos y temas de un departamento/año. No hace commit. Devuelve la cantidad de temas."""
+    filas = db.execute(
+        select(models.NecesidadRespuesta.materia_nombre, models.NecesidadRespuesta.texto)
+        .where(models.NecesidadRespuesta.departamento_id == departamento_id, models.NecesidadRespuesta.anio == anio)
+        .order_by(models.NecesidadRespuesta.respuesta_id.desc())
+    ).all()
+
+    # Frecuencia de documento: en cuántas respuestas aparece cada raíz
+    terminos_por_respuesta: List[Set[str]] = []
+    frecuencia: Counter = Counter()
+    formas: Dict[str, Counter] = defaultdict(Counter)
+    for _, texto in filas:
+        terminos = normalizar_texto(texto)
+        raices = {r for r, _ in terminos}
+        terminos_por_respuesta.append(raices)
+        frecuencia.update(raices)
+        for r, forma in terminos:
+            formas[r][forma] += 1
+
+    # Agrupamiento: cada respuesta va al tema de su término más frecuente
+    grupos: Dict[str, List[int]] = defaultdict(list)
+    for i, raices in enumerate(terminos_por_respuesta):
+        if raices:
+            principal = min(raices, key=lambda r: (-frecuencia[r], r))
+            grupos[principal].append(i)
+
+    db.execute(delete(models.TerminoNecesidad).where(
+        models.TerminoNecesidad.departamento_id == departamento_id, models.TerminoNecesidad.anio == anio
+    ))
+    db.execute(delete(models.TemaNecesidad).where(
+        models.TemaNecesidad.departamento_id == departamento_id, models.TemaNecesidad.anio == anio
+    ))
+
+    if frecuencia:
+        db.execute(insert(models.TerminoNecesidad), [
+            {
+                "departamento_id": departamento_id,
+                "anio": anio,
+                "termino": r,
+                "forma": formas[r].most_common(1)[0][0],
+                "frecuencia": cantidad,
+            }
+            for r, cantidad in frecuencia.items()
+        ])
+
+    ordenados = sorted(grupos.items(), key=lambda g: (-len(g[1]), g[0]))[:TEMAS_POR_BUCKET]
+    ahora = datetime.now()
+    temas = []
+    for principal, indices in ordenados:
+        coocurrentes: Counter = Counter()
+        for i in indices:
+            coocurrentes.update(terminos_por_respuesta[i] - {principal})
+        relacionados = [
+            formas[r].most_common(1)[0][0]
+            for r, _ in sorted(coocurrentes.items(), key=lambda c: (-c[1], c[0]))[:RELACIONADOS_POR_TEMA]
+        ]
+        ejemplos = [f"[{filas[i][0]}] {filas[i][1][:100]}" for i in indices[:EJEMPLOS_POR_TEMA]]
+        temas.append({
+            "departamento_id": departamento_id,
+            "anio": anio,
+            "termino": principal,
+            "etiqueta": formas[principal].most_common(1)[0][0].capitalize(),
+            "cantidad": len(indices),
+            "terminos_relacionados": relacionados,
+            "ejemplos": ejemplos,
+            "actualizado_en": ahora,
+        })
+    if temas:
+        db.execute(insert(models.TemaNecesidad), temas)
+    return len(temas)
+
+
+def procesar_necesidades(
+    db: Session,
+    instancias_ids: Optional[List[int]] = None,
+    progreso: Optional[Progreso] = None
+) -> dict:
+    """
+    Procesa los informes indicados y recalcula los departamentos/años que tocan.
+    Sin `instancias_ids` reprocesa todos los informes con respuestas (carga
+    inicial o datos importados). No hace commit.
+    """
+    if instancias_ids is None:
+        instancias_ids = db.scalars(
+            select(ActividadCurricularInstancia.id)
+            .join(RespuestaSet, RespuestaSet.instrumento_instancia_id == ActividadCurricularInstancia.id)
+            .distinct()
+        ).all()
+
+    afectados: Set[Tuple[int, int]] = set()
+    for n, instancia_id in enumerate(instancias_ids, start=1):
+        afectados |= procesar_informe(db, instancia_id)
+        if progreso and n % 100 == 0:
+            progreso(50 * n / len(instancias_ids), f"{n}/{len(instancias_ids)} informes procesados")
+
+    temas = 0
+    for n, (departamento_id, anio) in enumerate(sorted(afectados), start=1):
+        temas += recalcular_temas(db, departamento_id, anio)
+        if progreso:
+            progreso(50 + 50 * n / len(afectados))
+    return {"informes": len(instancias_ids), "departamentos_anios": len(afectados), "temas": temas}
+
+
+@registrar_trabajo("procesar_necesidades")
+def trabajo_procesar_necesidades(db: Session, progreso: Progreso, instancia_id: Optional[int] = None) -> dict:
+    """Se encola al enviar un informe (con `instancia_id`) o a mano para reprocesar todo."""
+    return procesar_necesidades(db, [instancia_id] if instancia_id is not None else None, progreso)
+
+
+def obtener_temas_necesidades(
+    db: Session,
+    departamento_id: int,
+    anio: Optional[int] = None,
+    limite: int = TEMAS_POR_BUCKET
+) -> schemas.TemasNecesidadesResponse:
+    """Temas y términos precalculados del departamento; sin `anio`, los del último año con datos."""
+    anios = db.scalars(
+        select(models.TemaNecesidad.anio)
+        .where(models.TemaNecesidad.departamento_id == departamento_id)
+        .distinct()
+        .order_by(models.TemaNecesidad.anio.desc())
+    ).all()
+    if anio is None and anios:
+        anio = anios[0]
+
+    temas, terminos = [], []
+    if anio is not None:
+        temas = db.scalars(
+            select(models.TemaNecesidad)
+            .where(models.TemaNecesidad.departamento_id == departamento_id, models.TemaNecesidad.anio == anio)
+            .order_by(models.TemaNecesidad.cantidad.desc(), models.TemaNecesidad.termino)
+            .limit(limite)
+        ).all()
+        terminos = db.scalars(
+            select(models.TerminoNecesidad)
+            .where(models.TerminoNecesidad.departamento_id == departamento_id, models.TerminoNecesidad.anio == anio)
+            .order_by(models.TerminoNecesidad.frecuencia.desc(), models.TerminoNecesidad.termino)
+            .limit(limite)
+        ).all()
+
+    return schemas.TemasNecesidadesResponse(
+        departamento_id=departamento_id,
+        anio=anio,
+        anios_disponibles=list(anios),
+        temas=[schemas.TemaNecesidad.model_validate(t) for t in temas],
+        terminos=[schemas.TerminoNecesidad.model_validate(t) for t in terminos],
+    )
+
+
+def necesidades_recientes(db: Session, departamento_id: int, limite: int = 5) -> List[str]:
+    """Últimas respuestas de necesidades del departamento, en el formato del dashboard."""
+    filas = db.execute(
+        select(models.NecesidadRespuesta.materia_nombre, models.NecesidadRespuesta.texto)
+        .where(models.NecesidadRespuesta.departamento_id == departamento_id)
+        .order_by(models.NecesidadRespuesta.respuesta_id.desc())
+        .limit(limite)
+    ).all()
+    return [f"[{materia}] {texto[:100]}..." for materia, texto in filas]
@@ -1,16 +1,19 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List, Optional
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from src.database import get_db
+from src.database import get_db, get_db_lectura
 from src.persona import schemas, services
 from src.dependencies import get_current_profesor 
 from src.persona.models import Profesor
 from src.encuestas import services as profesor_services 
-from src.exceptions import BadRequest
+from src.exceptions import BadRequest, NotFound, PermissionDenied
 from src.encuestas import schemas as encuestas_schemas
 from src.materia import schemas as materia_schemas
+from src.estadisticas import services as estadisticas_services, schemas as estadisticas_schemas
 from src.materia.models import Sede
+from src.system.cache import cachear, TAG_CURSADAS
+from src.system.serializacion import serializar
 class SedeSimple(BaseModel):
     id: int
     localidad: str
@@ -33,11 +36,13 @@ router_profesor = APIRouter(prefix="/profesor", tags=["Profesor"])
     "/mis-resultados",
     response_model=List[encuestas_schemas.ResultadoCursada]
 )
+@serializar(List[encuestas_schemas.ResultadoCursada])
 def get_mis_encuestas_cerradas(
     cuatrimestre_id: Optional[int] = None,
     anio: Optional[int] = None,
     materia_id: Optional[int] = None, 
-    db: Session = Depends(get_db),
+    max_comentarios: Optional[int] = Query(None, ge=0, le=profesor_services.LIMITE_COMENTARIOS_PAGINA),
+    db: Session = Depends(get_db_lectura),
     profesor_actual: Profesor = Depends(get_current_profesor)
 ):
     try:
@@ -46,7 +51,8 @@ def get_mis_encuestas_cerradas(
             profesor_id=profesor_actual.id,
             cuatrimestre_id=cuatrimestre_id,
             anio=anio,
-            materia_id=materia_id
+            materia_id=materia_id,
+            max_comentarios=max_comentarios
         )
         return instancias_cerradas
     except Exception as e:
@@ -59,6 +65,7 @@ def get_mis_encuestas_cerradas(
     "/mis-materias",
     response_model=List[materia_schemas.Materia]
 )
+@cachear(List[materia_schemas.Materia], alcance="usuario", tags=(TAG_CURSADAS,))
 def get_mis_materias(
     db: Session = Depends(get_db),
     profesor_actual: Profesor = Depends(get_current_profesor)
@@ -70,8 +77,63 @@ def get_mis_materias(
         print(f"Error al listar materias del profesor: {e}")
         raise BadRequest(detail="Error al obtener las materias.")
 
+@router_profesor.get(
+    "/mis-tendencias",
+    response_model=estadisticas_schemas.TendenciaResponse
+)
+def get_mis_tendencias(
+    materia_id: Optional[int] = None,
+    anio_desde: Optional[int] = None,
+    anio_hasta: Optional[int] = None,
+    db: Session = Depends(get_db_lectura),
+    profesor_actual: Profesor = Depends(get_current_profesor)
+):
+    """Evolución de los resultados de mis encuestas cerradas, por pregunta y cuatrimestre."""
+    return estadisticas_services.obtener_tendencias(
+        db, "profesor", profesor_actual.id, anio_desde, anio_hasta, materia_id=materia_id
+    )
+
+@router_profesor.get(
+    "/resultados/{instancia_id}/preguntas/{pregunta_id}/comentarios",
+    response_model=encuestas_schemas.ComentariosPagina
+)
+def get_comentarios_pregunta(
+    instancia_id: int,
+    pregunta_id: int,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(profesor_services.LIMITE_COMENTARIOS_PAGINA, ge=1, le=profesor_services.LIMITE_COMENTARIOS_PAGINA),
+    db: Session = Depends(get_db_lectura),
+    profesor_actual: Profesor = Depends(get_current_profesor)
+):
+    """Comentarios de una pregunta abierta de una encuesta cerrada del profesor, por página."""
+    try:
+        return profesor_services.listar_comentarios_pregunta(
+            db, instancia_id, pregunta_id, offset, limit, profesor_id=profesor_actual.id
+        )
+    except NotFound as e:
+        raise HTTPException(status_code=e.STATUS_CODE, detail=e.DETAIL)
+
+@router_profesor.get(
+    "/informes/{instancia_id}/resultados-encuesta",
+    response_model=estadisticas_schemas.ResultadosEncuestaInforme
+)
+def get_resultados_encuesta_informe(
+    instancia_id: int,
+    db: Session = Depends(get_db_lectura),
+    profesor_actual: Profesor = Depends(get_current_profesor)
+):
+    """
+    Valores de las secciones B a E de la encuesta de la cursada de un informe
+    de actividad curricular (pregunta 2.B), sin recalcular todo el historial.
+    """
+    try:
+        return estadisticas_services.obtener_resultados_encuesta_informe(db, instancia_id, profesor_actual.id)
+    except (NotFound, PermissionDenied) as e:
+        raise HTTPException(status_code=e.STATUS_CODE, detail=e.DETAIL)
+
 # --- Endpoint de Sedes ---
 @router_profesor.get("/mis-sedes", response_model=List[SedeSimple])
+@cachear(List[SedeSimple], alcance="usuario", tags=(TAG_CURSADAS,))
 def get_mis_sedes(
     db: Session = Depends(get_db),
     profesor: Profesor = Depends(get_current_profesor)
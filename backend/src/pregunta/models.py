@@ -74,4 +74,17 @@ class Opcion(ModeloBase):
     
     respuestas: Mapped[List["RespuestaMultipleChoice"]] = relationship(
         "RespuestaMultipleChoice", back_populates="opcion"
-    )
\ No newline at end of file
+    )
+
+class PreguntaCanonica(ModeloBase):
+    """
+    Identidad de una pregunta a través de las versiones de su plantilla: la
+    copia de una pregunta apunta al id de la pregunta original (la de la
+    primera versión). Las preguntas sin fila son su propia pregunta canónica,
+    así que las consultas usan COALESCE(canonica_id, pregunta_id).
+    """
+    __tablename__ = "pregunta_canonica"
+
+    pregunta_id: Mapped[int] = mapped_column(ForeignKey("preguntas.id", ondelete="CASCADE"), primary_key=True)
+    # Sin FK: si se borra la versión original, el código sigue agrupando a las copias
+    canonica_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from src.pregunta import models, schemas
 from src.exceptions import NotFound 
 from src.seccion.models import Seccion
+from src.system.cache import invalidar, TAG_PLANTILLAS
 
 
 def crear_pregunta(db: Session, pregunta_data: schemas.PreguntaCreate) -> models.Pregunta: # Devuelve el modelo base
@@ -39,6 +40,7 @@ def crear_pregunta(db: Session, pregunta_data: schemas.PreguntaCreate) -> models
 
     db.add(nueva_pregunta)
     db.commit()
+    invalidar(TAG_PLANTILLAS)
 
     db.refresh(nueva_pregunta)
     return nueva_pregunta
\ No newline at end of file
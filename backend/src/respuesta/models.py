@@ -1,9 +1,9 @@
 from __future__ import annotations
-from sqlalchemy import Integer, String, ForeignKey, Text, Enum
+from sqlalchemy import Integer, String, ForeignKey, Text, Enum, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import Optional, List, TYPE_CHECKING  # <--- Importar TYPE_CHECKING
 from src.models import ModeloBase
-from sqlalchemy import Column, DateTime, func
+from sqlalchemy import Column, DateTime, func, event, text
 
 from src.enumerados import TipoPregunta
 
@@ -15,6 +15,9 @@ if TYPE_CHECKING:
 
 class RespuestaSet(ModeloBase):
     __tablename__ = "respuesta_set"
+    __table_args__ = (
+        Index("ix_respuesta_set_instancia_creado", "instrumento_instancia_id", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -84,4 +87,70 @@ class RespuestaMultipleChoice(Respuesta):
     # Configuración de Herencia
     __mapper_args__ = {
         "polymorphic_identity": TipoPregunta.MULTIPLE_CHOICE,
-    }
\ No newline at end of file
+    }
+
+
+class BorradorRespuesta(ModeloBase):
+    """
+    Respuesta en borrador de un informe todavía pendiente: una fila por
+    (instancia, pregunta), que el autoguardado pisa en el lugar. Vive aparte de
+    RespuestaSet para que los borradores no aparezcan en estadísticas ni
+    búsquedas; al enviar el informe se vuelcan a un set y se borran.
+    """
+    __tablename__ = "respuesta_borrador"
+
+    instrumento_instancia_id: Mapped[int] = mapped_column(
+        ForeignKey("instrumento_instancia.id"), primary_key=True
+    )
+    pregunta_id: Mapped[int] = mapped_column(ForeignKey("preguntas.id"), primary_key=True)
+    opcion_id: Mapped[Optional[int]] = mapped_column(ForeignKey("opciones.id"), nullable=True)
+    texto: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    actualizado_en = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+# --- Índice de texto completo sobre respuesta_redaccion (SQLite FTS5) ---
+# Tabla FTS de contenido externo: guarda solo el índice, el texto sigue en
+# respuesta_redaccion. Los triggers la mantienen al día con cualquier INSERT,
+# UPDATE o DELETE, incluso los que no pasan por el ORM (ej: CargadorMasivo).
+TABLA_FTS_RESPUESTAS = "respuesta_redaccion_fts"
+
+_DDL_INDICE_TEXTO = [
+    f"""CREATE VIRTUAL TABLE {TABLA_FTS_RESPUESTAS} USING fts5(
+        texto, content='respuesta_redaccion', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS respuesta_redaccion_fts_ai AFTER INSERT ON respuesta_redaccion BEGIN
+        INSERT INTO {TABLA_FTS_RESPUESTAS}(rowid, texto) VALUES (new.id, new.texto);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS respuesta_redaccion_fts_ad AFTER DELETE ON respuesta_redaccion BEGIN
+        INSERT INTO {TABLA_FTS_RESPUESTAS}({TABLA_FTS_RESPUESTAS}, rowid, texto) VALUES ('delete', old.id, old.texto);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS respuesta_redaccion_fts_au AFTER UPDATE OF texto ON respuesta_redaccion BEGIN
+        INSERT INTO {TABLA_FTS_RESPUESTAS}({TABLA_FTS_RESPUESTAS}, rowid, texto) VALUES ('delete', old.id, old.texto);
+        INSERT INTO {TABLA_FTS_RESPUESTAS}(rowid, texto) VALUES (new.id, new.texto);
+    END""",
+]
+
+
+def crear_indice_texto(conn) -> None:
+    """
+    Crea el índice FTS y sus triggers si no existen. Si la tabla de respuestas
+    ya tenía datos (base anterior al índice) lo llena con un 'rebuild'.
+    En otros motores no hace nada: la búsqueda cae a un LIKE.
+    """
+    if conn.dialect.name != "sqlite":
+        return
+    existe = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :nombre"),
+        {"nombre": TABLA_FTS_RESPUESTAS}
+    ).first()
+    if existe:
+        return
+    for sentencia in _DDL_INDICE_TEXTO:
+        conn.exec_driver_sql(sentencia)
+    conn.exec_driver_sql(f"INSERT INTO {TABLA_FTS_RESPUESTAS}({TABLA_FTS_RESPUESTAS}) VALUES ('rebuild')")
+
+
+@event.listens_for(RespuestaRedaccion.__table__, "after_create")
+def _crear_indice_texto_al_crear_tabla(target, connection, **kw):
+    crear_indice_texto(connection)
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from src.database import get_db
+from src.database import get_db, get_db_lectura
 from src.respuesta import schemas as respuesta_schemas
 from src.respuesta import services as respuesta_services
-from src.persona.models import Alumno, Profesor
-from src.dependencies import get_current_alumno, get_current_profesor
-from src.exceptions import NotFound, BadRequest
+from src.persona.models import Alumno, Profesor, Persona
+from src.enumerados import TipoPersona
+from src.dependencies import get_current_alumno, get_current_profesor, get_current_admin_departamento_o_secretaria
+from src.exceptions import NotFound, BadRequest, PermissionDenied
 
 router = APIRouter(tags=["Respuestas"])
 
@@ -19,14 +23,23 @@ def responder_encuesta_completa(
     db: Session = Depends(get_db),
     alumno_actual: Alumno = Depends(get_current_alumno)
 ):
+    """
+    Envío único de la encuesta. Si el alumno ya había respondido devuelve 200
+    sin volver a escribir nada. Los reintentos con `Idempotency-Key` los
+    resuelve IdempotenciaMiddleware (src/system/idempotencia.py).
+    """
     try:
-        respuesta_services.crear_submission_anonima(
+        nuevo_set = respuesta_services.crear_submission_anonima(
             db=db,
             instancia_id=instancia_id,
             alumno_id=alumno_actual.id,
             respuestas_data=respuestas_data
         )
-        return {"message": "Respuestas enviadas correctamente. ¡Gracias!"}
+        if nuevo_set is None:
+            status_code, cuerpo = 200, {"message": "Esta encuesta ya había sido respondida. No se registraron cambios."}
+        else:
+            status_code, cuerpo = 201, {"message": "Respuestas enviadas correctamente. ¡Gracias!"}
+        return JSONResponse(status_code=status_code, content=cuerpo)
     except BadRequest as e:
         raise HTTPException(status_code=400, detail=str(e))
     except NotFound as e:
@@ -60,4 +73,109 @@ def responder_reporte_completa(
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
          print(f"Error inesperado al procesar respuestas: {e}")
-         raise HTTPException(status_code=500, detail="Ocurrió un error procesando las respuestas.")
\ No newline at end of file
+         raise HTTPException(status_code=500, detail="Ocurrió un error procesando las respuestas.")
+
+
+@router.put(
+    "/reportes-abiertas/instancia/{instancia_id}/borrador",
+    response_model=respuesta_schemas.BorradorGuardadoResponse
+)
+def autoguardar_reporte(
+    instancia_id: int,
+    respuestas_data: respuesta_schemas.RespuestaSetCreate,
+    db: Session = Depends(get_db),
+    profesor: Profesor = Depends(get_current_profesor)
+):
+    """
+    Guarda en el borrador del informe solo las respuestas enviadas (las que
+    cambiaron desde el último autoguardado). Se vuelca al enviar con /responder.
+    """
+    try:
+        return respuesta_services.guardar_borrador_profesor(
+            db=db,
+            instancia_id=instancia_id,
+            profesor_id=profesor.id,
+            respuestas_data=respuestas_data
+        )
+    except BadRequest as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except NotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except PermissionDenied as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except Exception as e:
+         print(f"Error inesperado al guardar borrador: {e}")
+         raise HTTPException(status_code=500, detail="Ocurrió un error guardando el borrador.")
+
+
+@router.get(
+    "/reportes-abiertas/instancia/{instancia_id}/borrador",
+    response_model=respuesta_schemas.BorradorResponse
+)
+def obtener_borrador_reporte(
+    instancia_id: int,
+    db: Session = Depends(get_db),
+    profesor: Profesor = Depends(get_current_profesor)
+):
+    try:
+        return respuesta_services.obtener_borrador_profesor(db, instancia_id, profesor.id)
+    except NotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except PermissionDenied as e:
+        raise HTTPException(status_code=403, detail=str(e))
+
+
+@router.delete(
+    "/reportes-abiertas/instancia/{instancia_id}/borrador",
+    status_code=204
+)
+def descartar_borrador_reporte(
+    instancia_id: int,
+    db: Session = Depends(get_db),
+    profesor: Profesor = Depends(get_current_profesor)
+):
+    try:
+        respuesta_services.descartar_borrador_profesor(db, instancia_id, profesor.id)
+    except BadRequest as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except NotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except PermissionDenied as e:
+        raise HTTPException(status_code=403, detail=str(e))
+
+
+@router.get(
+    "/respuestas/buscar",
+    response_model=respuesta_schemas.BusquedaRespuestasResponse
+)
+def buscar_respuestas(
+    q: str = Query(..., min_length=2, description="Palabras a buscar (todas deben aparecer)"),
+    departamento_id: Optional[int] = None,
+    anio: Optional[int] = None,
+    seccion_id: Optional[int] = None,
+    pagina: int = Query(1, ge=1),
+    tamanio_pagina: int = Query(respuesta_services.TAMANIO_PAGINA_BUSQUEDA, ge=1, le=100),
+    db: Session = Depends(get_db_lectura),
+    current_user: Persona = Depends(get_current_admin_departamento_o_secretaria)
+):
+    """
+    Búsqueda de texto completo en las respuestas abiertas (comentarios de
+    alumnos e informes). Un admin de departamento solo busca en el suyo;
+    secretaría puede filtrar por cualquier departamento o buscar en todos.
+    """
+    try:
+        if current_user.tipo == TipoPersona.ADMIN_DEPARTAMENTO:
+            if current_user.departamento_id is None:
+                raise PermissionDenied(detail="No tiene un departamento asignado.")
+            if departamento_id is not None and departamento_id != current_user.departamento_id:
+                raise PermissionDenied(detail="Solo puede buscar en su departamento.")
+            departamento_id = current_user.departamento_id
+        return respuesta_services.buscar_respuestas_texto(
+            db, q, departamento_id=departamento_id, anio=anio, seccion_id=seccion_id,
+            pagina=pagina, tamanio_pagina=tamanio_pagina
+        )
+    except (NotFound, BadRequest, PermissionDenied) as e:
+        raise HTTPException(status_code=e.STATUS_CODE, detail=e.detail)
+    except Exception as e:
+        print(f"Error inesperado en la búsqueda de respuestas: {e}")
+        raise HTTPException(status_code=500, detail="Error al buscar respuestas.")
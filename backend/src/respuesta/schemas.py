@@ -2,6 +2,8 @@ from pydantic import BaseModel, Field, model_validator
 from typing import Optional, List
 from datetime import datetime
 
+from src.enumerados import TipoInstrumento
+
 class RespuestaIndividualCreate(BaseModel):
     pregunta_id: int
     opcion_id: Optional[int] = None
@@ -37,4 +39,45 @@ class RespuestaSetResponse(BaseModel):
     created_at: datetime
     respuestas: List[RespuestaResponse]
 
-    model_config = {"from_attributes": True}
\ No newline at end of file
+    model_config = {"from_attributes": True}
+
+class ResultadoBusquedaRespuesta(BaseModel):
+    respuesta_id: int
+    fragmento: str  # extracto con los términos encontrados entre [ ]
+    relevancia: Optional[float] = None  # bm25: más bajo = más relevante
+    instancia_id: int
+    tipo_instrumento: TipoInstrumento
+    pregunta_id: int
+    pregunta_texto: str
+    seccion_id: Optional[int] = None
+    seccion_nombre: Optional[str] = None
+    materia_nombre: Optional[str] = None
+    anio: Optional[int] = None
+
+
+class BusquedaRespuestasResponse(BaseModel):
+    consulta: str
+    total: int
+    pagina: int
+    tamanio_pagina: int
+    resultados: List[ResultadoBusquedaRespuesta]
+
+
+class BorradorRespuestaItem(BaseModel):
+    pregunta_id: int
+    opcion_id: Optional[int] = None
+    texto: Optional[str] = None
+
+    model_config = {"from_attributes": True}
+
+
+class BorradorResponse(BaseModel):
+    instancia_id: int
+    respuestas: List[BorradorRespuestaItem]
+    actualizado_en: Optional[datetime] = None  # último autoguardado
+
+
+class BorradorGuardadoResponse(BaseModel):
+    instancia_id: int
+    recibidas: int
+    modificadas: int  # las que cambiaron respecto del borrador guardado
@@ -1,12 +1,25 @@
+import re
+from datetime import datetime, timezone
+from typing import Optional
+
 from sqlalchemy.orm import Session
-from sqlalchemy import update
+from sqlalchemy import update, select, delete, func, or_, text, literal_column, extract
+from sqlalchemy.dialects import sqlite as dialecto_sqlite, postgresql as dialecto_postgresql
+from sqlalchemy.sql import table, column
 from src.enumerados import EstadoInstancia, EstadoInforme
 from src.respuesta import models as respuesta_models, schemas as respuesta_schemas
-from src.instrumento.models import ActividadCurricularInstancia, InformeSinteticoInstancia
+from src.instrumento.models import InstrumentoInstancia, ActividadCurricularInstancia, InformeSinteticoInstancia
 from src.encuestas.models import EncuestaInstancia
 from src.pregunta.models import Pregunta, Opcion, TipoPregunta
 from src.exceptions import NotFound, BadRequest, PermissionDenied
 from src.persona.models import Inscripcion
+from src.materia.models import Cursada, Cuatrimestre, Materia, Carrera, carrera_materia_association
+from src.seccion.models import Seccion
+from src.system.jobs import encolar_trabajo
+from src.respuesta.versiones import obtener_ultimo_set_id
+from src.encuestas import bandeja
+# Registra el trabajo "procesar_necesidades" que se encola al enviar un informe
+from src.necesidades import services as necesidades_services  # noqa: F401
 
 
 def _procesar_y_guardar_respuestas(
@@ -68,8 +81,16 @@ def crear_submission_anonima(
     instancia_id: int,
     alumno_id: int,
     respuestas_data: respuesta_schemas.RespuestaSetCreate
-) -> respuesta_models.RespuestaSet:
+) -> Optional[respuesta_models.RespuestaSet]:
+    """
+    Guarda las respuestas de un alumno una sola vez. Devuelve None si el alumno
+    ya había respondido (reintento, doble click): en ese caso no se escribe nada.
 
+    El UPDATE condicional sobre `ha_respondido` va primero y en la misma
+    transacción que el RespuestaSet: de dos envíos simultáneos solo uno lo
+    cambia, y si algo falla después el rollback lo deja como estaba. El set no
+    guarda quién respondió, así que el anonimato se mantiene.
+    """
     # 1. Validaciones Específicas (Alumno)
     instancia = db.get(EncuestaInstancia, instancia_id)
     if not instancia:
@@ -77,24 +98,41 @@ def crear_submission_anonima(
     if instancia.estado != EstadoInstancia.ACTIVA:
          raise BadRequest(f"La encuesta instancia {instancia_id} no está activa.")
 
-    # 2. Crear RespuestaSet
-    nuevo_set = respuesta_models.RespuestaSet(instrumento_instancia_id=instancia_id)
-    db.add(nuevo_set)
-    db.flush() 
-
-    # 3. Usar lógica común
-    _procesar_y_guardar_respuestas(db, nuevo_set.id, respuestas_data.respuestas)
-
-    # 4. Efecto Secundario Específico (Marcar inscripción como respondida)
-    stmt_update = (
+    # 2. Reservar el envío: solo pasa si la inscripción todavía no respondió
+    reservado = db.execute(
         update(Inscripcion)
-        .where(Inscripcion.cursada_id == instancia.cursada_id) 
-        .where(Inscripcion.alumno_id == alumno_id) 
+        .where(
+            Inscripcion.cursada_id == instancia.cursada_id,
+            Inscripcion.alumno_id == alumno_id,
+            Inscripcion.ha_respondido == False,  # noqa: E712
+        )
         .values(ha_respondido=True)
-    )
-    db.execute(stmt_update)
-
-    db.commit()
+    ).rowcount
+    if not reservado:
+        ya_respondio = db.scalar(
+            select(Inscripcion.ha_respondido)
+            .where(Inscripcion.cursada_id == instancia.cursada_id, Inscripcion.alumno_id == alumno_id)
+        )
+        db.rollback()
+        if ya_respondio is None:
+            raise BadRequest("No estás inscripto en la cursada de esta encuesta.")
+        return None
+    bandeja.marcar_respondida(db, instancia_id, alumno_id)
+
+    try:
+        # 3. Crear RespuestaSet
+        nuevo_set = respuesta_models.RespuestaSet(instrumento_instancia_id=instancia_id)
+        db.add(nuevo_set)
+        db.flush() 
+
+        # 4. Usar lógica común
+        _procesar_y_guardar_respuestas(db, nuevo_set.id, respuestas_data.respuestas)
+
+        db.commit()
+    except Exception:
+        # Libera también la reserva: el alumno puede volver a intentar
+        db.rollback()
+        raise
     db.refresh(nuevo_set)
     return nuevo_set
 
@@ -118,15 +156,28 @@ def crear_submission_profesor(
     db.add(nuevo_set)
     db.flush()
 
-    # 3. Usar lógica común
-    _procesar_y_guardar_respuestas(db, nuevo_set.id, respuestas_data.respuestas)
+    # 3. Usar lógica común. Lo autoguardado completa lo que no vino en el envío
+    # (lo enviado manda) y el borrador se descarta en la misma transacción.
+    respuestas = _combinar_con_borrador(db, instancia_id, respuestas_data.respuestas)
+    _procesar_y_guardar_respuestas(db, nuevo_set.id, respuestas)
+    db.execute(
+        delete(respuesta_models.BorradorRespuesta)
+        .where(respuesta_models.BorradorRespuesta.instrumento_instancia_id == instancia_id)
+    )
 
-    # 4. Efecto Secundario Específico (Cambiar estado informe)
+    # 4. Efecto Secundario Específico (Cambiar estado informe y apuntar a la nueva versión)
     instancia.estado = EstadoInforme.COMPLETADO
+    instancia.ultimo_respuesta_set_id = nuevo_set.id
     db.add(instancia)
     
     db.commit()
     db.refresh(nuevo_set)
+
+    # 5. Análisis de necesidades en segundo plano (no bloquea el envío si falla)
+    try:
+        encolar_trabajo(db, "procesar_necesidades", {"instancia_id": instancia_id}, max_intentos=2)
+    except Exception as e:
+        print(f"ADVERTENCIA: no se pudo encolar el análisis de necesidades del informe {instancia_id}: {e}")
     return nuevo_set
 
 
@@ -158,8 +209,9 @@ def crear_submission_departamento(
     # 3. Usar lógica común
     _procesar_y_guardar_respuestas(db, nuevo_set.id, respuestas_data.respuestas)
 
-    # 4. Efecto Secundario Específico (Cambiar estado a COMPLETADO)
+    # 4. Efecto Secundario Específico (Cambiar estado a COMPLETADO y apuntar a la nueva versión)
     instancia.estado = EstadoInforme.COMPLETADO
+    instancia.ultimo_respuesta_set_id = nuevo_set.id
     db.add(instancia)
     
     db.commit()
@@ -167,6 +219,127 @@ def crear_submission_departamento(
     return nuevo_set
 
 
+# --- Borradores (autoguardado de informes de actividad curricular) ---
+
+def _combinar_con_borrador(
+    db: Session,
+    instancia_id: int,
+    respuestas: list[respuesta_schemas.RespuestaIndividualCreate]
+) -> list[respuesta_schemas.RespuestaIndividualCreate]:
+    enviadas = {r.pregunta_id for r in respuestas}
+    borrador = db.scalars(
+        select(respuesta_models.BorradorRespuesta)
+        .where(respuesta_models.BorradorRespuesta.instrumento_instancia_id == instancia_id)
+    ).all()
+    return list(respuestas) + [
+        respuesta_schemas.RespuestaIndividualCreate(pregunta_id=b.pregunta_id, opcion_id=b.opcion_id, texto=b.texto)
+        for b in borrador if b.pregunta_id not in enviadas
+    ]
+
+
+def _obtener_informe_pendiente_propio(db: Session, instancia_id: int, profesor_id: int) -> ActividadCurricularInstancia:
+    instancia = db.get(ActividadCurricularInstancia, instancia_id)
+    if not instancia:
+        raise NotFound(f"ActividadCurricularInstancia con id {instancia_id} no encontrada.")
+    if instancia.profesor_id != profesor_id:
+        raise PermissionDenied("No tienes permiso para editar el informe de otro profesor.")
+    if instancia.estado != EstadoInforme.PENDIENTE:
+        raise BadRequest(f"El informe {instancia_id} no está pendiente.")
+    return instancia
+
+
+def _validar_respuestas_en_lote(db: Session, respuestas: list[respuesta_schemas.RespuestaIndividualCreate]) -> None:
+    """Mismas reglas que _procesar_y_guardar_respuestas, con dos consultas en total."""
+    ids_preguntas = [r.pregunta_id for r in respuestas]
+    if len(set(ids_preguntas)) != len(ids_preguntas):
+        raise BadRequest("Se envió más de una respuesta para la misma pregunta.")
+
+    tipos = dict(db.execute(select(Pregunta.id, Pregunta.tipo).where(Pregunta.id.in_(ids_preguntas))).all())
+    ids_opciones = [r.opcion_id for r in respuestas if r.opcion_id is not None]
+    pregunta_de_opcion = dict(
+        db.execute(select(Opcion.id, Opcion.pregunta_id).where(Opcion.id.in_(ids_opciones))).all()
+    ) if ids_opciones else {}
+
+    for r in respuestas:
+        tipo = tipos.get(r.pregunta_id)
+        if tipo is None:
+            raise NotFound(f"Pregunta con id {r.pregunta_id} no encontrada.")
+        if tipo == TipoPregunta.REDACCION and r.texto is None:
+            raise BadRequest(f"La pregunta {r.pregunta_id} es de redacción: se espera 'texto'.")
+        if tipo == TipoPregunta.MULTIPLE_CHOICE and pregunta_de_opcion.get(r.opcion_id) != r.pregunta_id:
+            raise NotFound(f"Opción con id {r.opcion_id} no es válida para la pregunta {r.pregunta_id}.")
+
+
+def guardar_borrador_profesor(
+    db: Session,
+    instancia_id: int,
+    profesor_id: int,
+    respuestas_data: respuesta_schemas.RespuestaSetCreate
+) -> respuesta_schemas.BorradorGuardadoResponse:
+    """
+    Autoguardado: el cliente manda (con debounce) solo las respuestas que
+    cambiaron y acá se hace un upsert por pregunta. Las que llegan iguales a
+    lo guardado no se reescriben (el WHERE del ON CONFLICT las saltea).
+    """
+    _obtener_informe_pendiente_propio(db, instancia_id, profesor_id)
+    respuestas = respuestas_data.respuestas
+    if not respuestas:
+        return respuesta_schemas.BorradorGuardadoResponse(instancia_id=instancia_id, recibidas=0, modificadas=0)
+    _validar_respuestas_en_lote(db, respuestas)
+
+    filas = [
+        {"instrumento_instancia_id": instancia_id, "pregunta_id": r.pregunta_id, "opcion_id": r.opcion_id, "texto": r.texto}
+        for r in respuestas
+    ]
+    tabla = respuesta_models.BorradorRespuesta.__table__
+    dialecto = db.get_bind().dialect.name
+    if dialecto in ("sqlite", "postgresql"):
+        insert = dialecto_sqlite.insert if dialecto == "sqlite" else dialecto_postgresql.insert
+        sentencia = insert(tabla).values(filas)
+        nuevo = sentencia.excluded
+        sentencia = sentencia.on_conflict_do_update(
+            index_elements=[tabla.c.instrumento_instancia_id, tabla.c.pregunta_id],
+            set_={"opcion_id": nuevo.opcion_id, "texto": nuevo.texto, "actualizado_en": func.now()},
+            where=or_(tabla.c.opcion_id.is_distinct_from(nuevo.opcion_id), tabla.c.texto.is_distinct_from(nuevo.texto)),
+        )
+        modificadas = db.execute(sentencia).rowcount
+    else:
+        for fila in filas:
+            db.merge(respuesta_models.BorradorRespuesta(**fila, actualizado_en=datetime.now(timezone.utc)))
+        modificadas = len(filas)
+    db.commit()
+    return respuesta_schemas.BorradorGuardadoResponse(
+        instancia_id=instancia_id, recibidas=len(respuestas), modificadas=modificadas
+    )
+
+
+def obtener_borrador_profesor(db: Session, instancia_id: int, profesor_id: int) -> respuesta_schemas.BorradorResponse:
+    instancia = db.get(ActividadCurricularInstancia, instancia_id)
+    if not instancia:
+        raise NotFound(f"ActividadCurricularInstancia con id {instancia_id} no encontrada.")
+    if instancia.profesor_id != profesor_id:
+        raise PermissionDenied("No tienes permiso para ver el informe de otro profesor.")
+    borrador = db.scalars(
+        select(respuesta_models.BorradorRespuesta)
+        .where(respuesta_models.BorradorRespuesta.instrumento_instancia_id == instancia_id)
+        .order_by(respuesta_models.BorradorRespuesta.pregunta_id)
+    ).all()
+    return respuesta_schemas.BorradorResponse(
+        instancia_id=instancia_id,
+        respuestas=[respuesta_schemas.BorradorRespuestaItem.model_validate(b) for b in borrador],
+        actualizado_en=max((b.actualizado_en for b in borrador), default=None),
+    )
+
+
+def descartar_borrador_profesor(db: Session, instancia_id: int, profesor_id: int) -> None:
+    _obtener_informe_pendiente_propio(db, instancia_id, profesor_id)
+    db.execute(
+        delete(respuesta_models.BorradorRespuesta)
+        .where(respuesta_models.BorradorRespuesta.instrumento_instancia_id == instancia_id)
+    )
+    db.commit()
+
+
 def obtener_respuestas_por_instancia(db: Session, instancia_id: int) -> dict:
     """
     Recupera las respuestas de la última versión (RespuestaSet) guardada para una instancia.
@@ -174,12 +347,10 @@ def obtener_respuestas_por_instancia(db: Session, instancia_id: int) -> dict:
     Donde valor es 'texto' (str) o 'opcion_id' (int).
     """
     # 1. Buscar el último set de respuestas
-    respuesta_set = db.query(respuesta_models.RespuestaSet).filter(
-        respuesta_models.RespuestaSet.instrumento_instancia_id == instancia_id
-    ).order_by(respuesta_models.RespuestaSet.created_at.desc()).first()
-
-    if not respuesta_set:
+    ultimo_set_id = obtener_ultimo_set_id(db, instancia_id)
+    if ultimo_set_id is None:
         return {}
+    respuesta_set = db.get(respuesta_models.RespuestaSet, ultimo_set_id)
 
     # 2. Mapear respuestas
     respuestas_dict = {}
@@ -191,4 +362,159 @@ def obtener_respuestas_por_instancia(db: Session, instancia_id: int) -> dict:
             # Casteamos a RespuestaMultipleChoice para acceder a .opcion_id
             respuestas_dict[r.pregunta_id] = r.opcion_id
     
-    return respuestas_dict
\ No newline at end of file
+    return respuestas_dict
+
+
+# --- Búsqueda de texto completo ---
+
+TAMANIO_PAGINA_BUSQUEDA = 20
+# Palabras de contexto alrededor de los términos en cada fragmento
+PALABRAS_FRAGMENTO = 16
+
+
+def _expresion_fts(consulta: str) -> str:
+    """
+    'proyector aula' → '"proyector"* "aula"*': cada palabra entre comillas (así
+    los caracteres especiales de FTS5 no rompen la consulta) y como prefijo,
+    para que "proyector" encuentre también "proyectores". Todas deben aparecer.
+    """
+    palabras = re.findall(r"\w+", consulta)
+    if not palabras:
+        raise BadRequest(detail="La búsqueda no tiene palabras.")
+    return " ".join(f'"{p}"*' for p in palabras)
+
+
+def _escapar_like(palabra: str) -> str:
+    """'nota_final' → 'nota\\_final': los comodines de LIKE se buscan literalmente."""
+    return palabra.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def buscar_respuestas_texto(
+    db: Session,
+    consulta: str,
+    departamento_id: Optional[int] = None,
+    anio: Optional[int] = None,
+    seccion_id: Optional[int] = None,
+    pagina: int = 1,
+    tamanio_pagina: int = TAMANIO_PAGINA_BUSQUEDA
+) -> respuesta_schemas.BusquedaRespuestasResponse:
+    """
+    Busca en todas las respuestas de texto (encuestas, informes de actividad
+    curricular e informes sintéticos) usando el índice FTS5 de
+    respuesta_redaccion, ordenadas por relevancia (bm25). El departamento sale
+    de la materia de la cursada o, en los sintéticos, del propio informe; el
+    año, del cuatrimestre de la cursada o de la fecha de inicio del sintético.
+    """
+    expresion = _expresion_fts(consulta)
+    pagina = max(1, pagina)
+
+    respuestas = respuesta_models.Respuesta.__table__
+    redaccion = respuesta_models.RespuestaRedaccion.__table__
+    sets = respuesta_models.RespuestaSet.__table__
+    instancias = InstrumentoInstancia.__table__
+    encuestas = EncuestaInstancia.__table__
+    actividades = ActividadCurricularInstancia.__table__
+    sinteticos = InformeSinteticoInstancia.__table__
+    preguntas = Pregunta.__table__
+
+    cursada_id = func.coalesce(encuestas.c.cursada_id, actividades.c.cursada_id)
+    anio_instancia = func.coalesce(Cuatrimestre.anio, extract("year", instancias.c.fecha_inicio))
+
+    if db.get_bind().dialect.name == "sqlite":
+        fts = table(respuesta_models.TABLA_FTS_RESPUESTAS, column("rowid"))
+        tabla_fts = literal_column(respuesta_models.TABLA_FTS_RESPUESTAS)
+        base = (
+            select()
+            .select_from(fts)
+            .join(respuestas, respuestas.c.id == fts.c.rowid)
+            .where(text(f"{respuesta_models.TABLA_FTS_RESPUESTAS} MATCH :expresion").bindparams(expresion=expresion))
+        )
+        fragmento = func.snippet(tabla_fts, 0, "[", "]", "…", PALABRAS_FRAGMENTO)
+        relevancia = func.bm25(tabla_fts)
+        orden = [relevancia, respuestas.c.id.desc()]
+    else:
+        # Sin FTS5: ILIKE por palabra. Es una aproximación: encuentra la palabra en
+        # cualquier parte del texto (no solo como prefijo), distingue acentos y no
+        # ordena por relevancia ni resalta el fragmento.
+        base = (
+            select()
+            .select_from(redaccion)
+            .join(respuestas, respuestas.c.id == redaccion.c.id)
+            .where(*[
+                redaccion.c.texto.ilike(f"%{_escapar_like(p)}%", escape="\\")
+                for p in re.findall(r"\w+", consulta)
+            ])
+        )
+        fragmento = func.substr(redaccion.c.texto, 1, 200)
+        relevancia = literal_column("NULL")
+        orden = [respuestas.c.id.desc()]
+
+    base = (
+        base
+        .join(sets, respuestas.c.respuesta_set_id == sets.c.id)
+        .join(instancias, sets.c.instrumento_instancia_id == instancias.c.id)
+        .outerjoin(encuestas, encuestas.c.id == instancias.c.id)
+        .outerjoin(actividades, actividades.c.id == instancias.c.id)
+        .outerjoin(sinteticos, sinteticos.c.id == instancias.c.id)
+        .outerjoin(Cursada, Cursada.id == cursada_id)
+        .outerjoin(Cuatrimestre, Cursada.cuatrimestre_id == Cuatrimestre.id)
+        .join(preguntas, respuestas.c.pregunta_id == preguntas.c.id)
+    )
+    if departamento_id is not None:
+        materias_dpto = (
+            select(carrera_materia_association.c.materia_id)
+            .join(Carrera, carrera_materia_association.c.carrera_id == Carrera.id)
+            .where(Carrera.departamento_id == departamento_id)
+        )
+        base = base.where(or_(Cursada.materia_id.in_(materias_dpto), sinteticos.c.departamento_id == departamento_id))
+    if anio is not None:
+        base = base.where(anio_instancia == anio)
+    if seccion_id is not None:
+        base = base.where(preguntas.c.seccion_id == seccion_id)
+
+    total = db.scalar(base.add_columns(func.count()))
+
+    filas = db.execute(
+        base
+        .outerjoin(Materia, Cursada.materia_id == Materia.id)
+        .outerjoin(Seccion, preguntas.c.seccion_id == Seccion.id)
+        .add_columns(
+            respuestas.c.id,
+            fragmento.label("fragmento"),
+            relevancia.label("relevancia"),
+            instancias.c.id.label("instancia_id"),
+            instancias.c.tipo,
+            preguntas.c.id.label("pregunta_id"),
+            preguntas.c.texto.label("pregunta_texto"),
+            preguntas.c.seccion_id,
+            Seccion.nombre.label("seccion_nombre"),
+            Materia.nombre.label("materia_nombre"),
+            anio_instancia.label("anio"),
+        )
+        .order_by(*orden)
+        .limit(tamanio_pagina)
+        .offset((pagina - 1) * tamanio_pagina)
+    ).all()
+
+    return respuesta_schemas.BusquedaRespuestasResponse(
+        consulta=consulta,
+        total=total or 0,
+        pagina=pagina,
+        tamanio_pagina=tamanio_pagina,
+        resultados=[
+            respuesta_schemas.ResultadoBusquedaRespuesta(
+                respuesta_id=f.id,
+                fragmento=f.fragmento or "",
+                relevancia=round(f.relevancia, 4) if f.relevancia is not None else None,
+                instancia_id=f.instancia_id,
+                tipo_instrumento=f.tipo,
+                pregunta_id=f.pregunta_id,
+                pregunta_texto=f.pregunta_texto,
+                seccion_id=f.seccion_id,
+                seccion_nombre=f.seccion_nombre,
+                materia_nombre=f.materia_nombre,
+                anio=int(f.anio) if f.anio is not None else None,
+            )
+            for f in filas
+        ],
+    )
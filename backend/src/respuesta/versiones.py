@@ -0,0 +1,120 @@
+"""
+Versiones de las respuestas de los informes.
+
+Los informes (actividad curricular y sintético) pueden tener más de un
+RespuestaSet: cada envío o reenvío agrega uno y vale el último. Para no
+buscarlo con ORDER BY created_at en cada lectura, InstrumentoInstancia guarda
+`ultimo_respuesta_set_id`, y la compactación borra las versiones viejas.
+
+En las encuestas de alumnos cada set es la respuesta de un alumno distinto,
+no una versión: quedan fuera de todo lo de este módulo.
+"""
+from typing import Optional
+
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.orm import Session
+
+from src.enumerados import TipoInstrumento
+from src.instrumento.models import InstrumentoInstancia
+from src.necesidades.models import NecesidadRespuesta
+from src.respuesta.models import RespuestaSet, Respuesta, RespuestaRedaccion, RespuestaMultipleChoice
+from src.system.jobs import registrar_trabajo, Progreso
+
+TIPOS_CON_VERSIONES = (TipoInstrumento.ACTIVIDAD_CURRICULAR, TipoInstrumento.INFORME_SINTETICO)
+
+# Sets borrados por transacción en la compactación
+TAMANIO_LOTE_COMPACTACION = 500
+
+
+def obtener_ultimo_set_id(db: Session, instancia_id: int) -> Optional[int]:
+    """
+    Id del último RespuestaSet de un informe. Usa el puntero; si está vacío
+    (datos anteriores al puntero o cargados por fuera de los servicios) lo busca.
+    """
+    instancia = db.get(InstrumentoInstancia, instancia_id)
+    if instancia is None:
+        return None
+    if instancia.ultimo_respuesta_set_id is not None:
+        return instancia.ultimo_respuesta_set_id
+    return db.scalar(
+        select(RespuestaSet.id)
+        .where(RespuestaSet.instrumento_instancia_id == instancia_id)
+        .order_by(RespuestaSet.created_at.desc(), RespuestaSet.id.desc())
+        .limit(1)
+    )
+
+
+def actualizar_punteros_ultimo_set(db: Session) -> int:
+    """
+    Recalcula `ultimo_respuesta_set_id` de todos los informes en un UPDATE.
+    Acepta una Session o una Connection. No hace commit.
+    """
+    ultimo = (
+        select(RespuestaSet.id)
+        .where(RespuestaSet.instrumento_instancia_id == InstrumentoInstancia.id)
+        .order_by(RespuestaSet.created_at.desc(), RespuestaSet.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    return db.execute(
+        update(InstrumentoInstancia)
+        .where(InstrumentoInstancia.tipo.in_(TIPOS_CON_VERSIONES))
+        .values(ultimo_respuesta_set_id=ultimo)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def _sets_reemplazados(db: Session, conservar_previos: int) -> list[int]:
+    """Sets de informes más viejos que el último y los `conservar_previos` anteriores."""
+    orden = func.row_number().over(
+        partition_by=RespuestaSet.instrumento_instancia_id,
+        order_by=(RespuestaSet.created_at.desc(), RespuestaSet.id.desc())
+    ).label("orden")
+    versiones = (
+        select(RespuestaSet.id, orden)
+        .join(InstrumentoInstancia, RespuestaSet.instrumento_instancia_id == InstrumentoInstancia.id)
+        .where(InstrumentoInstancia.tipo.in_(TIPOS_CON_VERSIONES))
+        .subquery()
+    )
+    return db.scalars(select(versiones.c.id).where(versiones.c.orden > 1 + conservar_previos)).all()
+
+
+def _borrar_sets(db: Session, sets_ids: list[int]) -> int:
+    """Borra los sets y sus respuestas con sentencias por tabla (sin cargar objetos)."""
+    respuestas_ids = select(Respuesta.id).where(Respuesta.respuesta_set_id.in_(sets_ids))
+    db.execute(delete(NecesidadRespuesta).where(NecesidadRespuesta.respuesta_id.in_(respuestas_ids)))
+    db.execute(delete(RespuestaRedaccion).where(RespuestaRedaccion.id.in_(respuestas_ids)))
+    db.execute(delete(RespuestaMultipleChoice).where(RespuestaMultipleChoice.id.in_(respuestas_ids)))
+    borradas = db.execute(delete(Respuesta).where(Respuesta.respuesta_set_id.in_(sets_ids))).rowcount
+    db.execute(delete(RespuestaSet).where(RespuestaSet.id.in_(sets_ids)))
+    return borradas
+
+
+def compactar_respuesta_sets(
+    db: Session,
+    conservar_previos: int = 0,
+    tamanio_lote: int = TAMANIO_LOTE_COMPACTACION,
+    progreso: Optional[Progreso] = None
+) -> dict:
+    """
+    Deja en cada informe su último set (y los `conservar_previos` anteriores)
+    y borra el resto. Los punteros se recalculan antes, así nunca apuntan a un
+    set borrado. Hace commit por lote para no tomar la base por mucho tiempo.
+    """
+    actualizar_punteros_ultimo_set(db)
+    db.commit()
+
+    reemplazados = _sets_reemplazados(db, max(0, conservar_previos))
+    respuestas = 0
+    for inicio in range(0, len(reemplazados), tamanio_lote):
+        respuestas += _borrar_sets(db, reemplazados[inicio:inicio + tamanio_lote])
+        db.commit()
+        if progreso:
+            hechos = min(inicio + tamanio_lote, len(reemplazados))
+            progreso(100 * hechos / len(reemplazados), f"{hechos}/{len(reemplazados)} sets borrados")
+    return {"sets_borrados": len(reemplazados), "respuestas_borradas": respuestas}
+
+
+@registrar_trabajo("compactar_respuesta_sets")
+def trabajo_compactar_respuesta_sets(db: Session, progreso: Progreso, conservar_previos: int = 0) -> dict:
+    return compactar_respuesta_sets(db, conservar_previos, progreso=progreso)
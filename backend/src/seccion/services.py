@@ -3,6 +3,7 @@ from sqlalchemy import select
 from src.seccion import schemas
 from sqlalchemy.orm import Session
 from src.seccion.models import Seccion
+from src.system.cache import invalidar, TAG_PLANTILLAS
 
 # Crear sección
 def crear_seccion(db: Session, seccion: schemas.SeccionCreate):
@@ -12,6 +13,7 @@ def crear_seccion(db: Session, seccion: schemas.SeccionCreate):
 
     db.add(_seccion)
     db.commit()
+    invalidar(TAG_PLANTILLAS)
     db.refresh(_seccion)
     return _seccion
 
@@ -36,6 +36,7 @@ try:
     
     # --- NUEVO IMPORT ---
     from src.auth.services import get_password_hash
+    from src.encuestas.bandeja import reconstruir_bandeja
 
 except ImportError as e:
     print(f"Error de importación: {e}")
@@ -174,6 +175,10 @@ def seed_responses(db: Session):
             print(f"   ! Error en commit: {e}")
             db.rollback()
 
+    # Las inscripciones se marcan como respondidas por fuera de los servicios
+    reconstruir_bandeja(db)
+    db.commit()
+
     print(f"\n¡Listo! Se crearon {total_sets_creados} encuestas respondidas.")
 
 
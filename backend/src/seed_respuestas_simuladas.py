@@ -12,7 +12,8 @@ if backend_root not in sys.path:
 
 from src.database import SessionLocal
 from src.encuestas.models import EncuestaInstancia, Encuesta
-from src.respuesta.models import RespuestaSet, RespuestaMultipleChoice, RespuestaRedaccion
+from src.respuesta.models import RespuestaSet
+from src.carga_masiva.services import CargadorMasivo
 from src.pregunta.models import PreguntaMultipleChoice
 from src.seccion.models import Seccion
 from src.enumerados import TipoPregunta, EstadoInstancia
@@ -39,6 +40,7 @@ def seed_fix_respuestas(db: Session):
     print(f"   -> Se encontraron {len(encuestas_cerradas)} encuestas cerradas.")
 
     count_rellenadas = 0
+    cargador = CargadorMasivo(db, reservar_ids=True)
 
     for instancia in encuestas_cerradas:
         # Verificar si ya tiene respuestas
@@ -61,8 +63,7 @@ def seed_fix_respuestas(db: Session):
             todas_preguntas.extend(s.preguntas)
 
         for _ in range(cantidad_alumnos_simulados):
-            rset = RespuestaSet(instrumento_instancia_id=instancia.id)
-            
+            respuestas = []
             for preg in todas_preguntas:
                 # Responder solo Multiple Choice (que es lo que grafican los charts)
                 if preg.tipo == TipoPregunta.MULTIPLE_CHOICE:
@@ -70,19 +71,14 @@ def seed_fix_respuestas(db: Session):
                     if hasattr(preg, 'opciones') and preg.opciones:
                         # Simulamos tendencia positiva (opciones con ID más alto suelen ser mejor puntaje o "Sí")
                         # Esto es solo para que el gráfico se vea bonito
-                        opcion = random.choice(preg.opciones) 
-                        
-                        db.add(RespuestaMultipleChoice(
-                            pregunta_id=preg.id,
-                            opcion_id=opcion.id,
-                            tipo=TipoPregunta.MULTIPLE_CHOICE,
-                            respuesta_set=rset
-                        ))
-            
-            db.add(rset)
+                        opcion = random.choice(preg.opciones)
+                        respuestas.append((preg.id, opcion.id, None))
+
+            cargador.agregar_respuesta_set(instancia.id, respuestas)
         
         count_rellenadas += 1
     
+    cargador.flush()
     db.commit()
     print(f"\n✅ ¡Listo! Se inyectaron datos en {count_rellenadas} encuestas vacías.")
 
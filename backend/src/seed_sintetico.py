@@ -0,0 +1,369 @@
+# backend/src/seed_sintetico.py
+"""
+Generador reproducible de datos sintéticos a gran escala.
+
+A diferencia de los otros seeds (pensados para una demo con pocos datos),
+este arma un escenario parametrizable: N departamentos, M materias por
+departamento, K cursadas por materia y por año durante Y años, con
+respuestas de alumnos distribuidas de forma realista (cada cursada tiene
+una "calidad" propia que sesga las opciones elegidas). Con la misma semilla
+genera siempre el mismo dataset.
+
+Uso (desde 'backend'):
+    python -m src.seed_sintetico --departamentos 4 --materias 10 --cursadas 2 --anios 5
+"""
+import sys
+import os
+import math
+import random
+import argparse
+from collections import Counter
+from itertools import accumulate
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import select
+
+# --- Configuración de Path ---
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_root = os.path.dirname(script_dir)
+if backend_root not in sys.path:
+    sys.path.insert(0, backend_root)
+
+from src.database import SessionLocal, engine
+from src.models import ModeloBase
+from src.seed_plantilla import seed_plantillas_data
+from src.auth.services import get_password_hash
+from src.enumerados import (
+    TipoCuatrimestre, EstadoInstancia, EstadoInforme, EstadoInstrumento, TipoPregunta
+)
+from src.materia.models import Sede, Departamento, Carrera, Materia, Cuatrimestre, Cursada, carrera_materia_association
+from src.persona.models import Profesor, Alumno, Inscripcion, AdminDepartamento, AdminSecretaria
+from src.encuestas.models import Encuesta, EncuestaInstancia
+from src.instrumento.models import ActividadCurricular, ActividadCurricularInstancia
+from src.seccion.models import Seccion
+from src.pregunta.models import PreguntaMultipleChoice
+from src.respuesta.models import RespuestaMultipleChoice, RespuestaRedaccion
+from src.carga_masiva.services import CargadorMasivo, RespuestaCruda
+from src.estadisticas.services import actualizar_distribuciones
+from src.necesidades.services import procesar_necesidades
+from src.respuesta.versiones import actualizar_punteros_ultimo_set
+from src.encuestas.bandeja import reconstruir_bandeja
+
+PREFIJO = "sint"
+PASSWORD = "123456"
+
+COMENTARIOS_ALUMNOS = [
+    "Las clases prácticas ayudaron mucho a entender la teoría.",
+    "El profesor explica con claridad y responde las consultas.",
+    "Faltó material en el aula virtual.",
+    "El proyector del aula no funcionaba bien.",
+    "Mejorar la conexión WiFi del laboratorio.",
+    "Los parciales fueron acordes a lo visto en clase.",
+    "Más ejercicios resueltos antes del examen.",
+    "Excelente predisposición de los auxiliares.",
+]
+
+FRASES_INFORME = {
+    "0.": ["Información general verificada.", "Sin cambios respecto del año anterior."],
+    "1.": [
+        "Se solicita renovar las computadoras del laboratorio.",
+        "Necesitamos un proyector nuevo para el aula 12.",
+        "Actualizar la bibliografía de la unidad 3.",
+        "Licencias de software para simulación.",
+    ],
+    "2.": [
+        "Se cumplió el cronograma previsto.",
+        "Hubo dificultades por paros y cortes de luz.",
+        "Se reforzaron los temas de la unidad 2.",
+    ],
+    "3.": ["El equipo participó de un curso de actualización.", "Se publicaron dos trabajos en congresos."],
+    "4.": ["Muy Bueno (MB) ||| Gran compromiso con la cátedra.", "Excelente (E) ||| Muy buena predisposición."],
+}
+
+
+@dataclass
+class ParametrosDataset:
+    departamentos: int = 2
+    materias_por_departamento: int = 4
+    cursadas_por_anio: int = 1
+    anios: int = 3
+    # Fijo (no el año actual): el dataset y los baselines de benchmarks/ no cambian con el calendario
+    anio_final: int = 2025
+    profesores_por_departamento: int = 3
+    alumnos_por_cursada: int = 30
+    tasa_respuesta: float = 0.7
+    semilla: int = 42
+
+
+def create_tables():
+    ModeloBase.metadata.create_all(bind=engine)
+
+
+def _pesos_opciones(cantidad: int, calidad: float, tiene_npo: bool) -> List[float]:
+    """
+    Pesos para elegir opciones ordenadas de mejor a peor. Con calidad alta la masa
+    se concentra en las primeras; la opción 'No puedo opinar' queda con peso fijo bajo.
+    """
+    validas = cantidad - 1 if tiene_npo else cantidad
+    pendiente = 2.5 * (1.0 - calidad) - 1.0
+    pesos = [math.exp(pendiente * i) for i in range(validas)]
+    if tiene_npo:
+        pesos.append(0.08 * sum(pesos))
+    return pesos
+
+
+def _cargar_plantillas(db: Session):
+    opciones_carga = (
+        selectinload(Encuesta.secciones)
+        .selectinload(Seccion.preguntas.of_type(PreguntaMultipleChoice))
+        .selectinload(PreguntaMultipleChoice.opciones)
+    )
+    encuestas = db.scalars(
+        select(Encuesta).where(Encuesta.estado == EstadoInstrumento.PUBLICADA).options(opciones_carga)
+    ).all()
+    if not encuestas:
+        raise RuntimeError("No hay plantillas de encuesta publicadas.")
+
+    informe = db.scalars(
+        select(ActividadCurricular)
+        .where(ActividadCurricular.estado == EstadoInstrumento.PUBLICADA)
+        .options(
+            selectinload(ActividadCurricular.secciones)
+            .selectinload(Seccion.preguntas.of_type(PreguntaMultipleChoice))
+            .selectinload(PreguntaMultipleChoice.opciones)
+        )
+    ).first()
+    if not informe:
+        raise RuntimeError("No hay plantilla de Actividad Curricular publicada.")
+    return encuestas, informe
+
+
+def _texto_informe(rng: random.Random, seccion_nombre: str, pregunta_texto: str) -> str:
+    if "Porcentaje" in pregunta_texto:
+        return f"{rng.choice([70, 80, 85, 90, 95, 100])}% ||| {rng.choice(FRASES_INFORME['2.'])}"
+    if "Cantidad" in pregunta_texto:
+        return str(rng.randint(15, 60))
+    for prefijo, frases in FRASES_INFORME.items():
+        if seccion_nombre.startswith(prefijo):
+            return rng.choice(frases)
+    return rng.choice(FRASES_INFORME["2."])
+
+
+def _esquema_encuesta(plantilla: Encuesta, calidad: float) -> List[tuple]:
+    """
+    Precalcula, para una cursada, (pregunta_id, opciones, pesos acumulados) de cada
+    pregunta multiple choice y (pregunta_id, None, None) de cada pregunta de redacción.
+    """
+    esquema = []
+    for seccion in plantilla.secciones:
+        for pregunta in seccion.preguntas:
+            if isinstance(pregunta, PreguntaMultipleChoice) and pregunta.opciones:
+                tiene_npo = "NPO" in pregunta.opciones[-1].texto
+                pesos = _pesos_opciones(len(pregunta.opciones), calidad, tiene_npo)
+                esquema.append((pregunta.id, [o.id for o in pregunta.opciones], list(accumulate(pesos))))
+            elif pregunta.tipo == TipoPregunta.REDACCION:
+                esquema.append((pregunta.id, None, None))
+    return esquema
+
+
+def _respuestas_encuesta(rng: random.Random, esquema: List[tuple]) -> List[RespuestaCruda]:
+    respuestas = []
+    for pregunta_id, opciones, acumulados in esquema:
+        if opciones:
+            respuestas.append((pregunta_id, rng.choices(opciones, cum_weights=acumulados)[0], None))
+        elif rng.random() < 0.3:
+            respuestas.append((pregunta_id, None, rng.choice(COMENTARIOS_ALUMNOS)))
+    return respuestas
+
+
+def _respuestas_informe(rng: random.Random, plantilla: ActividadCurricular) -> List[RespuestaCruda]:
+    respuestas = []
+    for seccion in plantilla.secciones:
+        for pregunta in seccion.preguntas:
+            if isinstance(pregunta, PreguntaMultipleChoice) and pregunta.opciones:
+                respuestas.append((pregunta.id, rng.choice(pregunta.opciones).id, None))
+            elif pregunta.tipo == TipoPregunta.REDACCION:
+                respuestas.append((pregunta.id, None, _texto_informe(rng, seccion.nombre, pregunta.texto)))
+    return respuestas
+
+
+def generar_dataset(db: Session, params: ParametrosDataset) -> Dict[str, int]:
+    """
+    Genera el dataset completo y devuelve un resumen con la cantidad de filas creadas.
+    Requiere que existan las plantillas publicadas (ver seed_plantilla.py).
+    Las filas se insertan por lotes con CargadorMasivo (sin objetos ORM).
+    """
+    rng = random.Random(params.semilla)
+    encuestas, plantilla_informe = _cargar_plantillas(db)
+    hash_password = get_password_hash(PASSWORD)  # bcrypt es lento: un único hash para todos
+    cargador = CargadorMasivo(db, reservar_ids=True)
+    resumen = Counter()
+
+    if not db.scalars(select(AdminSecretaria).filter_by(username=f"{PREFIJO}_secretaria")).first():
+        cargador.agregar(
+            AdminSecretaria, nombre="Secretaría Sintética", username=f"{PREFIJO}_secretaria", hashed_password=hash_password
+        )
+
+    anios = list(range(params.anio_final - params.anios + 1, params.anio_final + 1))
+    periodos = [TipoCuatrimestre.PRIMERO, TipoCuatrimestre.SEGUNDO, TipoCuatrimestre.ANUAL]
+    cuatrimestres: Dict[tuple, int] = {}
+    for anio in anios:
+        for periodo in periodos[:max(1, min(params.cursadas_por_anio, len(periodos)))]:
+            cuatri_id = db.scalars(select(Cuatrimestre.id).filter_by(anio=anio, periodo=periodo)).first()
+            cuatrimestres[(anio, periodo)] = cuatri_id or cargador.agregar(Cuatrimestre, anio=anio, periodo=periodo)
+
+    for d in range(1, params.departamentos + 1):
+        sede_id = cargador.agregar(Sede, localidad=f"Sede Sintética {d}")
+        depto_id = cargador.agregar(Departamento, nombre=f"Depto. Sintético {d}", sede_id=sede_id)
+        carrera_id = cargador.agregar(Carrera, nombre=f"Carrera Sintética {d}", departamento_id=depto_id)
+        cargador.agregar(
+            AdminDepartamento, nombre=f"Jefe Depto Sintético {d}", username=f"{PREFIJO}_depto{d}",
+            hashed_password=hash_password, departamento_id=depto_id
+        )
+
+        profesores = [
+            cargador.agregar(
+                Profesor, nombre=f"Profesor Sintético {d}-{p}", username=f"{PREFIJO}_prof{d}_{p}", hashed_password=hash_password
+            )
+            for p in range(1, params.profesores_por_departamento + 1)
+        ]
+        alumnos = [
+            cargador.agregar(
+                Alumno, nombre=f"Alumno Sintético {d}-{a}", username=f"{PREFIJO}_alu{d}_{a}", hashed_password=hash_password
+            )
+            for a in range(1, params.alumnos_por_cursada * 2 + 1)
+        ]
+        materias = []
+        for m in range(1, params.materias_por_departamento + 1):
+            materia_id = cargador.agregar(Materia, nombre=f"Materia Sintética {d}-{m}", descripcion="Generada por seed_sintetico")
+            cargador.agregar_fila(carrera_materia_association, carrera_id=carrera_id, materia_id=materia_id)
+            materias.append(materia_id)
+        resumen["profesores"] += len(profesores)
+        resumen["alumnos"] += len(alumnos)
+        resumen["materias"] += len(materias)
+
+        for m_idx, materia_id in enumerate(materias):
+            plantilla_encuesta = encuestas[m_idx % len(encuestas)]
+            profesor_id = profesores[m_idx % len(profesores)]
+            # Cada materia tiene un nivel base; cada cursada varía alrededor de él
+            calidad_materia = rng.betavariate(5, 2)
+
+            slots = [(anio, k) for anio in anios for k in range(params.cursadas_por_anio)]
+            for n_slot, (anio, k) in enumerate(slots):
+                periodo = periodos[k % len(periodos)]
+                # La última cursada tiene la encuesta abierta; la anterior, el informe pendiente
+                es_ultima = n_slot == len(slots) - 1
+                mes_cierre = 7 if periodo == TipoCuatrimestre.PRIMERO else 12
+
+                cursada_id = cargador.agregar(
+                    Cursada, materia_id=materia_id, cuatrimestre_id=cuatrimestres[(anio, periodo)], profesor_id=profesor_id
+                )
+                resumen["cursadas"] += 1
+
+                inscriptos = rng.sample(alumnos, params.alumnos_por_cursada)
+                respondientes = [a for a in inscriptos if rng.random() < params.tasa_respuesta]
+                for alumno_id in inscriptos:
+                    cargador.agregar(
+                        Inscripcion, alumno_id=alumno_id, cursada_id=cursada_id, ha_respondido=alumno_id in respondientes
+                    )
+                resumen["inscripciones"] += len(inscriptos)
+
+                instancia_id = cargador.agregar(
+                    EncuestaInstancia,
+                    cursada_id=cursada_id,
+                    plantilla_id=plantilla_encuesta.id,
+                    fecha_inicio=datetime(anio, mes_cierre - 2, 1),
+                    fecha_fin=None if es_ultima else datetime(anio, mes_cierre, 1),
+                    estado=EstadoInstancia.ACTIVA if es_ultima else EstadoInstancia.CERRADA,
+                )
+
+                calidad = min(0.99, max(0.01, rng.gauss(calidad_materia, 0.1)))
+                esquema = _esquema_encuesta(plantilla_encuesta, calidad)
+                fecha_respuesta = datetime(anio, mes_cierre - 1, 15)
+                for _ in respondientes:
+                    cargador.agregar_respuesta_set(instancia_id, _respuestas_encuesta(rng, esquema), fecha_respuesta)
+                resumen["respuesta_sets"] += len(respondientes)
+
+                if es_ultima:
+                    continue
+
+                pendiente = n_slot == len(slots) - 2
+                informe_id = cargador.agregar(
+                    ActividadCurricularInstancia,
+                    actividad_curricular_id=plantilla_informe.id,
+                    cursada_id=cursada_id,
+                    encuesta_instancia_id=instancia_id,
+                    profesor_id=profesor_id,
+                    estado=EstadoInforme.PENDIENTE if pendiente else EstadoInforme.COMPLETADO,
+                    fecha_inicio=datetime(anio, mes_cierre, 5),
+                    fecha_fin=datetime(anio, mes_cierre, 20)
+                )
+                resumen["informes"] += 1
+                if not pendiente:
+                    cargador.agregar_respuesta_set(
+                        informe_id, _respuestas_informe(rng, plantilla_informe), datetime(anio, mes_cierre, 20)
+                    )
+
+        cargador.flush()
+        db.commit()
+        print(f"   ✔ Departamento {d}/{params.departamentos} generado.")
+
+    # Las instancias e informes se crean ya cerrados/enviados: lo precalculado se arma acá
+    resumen["puntajes_pregunta"] = actualizar_distribuciones(db)
+    resumen["temas_necesidades"] = procesar_necesidades(db)["temas"]
+    actualizar_punteros_ultimo_set(db)
+    reconstruir_bandeja(db)
+    db.commit()
+
+    resumen["respuestas"] = (
+        cargador.contadores[RespuestaMultipleChoice.__tablename__] + cargador.contadores[RespuestaRedaccion.__tablename__]
+    )
+    return dict(resumen)
+
+
+def _parse_args(argv=None) -> ParametrosDataset:
+    base = ParametrosDataset()
+    parser = argparse.ArgumentParser(description="Genera un dataset sintético reproducible.")
+    parser.add_argument("--departamentos", type=int, default=base.departamentos)
+    parser.add_argument("--materias", type=int, default=base.materias_por_departamento, help="Materias por departamento")
+    parser.add_argument("--cursadas", type=int, default=base.cursadas_por_anio, help="Cursadas por materia y por año")
+    parser.add_argument("--anios", type=int, default=base.anios)
+    parser.add_argument("--anio-final", type=int, default=base.anio_final)
+    parser.add_argument("--profesores", type=int, default=base.profesores_por_departamento, help="Profesores por departamento")
+    parser.add_argument("--alumnos", type=int, default=base.alumnos_por_cursada, help="Alumnos inscriptos por cursada")
+    parser.add_argument("--tasa-respuesta", type=float, default=base.tasa_respuesta)
+    parser.add_argument("--semilla", type=int, default=base.semilla)
+    args = parser.parse_args(argv)
+    return ParametrosDataset(
+        departamentos=args.departamentos,
+        materias_por_departamento=args.materias,
+        cursadas_por_anio=args.cursadas,
+        anios=args.anios,
+        anio_final=args.anio_final,
+        profesores_por_departamento=args.profesores,
+        alumnos_por_cursada=args.alumnos,
+        tasa_respuesta=args.tasa_respuesta,
+        semilla=args.semilla,
+    )
+
+
+if __name__ == "__main__":
+    params = _parse_args()
+    create_tables()
+    seed_plantillas_data(SessionLocal())
+    db = SessionLocal()
+    try:
+        inicio = datetime.now()
+        print(f"🌱 Generando dataset sintético: {params}")
+        resumen = generar_dataset(db, params)
+        print(f"✅ Dataset generado en {(datetime.now() - inicio).total_seconds():.1f}s: {resumen}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        db.rollback()
+    finally:
+        db.close()
@@ -0,0 +1,280 @@
+"""
+Cache de respuestas para endpoints GET de lectura frecuente.
+
+Los datos de estos endpoints (materias de un profesor, profesores de un
+departamento, plantillas, ...) solo cambian con eventos de administración, así
+que se guarda el JSON ya serializado y se invalida por tags desde los
+servicios que los modifican:
+
+    @router.get("/mis-materias", response_model=List[Materia])
+    @cachear(List[Materia], alcance="usuario", tags=(TAG_CURSADAS,))
+    def get_mis_materias(db: Session = Depends(get_db), profesor=Depends(get_current_profesor)):
+        ...
+
+    # en el servicio que cambia los datos, después del commit:
+    invalidar(TAG_CURSADAS)
+
+Alcances de la clave (además de la función y sus parámetros de path/query):
+- "global": igual para todos los que pasan la dependencia de la ruta.
+- "rol": por tipo de usuario y departamento (dos admins del mismo
+  departamento comparten la entrada).
+- "usuario": por persona.
+
+El backend se elige con CACHE_URL: vacío usa memoria del proceso; redis://...
+usa un servidor compatible con Redis (necesita el paquete `redis`), que hace
+falta si la API corre en varios procesos para que la invalidación llegue a todos.
+"""
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Protocol, Set, Tuple
+
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+from starlette.responses import Response
+
+from src.persona.models import Persona
+from src.system.serializacion import a_json
+
+TAG_CURSADAS = "cursadas"        # cursadas, materias y su asignación a profesores/carreras
+TAG_ENCUESTAS = "encuestas"      # activación y cierre de instancias
+TAG_PLANTILLAS = "plantillas"    # plantillas de instrumentos, secciones y preguntas
+
+TTL_DEFAULT = int(os.getenv("CACHE_TTL_SEGUNDOS", "300"))
+MAX_ENTRADAS = int(os.getenv("CACHE_MAX_ENTRADAS", "5000"))
+
+
+Generaciones = Tuple[int, ...]
+
+
+class BackendCache(Protocol):
+    def obtener(self, clave: str) -> Optional[bytes]: ...
+    def generaciones(self, tags: Iterable[str]) -> Generaciones: ...
+    def guardar(
+        self, clave: str, valor: bytes, ttl: int, tags: Iterable[str], generaciones: Optional[Generaciones] = None
+    ) -> None: ...
+    def invalidar_tags(self, tags: Iterable[str]) -> None: ...
+    def limpiar(self) -> None: ...
+
+
+class BackendMemoria:
+    """
+    Dict del proceso con TTL y tope de entradas (se descartan las más viejas).
+    Cada entrada guarda sus tags, así al descartarla (por tope, vencimiento o
+    invalidación) sale también de los índices por tag. Cada tag tiene además
+    un contador de invalidaciones (generación).
+    """
+
+    def __init__(self, max_entradas: int = MAX_ENTRADAS):
+        self.max_entradas = max_entradas
+        self._entradas: "OrderedDict[str, Tuple[float, bytes, Tuple[str, ...]]]" = OrderedDict()
+        self._por_tag: Dict[str, Set[str]] = {}
+        self._generaciones: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _descartar(self, clave: str) -> None:
+        """Saca la entrada y sus referencias en los tags. Llamar con el lock tomado."""
+        entrada = self._entradas.pop(clave, None)
+        if entrada is None:
+            return
+        for tag in entrada[2]:
+            claves = self._por_tag.get(tag)
+            if claves is not None:
+                claves.discard(clave)
+                if not claves:
+                    del self._por_tag[tag]
+
+    def obtener(self, clave: str) -> Optional[bytes]:
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+            if time.monotonic() > entrada[0]:
+                self._descartar(clave)
+                return None
+            return entrada[1]
+
+    def generaciones(self, tags: Iterable[str]) -> Generaciones:
+        with self._lock:
+            return tuple(self._generaciones.get(tag, 0) for tag in tags)
+
+    def guardar(
+        self, clave: str, valor: bytes, ttl: int, tags: Iterable[str], generaciones: Optional[Generaciones] = None
+    ) -> None:
+        tags = tuple(tags)
+        with self._lock:
+            if generaciones is not None and generaciones != tuple(self._generaciones.get(t, 0) for t in tags):
+                return
+            self._descartar(clave)
+            self._entradas[clave] = (time.monotonic() + ttl, valor, tags)
+            for tag in tags:
+                self._por_tag.setdefault(tag, set()).add(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._descartar(next(iter(self._entradas)))
+
+    def invalidar_tags(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                self._generaciones[tag] = self._generaciones.get(tag, 0) + 1
+                for clave in list(self._por_tag.get(tag, ())):
+                    self._descartar(clave)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+            self._por_tag.clear()
+
+
+class BackendRedis:
+    """
+    Servidor compatible con Redis. Cada tag es un SET con las claves que lo
+    usan; invalidar borra esas claves y el SET, e incrementa el contador de
+    generación del tag.
+    """
+
+    PREFIJO = "ra:cache:"
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_URL apunta a Redis pero el paquete 'redis' no está instalado.") from e
+        self._cliente = redis.Redis.from_url(url)
+        self._watch_error = redis.WatchError
+
+    def _clave_generacion(self, tag: str) -> str:
+        return self.PREFIJO + "gen:" + tag
+
+    def obtener(self, clave: str) -> Optional[bytes]:
+        return self._cliente.get(self.PREFIJO + clave)
+
+    def generaciones(self, tags: Iterable[str]) -> Generaciones:
+        tags = list(tags)
+        if not tags:
+            return ()
+        return tuple(int(v or 0) for v in self._cliente.mget([self._clave_generacion(t) for t in tags]))
+
+    def guardar(
+        self, clave: str, valor: bytes, ttl: int, tags: Iterable[str], generaciones: Optional[Generaciones] = None
+    ) -> None:
+        tags = list(tags)
+        with self._cliente.pipeline() as pipe:
+            try:
+                # WATCH: si otro proceso invalida un tag entre la comparación y el SET, no se guarda
+                if generaciones is not None and tags:
+                    claves_gen = [self._clave_generacion(t) for t in tags]
+                    pipe.watch(*claves_gen)
+                    if tuple(int(v or 0) for v in pipe.mget(claves_gen)) != generaciones:
+                        return
+                    pipe.multi()
+                pipe.set(self.PREFIJO + clave, valor, ex=ttl)
+                for tag in tags:
+                    pipe.sadd(self.PREFIJO + "tag:" + tag, self.PREFIJO + clave)
+                pipe.execute()
+            except self._watch_error:
+                pass
+
+    def invalidar_tags(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            self._cliente.incr(self._clave_generacion(tag))
+            clave_tag = self.PREFIJO + "tag:" + tag
+            claves = self._cliente.smembers(clave_tag)
+            if claves:
+                self._cliente.delete(*claves)
+            self._cliente.delete(clave_tag)
+
+    def limpiar(self) -> None:
+        claves = list(self._cliente.scan_iter(self.PREFIJO + "*"))
+        if claves:
+            self._cliente.delete(*claves)
+
+
+def _crear_backend() -> BackendCache:
+    url = os.getenv("CACHE_URL")
+    if url:
+        return BackendRedis(url)
+    return BackendMemoria()
+
+
+_backend: BackendCache = _crear_backend()
+
+
+def configurar_backend(backend: BackendCache) -> None:
+    global _backend
+    _backend = backend
+
+
+def invalidar(*tags: str) -> None:
+    """Descarta las respuestas cacheadas con alguno de los tags. Llamar después del commit."""
+    _backend.invalidar_tags(tags)
+
+
+def obtener_o_calcular(clave: str, calcular: Callable[[], bytes], ttl: int, tags: Iterable[str]) -> bytes:
+    """
+    Bytes guardados en `clave`; si no están (o vencieron) los calcula y los
+    guarda. Si mientras se calculaban se invalidó alguno de los tags, el valor
+    puede ser anterior al cambio: se devuelve pero no se guarda.
+    """
+    cuerpo = _backend.obtener(clave)
+    if cuerpo is None:
+        tags = tuple(tags)
+        generaciones = _backend.generaciones(tags)
+        cuerpo = calcular()
+        _backend.guardar(clave, cuerpo, ttl, tags, generaciones)
+    return cuerpo
+
+
+def _alcance(persona: Optional[Persona], alcance: str) -> str:
+    if alcance == "global":
+        return "global"
+    if persona is None:
+        raise RuntimeError(f"El alcance '{alcance}' necesita una dependencia que devuelva el usuario.")
+    if alcance == "rol":
+        return f"rol:{persona.tipo}:{getattr(persona, 'departamento_id', None)}"
+    return f"usuario:{persona.id}"
+
+
+def cachear(
+    modelo: Any,
+    alcance: str = "usuario",
+    ttl: int = TTL_DEFAULT,
+    tags: Tuple[str, ...] = ()
+) -> Callable:
+    """
+    Decorador para endpoints (va debajo de @router.get). `modelo` es el mismo
+    response_model de la ruta: se usa para serializar una sola vez y guardar
+    bytes, así no quedan objetos del ORM atados a una sesión cerrada.
+
+    La dependencia del usuario se sigue resolviendo (valida el token), pero en
+    un acierto no se ejecuta nada más del endpoint.
+    """
+    if alcance not in ("global", "rol", "usuario"):
+        raise ValueError(f"Alcance de cache desconocido: {alcance}")
+    adaptador = TypeAdapter(modelo)
+
+    def decorador(endpoint: Callable) -> Callable:
+        nombre = f"{endpoint.__module__}.{endpoint.__qualname__}"
+
+        @functools.wraps(endpoint)
+        def envoltura(*args, **kwargs):
+            persona = next((v for v in kwargs.values() if isinstance(v, Persona)), None)
+            parametros = sorted(
+                (k, v) for k, v in kwargs.items() if not isinstance(v, (Session, Persona))
+            )
+            clave = f"{nombre}|{_alcance(persona, alcance)}|{parametros!r}"
+
+            cuerpo = obtener_o_calcular(
+                clave,
+                lambda: a_json(adaptador, endpoint(*args, **kwargs)),
+                ttl, tags
+            )
+            return Response(content=cuerpo, media_type="application/json")
+
+        # FastAPI lee la firma del endpoint original para armar las dependencias
+        envoltura.__signature__ = inspect.signature(endpoint)
+        return envoltura
+
+    return decorador
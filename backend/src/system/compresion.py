@@ -0,0 +1,100 @@
+"""
+Compresión de respuestas JSON/texto según el Accept-Encoding del cliente.
+
+Usa brotli si el paquete `brotli` está instalado y el cliente lo acepta; si
+no, gzip. Solo se comprimen respuestas con Content-Length de al menos
+COMPRESION_MINIMO_BYTES: las respuestas en streaming (exportaciones, sin
+largo conocido) y los binarios (PDF, planillas) pasan tal cual.
+"""
+import gzip
+import os
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # opcional: sin el paquete se usa gzip
+    brotli = None
+
+MINIMO_BYTES = int(os.getenv("COMPRESION_MINIMO_BYTES", "1024"))
+NIVEL_GZIP = 6
+NIVEL_BROTLI = 5
+
+TIPOS_COMPRIMIBLES = ("application/json", "text/")
+
+
+def elegir_codificacion(accept_encoding: str) -> Optional[str]:
+    """'br', 'gzip' o None según lo que acepta el cliente (ignora las que tienen q=0)."""
+    aceptadas = set()
+    for parte in accept_encoding.lower().split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        if parametros.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        aceptadas.add(nombre.strip())
+    if brotli is not None and "br" in aceptadas:
+        return "br"
+    if "gzip" in aceptadas:
+        return "gzip"
+    return None
+
+
+def comprimir(cuerpo: bytes, codificacion: str) -> bytes:
+    if codificacion == "br":
+        return brotli.compress(cuerpo, quality=NIVEL_BROTLI)
+    return gzip.compress(cuerpo, compresslevel=NIVEL_GZIP)
+
+
+class CompresionMiddleware:
+    """Middleware ASGI: junta el cuerpo de las respuestas comprimibles y lo manda comprimido."""
+
+    def __init__(self, app: ASGIApp, minimo_bytes: int = MINIMO_BYTES):
+        self.app = app
+        self.minimo_bytes = minimo_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        codificacion = elegir_codificacion(Headers(scope=scope).get("accept-encoding", ""))
+        if codificacion is None:
+            await self.app(scope, receive, send)
+            return
+
+        inicio: Optional[Message] = None
+        comprimible = False
+        partes: List[bytes] = []
+
+        async def enviar(mensaje: Message) -> None:
+            nonlocal inicio, comprimible
+            if mensaje["type"] == "http.response.start":
+                headers = Headers(raw=mensaje["headers"])
+                largo = headers.get("content-length")
+                comprimible = (
+                    largo is not None
+                    and int(largo) >= self.minimo_bytes
+                    and "content-encoding" not in headers
+                    and headers.get("content-type", "").startswith(TIPOS_COMPRIMIBLES)
+                )
+                if comprimible:
+                    inicio = mensaje
+                else:
+                    await send(mensaje)
+                return
+            if not comprimible or mensaje["type"] != "http.response.body":
+                await send(mensaje)
+                return
+
+            partes.append(mensaje.get("body", b""))
+            if mensaje.get("more_body", False):
+                return
+            cuerpo = comprimir(b"".join(partes), codificacion)
+            headers = MutableHeaders(raw=inicio["headers"])
+            headers["Content-Encoding"] = codificacion
+            headers["Content-Length"] = str(len(cuerpo))
+            headers.add_vary_header("Accept-Encoding")
+            await send(inicio)
+            await send({"type": "http.response.body", "body": cuerpo, "more_body": False})
+
+        await self.app(scope, receive, enviar)
@@ -0,0 +1,24 @@
+# Cantidad máxima de consultas SQL esperadas por request, clave "MÉTODO /ruta".
+# Superarla no corta el request: sólo deja un warning en el log y suma en
+# ra_query_budget_exceeded_total.
+PRESUPUESTOS_CONSULTAS: dict[str, int] = {
+    "GET /encuestas-abiertas/mis-instancias-activas": 3,
+    "GET /encuestas-abiertas/instancia/{instancia_id}/detalles": 8,
+    "POST /encuestas-abiertas/instancia/{instancia_id}/responder": 10,
+    "GET /encuestas-abiertas/dashboard": 8,
+    "GET /profesor/mis-resultados": 20,
+    "GET /departamento/estadisticas/profesor/{profesor_id}": 25,
+    "GET /departamento/estadisticas/materia/{materia_id}": 25,
+    "GET /departamento/estadisticas-generales": 10,
+    "GET /departamento/informes-sinteticos/{informe_id}/estadisticas": 12,
+    "GET /profesor/mis-tendencias": 6,
+    "GET /departamento/tendencias/profesor/{profesor_id}": 8,
+    "GET /departamento/tendencias/materia/{materia_id}": 8,
+    "GET /departamento/comparacion/profesor/{profesor_id}": 8,
+    "GET /respuestas/buscar": 6,
+    "GET /departamento/necesidades/temas": 6,
+    "PUT /reportes-abiertas/instancia/{instancia_id}/borrador": 8,
+    "GET /profesor/informes/{instancia_id}/resultados-encuesta": 4,
+    "GET /profesor/resultados/{instancia_id}/preguntas/{pregunta_id}/comentarios": 6,
+    "GET /departamento/estadisticas/instancia/{instancia_id}/preguntas/{pregunta_id}/comentarios": 10,
+}
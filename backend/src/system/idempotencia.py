@@ -0,0 +1,146 @@
+"""
+Claves de idempotencia para los envíos de formularios.
+
+El cliente manda un header `Idempotency-Key` (un UUID por intento de envío).
+La primera respuesta exitosa se guarda por (clave, usuario, ruta) y los
+reintentos con la misma clave la reciben tal cual desde el middleware, antes
+de llegar al endpoint: no se abre sesión ni se valida nada contra la BBDD (el
+usuario sale del `sub` del JWT, que solo se verifica con la firma).
+
+Solo se guarda el cuerpo de la respuesta (ej: el mensaje de confirmación),
+nunca lo enviado: en las encuestas de alumnos eso rompería el anonimato.
+
+Las claves viven en la memoria del proceso (ni en la BBDD ni en Redis, para no
+sumar escrituras a los envíos): vale solo con la API en un único proceso. Ver
+el comentario donde se registra el middleware en main.py.
+"""
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional, Set, Tuple
+
+from jose import JWTError, jwt
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from src.auth.services import SECRET_KEY, ALGORITHM
+
+HEADER_IDEMPOTENCIA = "Idempotency-Key"
+
+TTL_SEGUNDOS = int(os.getenv("IDEMPOTENCIA_TTL_SEGUNDOS", "86400"))
+
+# Cada cuánto se descartan las respuestas vencidas (en una escritura)
+INTERVALO_LIMPIEZA = 60.0
+
+# Envíos de formularios que aceptan la clave (POST)
+RUTAS_IDEMPOTENTES = (
+    re.compile(r"^/encuestas-abiertas/instancia/\d+/responder$"),
+    re.compile(r"^/reportes-abiertas/instancia/\d+/responder$"),
+    re.compile(r"^/departamento/instancia/\d+/responder$"),
+)
+
+_Clave = Tuple[str, str, str]
+_respuestas: Dict[_Clave, Tuple[float, int, bytes]] = {}
+_en_curso: Set[_Clave] = set()
+_lock = threading.Lock()
+_ultima_limpieza = 0.0
+
+
+def obtener_respuesta(clave: str, usuario: str, ruta: str) -> Optional[Tuple[int, bytes]]:
+    """(status, cuerpo) guardados para la clave, si no vencieron."""
+    with _lock:
+        guardada = _respuestas.get((clave, usuario, ruta))
+        if guardada is None:
+            return None
+        if time.monotonic() - guardada[0] > TTL_SEGUNDOS:
+            del _respuestas[(clave, usuario, ruta)]
+            return None
+        return guardada[1], guardada[2]
+
+
+def guardar_respuesta(clave: str, usuario: str, ruta: str, status_code: int, cuerpo: bytes) -> None:
+    global _ultima_limpieza
+    ahora = time.monotonic()
+    with _lock:
+        if ahora - _ultima_limpieza > INTERVALO_LIMPIEZA:
+            vencidas = [k for k, (guardada_en, _, _) in _respuestas.items() if ahora - guardada_en > TTL_SEGUNDOS]
+            for k in vencidas:
+                del _respuestas[k]
+            _ultima_limpieza = ahora
+        _respuestas[(clave, usuario, ruta)] = (ahora, status_code, cuerpo)
+
+
+def _tomar(clave: _Clave) -> bool:
+    """Marca la clave como en curso; False si otro request ya la tiene."""
+    with _lock:
+        if clave in _en_curso:
+            return False
+        _en_curso.add(clave)
+        return True
+
+
+def _liberar(clave: _Clave) -> None:
+    with _lock:
+        _en_curso.discard(clave)
+
+
+def _usuario_del_token(request: Request) -> Optional[str]:
+    """`sub` del JWT del header Authorization, sin consultar la BBDD."""
+    auth = request.headers.get("authorization", "")
+    esquema, _, token = auth.partition(" ")
+    if esquema.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("sub")
+
+
+def es_ruta_idempotente(metodo: str, ruta: str) -> bool:
+    return metodo == "POST" and any(patron.match(ruta) for patron in RUTAS_IDEMPOTENTES)
+
+
+class IdempotenciaMiddleware(BaseHTTPMiddleware):
+    """
+    Devuelve la respuesta guardada a los reintentos de un envío con la misma
+    `Idempotency-Key`. Sin header, con token inválido o fuera de
+    RUTAS_IDEMPOTENTES el request sigue de largo (el endpoint responde 401).
+    Solo se guardan respuestas 2xx: un 4xx/5xx se puede reintentar.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        clave = request.headers.get(HEADER_IDEMPOTENCIA)
+        ruta = request.url.path
+        if not clave or not es_ruta_idempotente(request.method, ruta):
+            return await call_next(request)
+
+        usuario = _usuario_del_token(request)
+        if usuario is None:
+            return await call_next(request)
+
+        guardada = obtener_respuesta(clave, usuario, ruta)
+        if guardada is not None:
+            return Response(
+                content=guardada[1], status_code=guardada[0],
+                media_type="application/json", headers={"Idempotent-Replayed": "true"}
+            )
+
+        clave_completa = (clave, usuario, ruta)
+        if not _tomar(clave_completa):
+            return JSONResponse(
+                status_code=409,
+                content={"detail": "Hay un envío en curso con la misma clave de idempotencia."}
+            )
+        try:
+            response = await call_next(request)
+            if not 200 <= response.status_code < 300:
+                return response
+            cuerpo = b"".join([parte async for parte in response.body_iterator])
+            guardar_respuesta(clave, usuario, ruta, response.status_code, cuerpo)
+            headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+            return Response(content=cuerpo, status_code=response.status_code, headers=headers)
+        finally:
+            _liberar(clave_completa)
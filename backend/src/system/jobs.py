@@ -0,0 +1,328 @@
+"""
+Trabajos en segundo plano, sin broker externo.
+
+Los trabajos se guardan en la tabla `trabajos` y los ejecuta un pool de
+threads que arranca con la app (lifespan de main.py). Cada worker toma el
+próximo trabajo pendiente con un UPDATE condicional, así que aunque haya
+varios procesos de la API contra la misma base, un trabajo corre una sola vez.
+
+Al tomarlo, el proceso anota su id en `trabajador` y mientras corre renueva
+`latido_en` cada LEASE_SEGUNDOS / 4. Un trabajo EN_CURSO cuyo último latido
+tiene más de LEASE_SEGUNDOS es de un proceso que se cortó: cualquier worker lo
+vuelve a tomar como si estuviera pendiente, mientras le queden intentos; si ya
+los agotó queda FALLIDO. Los trabajos de otros procesos
+vivos (otra réplica de la API, o el proceso viejo durante un reinicio
+escalonado) no se tocan.
+
+Para exponer una operación como trabajo:
+
+    @registrar_trabajo("mi_operacion")
+    def mi_operacion(db: Session, progreso: Progreso, **parametros) -> dict | None:
+        ...
+        progreso(50, "Mitad hecha")
+
+y encolarla con `encolar_trabajo(db, "mi_operacion", {...})`. Los parámetros
+y el resultado tienen que ser serializables a JSON. Si la función lanza una
+excepción se reintenta con backoff exponencial hasta `max_intentos`; los
+errores de negocio (BadRequest, NotFound, ...) no se reintentan.
+
+Si el trabajo deja recursos que hay que liberar recién cuando ya no se va a
+volver a intentar (ej: un archivo temporal), se registra
+`@registrar_trabajo("mi_operacion", al_terminar=limpiar)`: `limpiar(**parametros)`
+se llama una vez que el trabajo queda COMPLETADO o FALLIDO.
+"""
+import os
+import socket
+import threading
+import uuid
+import traceback
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update, and_, or_
+from sqlalchemy.orm import Session
+
+from src.database import SessionLocal
+from src.enumerados import EstadoTrabajo
+from src.exceptions import DetailedHTTPException
+from src.system.models import Trabajo
+
+Progreso = Callable[..., None]
+
+WORKERS = int(os.getenv("JOBS_WORKERS", "2"))
+# Espera entre reintentos: BACKOFF_BASE * 2^(intento - 1) segundos
+BACKOFF_BASE = float(os.getenv("JOBS_BACKOFF_SEGUNDOS", "5"))
+# Cada cuánto se revisa la tabla si nadie avisó que hay trabajo nuevo
+INTERVALO_SONDEO = 1.0
+# Sin latido durante este tiempo, un trabajo EN_CURSO se considera abandonado.
+# Tiene que ser mayor que la transacción más larga de un trabajo: en SQLite el
+# latido espera a que el trabajo suelte el lock de escritura.
+LEASE_SEGUNDOS = float(os.getenv("JOBS_LEASE_SEGUNDOS", "120"))
+
+# Identifica a este proceso en la columna `trabajador`
+TRABAJADOR = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+_registro: Dict[str, Callable] = {}
+_al_terminar: Dict[str, Callable] = {}
+
+# Progreso de los trabajos en curso en este proceso. No se escribe en la tabla
+# mientras corren: en SQLite la transacción del propio trabajo tiene el lock de
+# escritura y el UPDATE de progreso quedaría bloqueado hasta que termine.
+_progreso: Dict[int, Tuple[float, Optional[str]]] = {}
+_lock = threading.Lock()
+_hay_trabajo = threading.Event()
+
+
+def registrar_trabajo(tipo: str, al_terminar: Optional[Callable[..., None]] = None):
+    """Decorador: registra una función como trabajo ejecutable con ese nombre."""
+    def decorador(funcion: Callable) -> Callable:
+        _registro[tipo] = funcion
+        if al_terminar is not None:
+            _al_terminar[tipo] = al_terminar
+        return funcion
+    return decorador
+
+
+def encolar_trabajo(
+    db: Session,
+    tipo: str,
+    parametros: Optional[dict] = None,
+    creado_por_id: Optional[int] = None,
+    max_intentos: int = 3
+) -> Trabajo:
+    if tipo not in _registro:
+        raise ValueError(f"No hay ningún trabajo registrado como '{tipo}'.")
+    trabajo = Trabajo(
+        tipo=tipo,
+        parametros=parametros or {},
+        creado_por_id=creado_por_id,
+        max_intentos=max_intentos,
+        disponible_desde=datetime.now(),
+    )
+    db.add(trabajo)
+    db.commit()
+    db.refresh(trabajo)
+    _hay_trabajo.set()
+    return trabajo
+
+
+def progreso_en_curso(trabajo_id: int) -> Optional[Tuple[float, Optional[str]]]:
+    """(porcentaje, mensaje) del trabajo si está corriendo en este proceso."""
+    with _lock:
+        return _progreso.get(trabajo_id)
+
+
+# --- Ejecución ---
+
+def _abandonado(ahora: datetime):
+    """En curso con el lease vencido: el proceso que lo corría se cortó."""
+    return and_(
+        Trabajo.estado == EstadoTrabajo.EN_CURSO,
+        or_(Trabajo.latido_en.is_(None), Trabajo.latido_en < ahora - timedelta(seconds=LEASE_SEGUNDOS)),
+    )
+
+
+def _disponible(ahora: datetime):
+    """Pendiente y fuera del backoff, o abandonado con intentos disponibles."""
+    return or_(
+        and_(Trabajo.estado == EstadoTrabajo.PENDIENTE, Trabajo.disponible_desde <= ahora),
+        and_(_abandonado(ahora), Trabajo.intentos < Trabajo.max_intentos),
+    )
+
+
+def _fallar_agotados(db: Session, ahora: datetime) -> None:
+    """
+    Abandonados que ya usaron todos sus intentos (ej: un trabajo que tira abajo
+    el proceso cada vez): se marcan FALLIDO en lugar de retomarlos para siempre.
+    """
+    agotado = and_(_abandonado(ahora), Trabajo.intentos >= Trabajo.max_intentos)
+    for trabajo_id, tipo, parametros in db.execute(
+        select(Trabajo.id, Trabajo.tipo, Trabajo.parametros).where(agotado)
+    ).all():
+        marcado = db.execute(
+            update(Trabajo)
+            .where(Trabajo.id == trabajo_id, agotado)
+            .values(
+                estado=EstadoTrabajo.FALLIDO, finalizado_en=ahora, trabajador=None, latido_en=None,
+                error="Se agotaron los intentos: el proceso que lo ejecutaba dejó de responder.",
+            )
+        ).rowcount
+        db.commit()
+        if marcado:
+            _terminar(tipo, parametros)
+
+
+def _tomar_siguiente(db: Session) -> Optional[Trabajo]:
+    ahora = datetime.now()
+    _fallar_agotados(db, ahora)
+    candidato = db.scalars(
+        select(Trabajo.id)
+        .where(_disponible(ahora))
+        .order_by(Trabajo.id)
+        .limit(1)
+    ).first()
+    if candidato is None:
+        return None
+    # Solo uno de los workers (o procesos) que compiten logra pasarlo a EN_CURSO
+    tomado = db.execute(
+        update(Trabajo)
+        .where(Trabajo.id == candidato, _disponible(ahora))
+        .values(
+            estado=EstadoTrabajo.EN_CURSO, intentos=Trabajo.intentos + 1, iniciado_en=ahora, error=None,
+            trabajador=TRABAJADOR, latido_en=ahora,
+        )
+    ).rowcount
+    db.commit()
+    if not tomado:
+        return None
+    return db.get(Trabajo, candidato)
+
+
+def ejecutar_trabajo(trabajo_id: int) -> None:
+    """Corre un trabajo ya marcado EN_CURSO y deja registrado el resultado."""
+    control = SessionLocal()
+    try:
+        trabajo = control.get(Trabajo, trabajo_id)
+        funcion = _registro.get(trabajo.tipo)
+        parametros = dict(trabajo.parametros)
+        control.commit()  # no dejar abierta la lectura mientras corre el trabajo
+
+        def progreso(porcentaje: float, mensaje: Optional[str] = None):
+            with _lock:
+                _progreso[trabajo_id] = (max(0.0, min(100.0, float(porcentaje))), mensaje)
+
+        db = SessionLocal()
+        try:
+            if funcion is None:
+                raise LookupError(f"Trabajo '{trabajo.tipo}' no registrado en este proceso.")
+            resultado = funcion(db, progreso, **parametros)
+            db.commit()
+            if not _sigue_siendo_nuestro(control, trabajo):
+                return
+            trabajo.estado = EstadoTrabajo.COMPLETADO
+            trabajo.progreso = 100.0
+            trabajo.resultado = resultado
+            trabajo.mensaje = None
+        except Exception as e:
+            db.rollback()
+            if not _sigue_siendo_nuestro(control, trabajo):
+                return
+            print(f"ERROR en trabajo {trabajo_id} ({trabajo.tipo}), intento {trabajo.intentos}: {e}")
+            if isinstance(e, DetailedHTTPException):
+                trabajo.error = e.detail
+            else:
+                trabajo.error = "".join(traceback.format_exception_only(type(e), e)).strip()
+            reintentable = not isinstance(e, (DetailedHTTPException, LookupError))
+            if reintentable and trabajo.intentos < trabajo.max_intentos:
+                trabajo.estado = EstadoTrabajo.PENDIENTE
+                trabajo.disponible_desde = datetime.now() + timedelta(seconds=BACKOFF_BASE * 2 ** (trabajo.intentos - 1))
+            else:
+                trabajo.estado = EstadoTrabajo.FALLIDO
+        finally:
+            db.close()
+
+        trabajo.trabajador = None
+        trabajo.latido_en = None
+        if trabajo.estado != EstadoTrabajo.PENDIENTE:
+            trabajo.finalizado_en = datetime.now()
+        with _lock:
+            ultimo = _progreso.pop(trabajo_id, None)
+        if ultimo and trabajo.estado != EstadoTrabajo.COMPLETADO:
+            trabajo.progreso, trabajo.mensaje = ultimo
+        terminado = trabajo.estado != EstadoTrabajo.PENDIENTE
+        control.commit()
+        if terminado:
+            _terminar(trabajo.tipo, parametros)
+    finally:
+        control.close()
+
+
+def _terminar(tipo: str, parametros: dict) -> None:
+    """Corre el `al_terminar` del tipo de trabajo, si tiene."""
+    al_terminar = _al_terminar.get(tipo)
+    if al_terminar is None:
+        return
+    try:
+        al_terminar(**parametros)
+    except Exception as e:
+        print(f"ERROR al terminar un trabajo '{tipo}': {e}")
+
+
+def _sigue_siendo_nuestro(control: Session, trabajo: Trabajo) -> bool:
+    """
+    Relee el trabajo antes de registrar el resultado: si el lease venció (ej:
+    el proceso estuvo colgado) y otro worker lo retomó, el resultado es suyo.
+    """
+    control.refresh(trabajo)
+    if trabajo.trabajador == TRABAJADOR:
+        return True
+    print(f"Trabajo {trabajo.id}: lo retomó {trabajo.trabajador}, no se registra el resultado de {TRABAJADOR}.")
+    with _lock:
+        _progreso.pop(trabajo.id, None)
+    return False
+
+
+def renovar_leases() -> int:
+    """Renueva el latido de los trabajos que corren en este proceso."""
+    db = SessionLocal()
+    try:
+        renovados = db.execute(
+            update(Trabajo)
+            .where(Trabajo.trabajador == TRABAJADOR, Trabajo.estado == EstadoTrabajo.EN_CURSO)
+            .values(latido_en=datetime.now())
+        ).rowcount
+        db.commit()
+        return renovados
+    finally:
+        db.close()
+
+
+class PoolTrabajos:
+    """Threads que toman y ejecutan trabajos de la tabla hasta que se los detiene."""
+
+    def __init__(self, cantidad: int = WORKERS):
+        self.cantidad = cantidad
+        self._detener = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def iniciar(self) -> None:
+        self._detener.clear()
+        for i in range(self.cantidad):
+            thread = threading.Thread(target=self._bucle, name=f"trabajos-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        latido = threading.Thread(target=self._bucle_latido, name="trabajos-latido", daemon=True)
+        latido.start()
+        self._threads.append(latido)
+
+    def detener(self, timeout: float = 10.0) -> None:
+        self._detener.set()
+        _hay_trabajo.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+
+    def _bucle_latido(self) -> None:
+        while not self._detener.wait(LEASE_SEGUNDOS / 4):
+            try:
+                renovar_leases()
+            except Exception as e:
+                # Ej: "database is locked" mientras un trabajo escribe; se reintenta en el próximo ciclo
+                print(f"ERROR al renovar los leases de trabajos: {e}")
+
+    def _bucle(self) -> None:
+        while not self._detener.is_set():
+            db = SessionLocal()
+            try:
+                trabajo = _tomar_siguiente(db)
+            except Exception as e:
+                print(f"ERROR al buscar trabajos pendientes: {e}")
+                trabajo = None
+            finally:
+                db.close()
+
+            if trabajo is None:
+                _hay_trabajo.wait(INTERVALO_SONDEO)
+                _hay_trabajo.clear()
+                continue
+            ejecutar_trabajo(trabajo.id)
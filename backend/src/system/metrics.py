@@ -0,0 +1,345 @@
+import copy
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from src.system.constants import PRESUPUESTOS_CONSULTAS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EstadisticasRequest:
+    """Acumulador de lo que ocurre en la BBDD durante un único request."""
+    sql_count: int = 0
+    sql_time: float = 0.0
+    rows: int = 0
+    espera_pool: float = 0.0  # tiempo esperando una conexión libre
+
+
+@dataclass
+class EstadisticasPool:
+    """Totales de un pool de conexiones (escritura / lectura)."""
+    checkouts: int = 0
+    espera_total: float = 0.0
+    espera_max: float = 0.0
+    retenida_total: float = 0.0
+    retenida_max: float = 0.0
+
+
+@dataclass
+class EstadisticasEscrituras:
+    """
+    Sentencias de escritura (INSERT/UPDATE/DELETE). En SQLite la espera por el
+    lock de escritura ocurre dentro de la primera de cada transacción, así que
+    su tiempo (y los "database is locked" cuando vence el busy timeout) mide la
+    contención entre envíos concurrentes.
+    """
+    sentencias: int = 0
+    tiempo_total: float = 0.0
+    tiempo_max: float = 0.0
+    bloqueos: int = 0
+
+
+@dataclass
+class EstadisticasRuta:
+    """Totales acumulados por (método, ruta) desde que arrancó el proceso."""
+    requests: int = 0
+    errores: int = 0
+    latencia_total: float = 0.0
+    latencia_max: float = 0.0
+    sql_count: int = 0
+    sql_count_max: int = 0
+    sql_time: float = 0.0
+    rows: int = 0
+    espera_pool: float = 0.0
+    espera_pool_max: float = 0.0
+    presupuesto_excedido: int = 0
+    buckets_latencia: Dict[float, int] = field(default_factory=dict)
+
+
+# Límites (en segundos) del histograma de latencias
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_request_actual: ContextVar[Optional[EstadisticasRequest]] = ContextVar("_request_actual", default=None)
+_rutas: Dict[Tuple[str, str], EstadisticasRuta] = {}
+_pools: Dict[str, EstadisticasPool] = {}
+_engines: Dict[str, Engine] = {}
+_indicadores: Dict[str, Tuple[str, Callable[[], float]]] = {}
+_escrituras = EstadisticasEscrituras()
+_lock = threading.Lock()
+
+
+def registrar_presupuesto(metodo: str, ruta: str, max_consultas: int) -> None:
+    """Declara la cantidad máxima de consultas SQL esperada para una ruta."""
+    PRESUPUESTOS_CONSULTAS[f"{metodo.upper()} {ruta}"] = max_consultas
+
+
+def obtener_presupuesto(metodo: str, ruta: str) -> Optional[int]:
+    return PRESUPUESTOS_CONSULTAS.get(f"{metodo.upper()} {ruta}")
+
+
+def request_actual() -> Optional[EstadisticasRequest]:
+    """Devuelve el acumulador del request en curso (None fuera de un request)."""
+    return _request_actual.get()
+
+
+# --- Hooks de SQLAlchemy ---
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_metrics_inicio", []).append(time.perf_counter())
+
+
+def _es_escritura(statement: str) -> bool:
+    return statement.lstrip()[:6].upper() in ("INSERT", "UPDATE", "DELETE")
+
+
+def _registrar_escritura(segundos: float, bloqueo: bool = False) -> None:
+    with _lock:
+        _escrituras.sentencias += 1
+        _escrituras.tiempo_total += segundos
+        _escrituras.tiempo_max = max(_escrituras.tiempo_max, segundos)
+        if bloqueo:
+            _escrituras.bloqueos += 1
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    inicio = conn.info["_metrics_inicio"].pop()
+    duracion = time.perf_counter() - inicio
+    if _es_escritura(statement):
+        _registrar_escritura(duracion)
+    stats = _request_actual.get()
+    if stats is None:
+        return
+    stats.sql_count += 1
+    stats.sql_time += duracion
+    # Para INSERT/UPDATE/DELETE el driver informa las filas afectadas;
+    # las filas leídas se cuentan en _loaded_as_persistent.
+    if cursor.rowcount and cursor.rowcount > 0:
+        stats.rows += cursor.rowcount
+
+
+def _handle_error(exception_context):
+    # Si la consulta falla no se dispara after_cursor_execute: descartamos la marca
+    pila = exception_context.connection.info.get("_metrics_inicio") if exception_context.connection else None
+    if pila:
+        inicio = pila.pop()
+        if "database is locked" in str(exception_context.original_exception):
+            _registrar_escritura(time.perf_counter() - inicio, bloqueo=True)
+
+
+def _loaded_as_persistent(session, instance):
+    stats = _request_actual.get()
+    if stats is not None:
+        stats.rows += 1
+
+
+# --- Pool de conexiones (lo llama src/database.py) ---
+
+def registrar_engine(nombre: str, engine: Engine) -> None:
+    """Engine cuyo pool se expone (conexiones en uso) en /system/metrics."""
+    _engines[nombre] = engine
+
+
+def registrar_indicador(nombre: str, ayuda: str, funcion: Callable[[], float]) -> None:
+    """Gauge calculado al exportar (ej: atraso de la réplica de lectura)."""
+    _indicadores[nombre] = (ayuda, funcion)
+
+
+def registrar_espera_pool(nombre: str, segundos: float) -> None:
+    """Tiempo que tardó un checkout del pool; se suma al request en curso."""
+    stats = _request_actual.get()
+    if stats is not None:
+        stats.espera_pool += segundos
+    with _lock:
+        pool = _pools.setdefault(nombre, EstadisticasPool())
+        pool.checkouts += 1
+        pool.espera_total += segundos
+        pool.espera_max = max(pool.espera_max, segundos)
+
+
+def registrar_conexion_retenida(nombre: str, segundos: float) -> None:
+    """Tiempo entre el checkout y la devolución de una conexión."""
+    with _lock:
+        pool = _pools.setdefault(nombre, EstadisticasPool())
+        pool.retenida_total += segundos
+        pool.retenida_max = max(pool.retenida_max, segundos)
+
+
+def instrumentar_engine(engine: Engine, session_factory: sessionmaker) -> None:
+    """Registra los listeners que cuentan consultas, tiempo SQL y filas."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+    if not event.contains(session_factory, "loaded_as_persistent", _loaded_as_persistent):
+        event.listen(session_factory, "loaded_as_persistent", _loaded_as_persistent)
+
+
+# --- Middleware ---
+
+def _registrar(metodo: str, ruta: str, status_code: int, latencia: float, stats: EstadisticasRequest) -> None:
+    presupuesto = obtener_presupuesto(metodo, ruta)
+    excedido = presupuesto is not None and stats.sql_count > presupuesto
+
+    with _lock:
+        acumulado = _rutas.setdefault((metodo, ruta), EstadisticasRuta())
+        acumulado.requests += 1
+        if status_code >= 500:
+            acumulado.errores += 1
+        acumulado.latencia_total += latencia
+        acumulado.latencia_max = max(acumulado.latencia_max, latencia)
+        acumulado.sql_count += stats.sql_count
+        acumulado.sql_count_max = max(acumulado.sql_count_max, stats.sql_count)
+        acumulado.sql_time += stats.sql_time
+        acumulado.rows += stats.rows
+        acumulado.espera_pool += stats.espera_pool
+        acumulado.espera_pool_max = max(acumulado.espera_pool_max, stats.espera_pool)
+        for limite in BUCKETS_LATENCIA:
+            if latencia <= limite:
+                acumulado.buckets_latencia[limite] = acumulado.buckets_latencia.get(limite, 0) + 1
+        if excedido:
+            acumulado.presupuesto_excedido += 1
+
+    if excedido:
+        logger.warning(
+            "Presupuesto de consultas excedido en %s %s: %d consultas (máximo %d), %.1f ms SQL, %d filas",
+            metodo, ruta, stats.sql_count, presupuesto, stats.sql_time * 1000, stats.rows
+        )
+
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    """
+    Mide latencia, cantidad de consultas, tiempo SQL y filas de cada request,
+    agrupando por la plantilla de la ruta (ej: /profesor/{id}) y no por la URL.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        stats = EstadisticasRequest()
+        token = _request_actual.set(stats)
+        inicio = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            latencia = time.perf_counter() - inicio
+            _request_actual.reset(token)
+            route = request.scope.get("route")
+            ruta = getattr(route, "path", None) or "__sin_ruta__"
+            _registrar(request.method, ruta, status_code, latencia, stats)
+
+
+# --- Exposición ---
+
+def _fmt_labels(metodo: str, ruta: str, **extra: str) -> str:
+    labels = {"method": metodo, "route": ruta, **extra}
+    partes = []
+    for k, v in labels.items():
+        v = str(v).replace("\\", "\\\\").replace('"', '\\"')
+        partes.append(f'{k}="{v}"')
+    return "{" + ",".join(partes) + "}"
+
+
+def metricas_por_ruta() -> Dict[Tuple[str, str], EstadisticasRuta]:
+    """Copia de los acumulados por (método, ruta)."""
+    with _lock:
+        return copy.deepcopy(_rutas)
+
+
+def exportar_prometheus() -> str:
+    """Serializa las métricas acumuladas en el formato de texto de Prometheus."""
+    snapshot = metricas_por_ruta()
+
+    lineas = []
+
+    def serie(nombre: str, tipo: str, ayuda: str, atributo: str):
+        lineas.append(f"# HELP {nombre} {ayuda}")
+        lineas.append(f"# TYPE {nombre} {tipo}")
+        for (metodo, ruta), st in sorted(snapshot.items()):
+            lineas.append(f"{nombre}{_fmt_labels(metodo, ruta)} {getattr(st, atributo)}")
+
+    serie("ra_http_requests_total", "counter", "Requests atendidos.", "requests")
+    serie("ra_http_errors_total", "counter", "Requests con respuesta 5xx.", "errores")
+
+    lineas.append("# HELP ra_http_request_duration_seconds Latencia total del request.")
+    lineas.append("# TYPE ra_http_request_duration_seconds histogram")
+    for (metodo, ruta), st in sorted(snapshot.items()):
+        for limite in BUCKETS_LATENCIA:
+            cantidad = st.buckets_latencia.get(limite, 0)
+            lineas.append(
+                f"ra_http_request_duration_seconds_bucket{_fmt_labels(metodo, ruta, le=limite)} {cantidad}"
+            )
+        lineas.append(
+            f"ra_http_request_duration_seconds_bucket{_fmt_labels(metodo, ruta, le='+Inf')} {st.requests}"
+        )
+        lineas.append(f"ra_http_request_duration_seconds_sum{_fmt_labels(metodo, ruta)} {st.latencia_total:.6f}")
+        lineas.append(f"ra_http_request_duration_seconds_count{_fmt_labels(metodo, ruta)} {st.requests}")
+
+    serie("ra_http_request_duration_max_seconds", "gauge", "Latencia máxima observada.", "latencia_max")
+    serie("ra_sql_queries_total", "counter", "Consultas SQL ejecutadas.", "sql_count")
+    serie("ra_sql_queries_per_request_max", "gauge", "Máximo de consultas SQL en un request.", "sql_count_max")
+    serie("ra_sql_duration_seconds_total", "counter", "Tiempo acumulado en consultas SQL.", "sql_time")
+    serie("ra_sql_rows_total", "counter", "Filas leídas (objetos cargados) o afectadas.", "rows")
+    serie("ra_query_budget_exceeded_total", "counter", "Requests que superaron su presupuesto de consultas.", "presupuesto_excedido")
+    serie("ra_db_pool_wait_seconds_total", "counter", "Tiempo esperando una conexión del pool.", "espera_pool")
+    serie("ra_db_pool_wait_max_seconds", "gauge", "Máxima espera de pool en un request.", "espera_pool_max")
+
+    with _lock:
+        pools = copy.deepcopy(_pools)
+
+    def serie_pool(nombre: str, tipo: str, ayuda: str, valores: Dict[str, float]):
+        lineas.append(f"# HELP {nombre} {ayuda}")
+        lineas.append(f"# TYPE {nombre} {tipo}")
+        for pool, valor in sorted(valores.items()):
+            lineas.append(f'{nombre}{{pool="{pool}"}} {valor}')
+
+    serie_pool("ra_db_pool_checkouts_total", "counter", "Conexiones entregadas por el pool.",
+               {n: p.checkouts for n, p in pools.items()})
+    serie_pool("ra_db_pool_checkout_wait_seconds_total", "counter", "Espera acumulada de los checkouts.",
+               {n: p.espera_total for n, p in pools.items()})
+    serie_pool("ra_db_pool_checkout_wait_max_seconds", "gauge", "Máxima espera de un checkout.",
+               {n: p.espera_max for n, p in pools.items()})
+    serie_pool("ra_db_pool_held_seconds_total", "counter", "Tiempo acumulado con conexiones tomadas.",
+               {n: p.retenida_total for n, p in pools.items()})
+    serie_pool("ra_db_pool_held_max_seconds", "gauge", "Máximo tiempo que se retuvo una conexión.",
+               {n: p.retenida_max for n, p in pools.items()})
+    serie_pool("ra_db_pool_checked_out", "gauge", "Conexiones en uso ahora.",
+               {n: e.pool.checkedout() for n, e in _engines.items() if hasattr(e.pool, "checkedout")})
+
+    with _lock:
+        escrituras = copy.copy(_escrituras)
+    for nombre, tipo, ayuda, valor in (
+        ("ra_db_writes_total", "counter", "Sentencias INSERT/UPDATE/DELETE ejecutadas.", escrituras.sentencias),
+        ("ra_db_write_seconds_total", "counter", "Tiempo acumulado en escrituras (incluye la espera del lock).",
+         escrituras.tiempo_total),
+        ("ra_db_write_max_seconds", "gauge", "Escritura más lenta.", escrituras.tiempo_max),
+        ("ra_db_lock_errors_total", "counter", "Consultas que fallaron con 'database is locked'.", escrituras.bloqueos),
+    ):
+        lineas.append(f"# HELP {nombre} {ayuda}")
+        lineas.append(f"# TYPE {nombre} {tipo}")
+        lineas.append(f"{nombre} {valor}")
+    for nombre, (ayuda, funcion) in sorted(_indicadores.items()):
+        lineas.append(f"# HELP {nombre} {ayuda}")
+        lineas.append(f"# TYPE {nombre} gauge")
+        lineas.append(f"{nombre} {funcion()}")
+
+    return "\n".join(lineas) + "\n"
+
+
+def reiniciar_metricas() -> None:
+    global _escrituras
+    with _lock:
+        _rutas.clear()
+        _pools.clear()
+        _escrituras = EstadisticasEscrituras()
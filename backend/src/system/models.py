@@ -0,0 +1,41 @@
+from __future__ import annotations
+from datetime import datetime
+
+from sqlalchemy import Integer, String, Text, DateTime, Float, ForeignKey, JSON
+from sqlalchemy import Enum as SQLEnum
+from sqlalchemy.sql import func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.models import ModeloBase
+from src.enumerados import EstadoTrabajo
+
+
+class Trabajo(ModeloBase):
+    """Operación pesada que corre fuera del request (ver src/system/jobs.py)."""
+    __tablename__ = "trabajos"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    # Nombre con el que se registró la función (ej: "generar_informe_sintetico")
+    tipo: Mapped[str] = mapped_column(String(100), nullable=False)
+    parametros: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+
+    estado: Mapped[EstadoTrabajo] = mapped_column(
+        SQLEnum(EstadoTrabajo, name="estado_trabajo_enum"), default=EstadoTrabajo.PENDIENTE, index=True
+    )
+    progreso: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    mensaje: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    resultado: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    intentos: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    max_intentos: Mapped[int] = mapped_column(Integer, default=3, nullable=False)
+    # Backoff: no se vuelve a tomar antes de esta fecha
+    disponible_desde: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.now, nullable=False)
+
+    creado_por_id: Mapped[int | None] = mapped_column(ForeignKey("persona.id"), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    iniciado_en: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Lease: quién lo está corriendo y cuándo avisó por última vez que sigue vivo
+    trabajador: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    latido_en: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finalizado_en: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -1,9 +1,46 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
 from datetime import datetime
+from sqlalchemy.orm import Session
+from src.database import get_db
+from src.dependencies import get_current_user, get_acceso_metricas
+from src.enumerados import EstadoTrabajo, TipoPersona
+from src.exceptions import NotFound, PermissionDenied
+from src.persona.models import Persona
+from src.system import metrics, jobs, schemas
+from src.system.models import Trabajo
 
 router = APIRouter(prefix="/system", tags=["Sistema"])
 
 @router.get("/time")
 def get_server_time():
     """Devuelve la fecha y hora actual del servidor."""
-    return {"server_time": datetime.now().isoformat()}
\ No newline at end of file
+    return {"server_time": datetime.now().isoformat()}
+
+@router.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(get_acceso_metricas)])
+def get_metrics():
+    """Métricas por ruta (latencia, consultas SQL, filas) en formato Prometheus. Ver get_acceso_metricas."""
+    return PlainTextResponse(
+        metrics.exportar_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+@router.get("/jobs/{trabajo_id}", response_model=schemas.Trabajo)
+def get_trabajo(
+    trabajo_id: int,
+    db: Session = Depends(get_db),
+    current_user: Persona = Depends(get_current_user)
+):
+    """Estado y progreso de un trabajo en segundo plano (lo ve quien lo creó o Secretaría)."""
+    trabajo = db.get(Trabajo, trabajo_id)
+    if not trabajo:
+        raise NotFound(f"Trabajo {trabajo_id} no encontrado.")
+    if trabajo.creado_por_id != current_user.id and current_user.tipo != TipoPersona.ADMIN_SECRETARIA:
+        raise PermissionDenied("No tienes acceso a este trabajo.")
+
+    respuesta = schemas.Trabajo.model_validate(trabajo)
+    if trabajo.estado == EstadoTrabajo.EN_CURSO:
+        en_curso = jobs.progreso_en_curso(trabajo_id)
+        if en_curso:
+            respuesta.progreso, respuesta.mensaje = en_curso
+    return respuesta
@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Any, Optional
+from pydantic import BaseModel
+
+from src.enumerados import EstadoTrabajo
+
+
+class Trabajo(BaseModel):
+    id: int
+    tipo: str
+    estado: EstadoTrabajo
+    progreso: float
+    mensaje: Optional[str] = None
+    resultado: Optional[Any] = None
+    error: Optional[str] = None
+    intentos: int
+    max_intentos: int
+    created_at: datetime
+    iniciado_en: Optional[datetime] = None
+    finalizado_en: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
@@ -0,0 +1,43 @@
+"""
+Serialización directa a bytes para endpoints con respuestas grandes.
+
+Con `response_model`, FastAPI valida lo que devuelve el endpoint, lo pasa a
+dicts/listas (jsonable_encoder) y recién ahí lo vuelca con json.dumps. En las
+estadísticas (secciones → preguntas → opciones, por cursada) ese paso
+intermedio es la mayor parte del tiempo de respuesta. `serializar` hace el
+volcado con pydantic-core en un solo paso:
+
+    @router.get("/mis-resultados", response_model=List[ResultadoCursada])
+    @serializar(List[ResultadoCursada])
+    def get_mis_resultados(...):
+        ...
+
+El `response_model` se deja igual para la documentación de OpenAPI.
+"""
+import functools
+import inspect
+from typing import Any, Callable
+
+from pydantic import TypeAdapter
+from starlette.responses import Response
+
+
+def a_json(adaptador: TypeAdapter, valor: Any) -> bytes:
+    """Valida `valor` (objetos del ORM o schemas) contra el adaptador y lo vuelca a JSON."""
+    return adaptador.dump_json(adaptador.validate_python(valor, from_attributes=True))
+
+
+def serializar(modelo: Any) -> Callable:
+    """Decorador para endpoints (va debajo de @router.get): responde los bytes ya serializados."""
+    adaptador = TypeAdapter(modelo)
+
+    def decorador(endpoint: Callable) -> Callable:
+        @functools.wraps(endpoint)
+        def envoltura(*args, **kwargs):
+            return Response(content=a_json(adaptador, endpoint(*args, **kwargs)), media_type="application/json")
+
+        # FastAPI lee la firma del endpoint original para armar las dependencias
+        envoltura.__signature__ = inspect.signature(endpoint)
+        return envoltura
+
+    return decorador
@@ -11,6 +11,8 @@ const normalizeLabel = (value: string) => value.trim().toLowerCase();
 // --- Props (sin cambios) ---
 interface CursadaResultadosProps {
   resultado: ResultadoCursada;
+  // Base de las rutas de comentarios paginados (.../preguntas) según el rol
+  comentariosUrl?: string;
 }
 
 // --- Paletas de Colores (sin cambios) ---
@@ -33,7 +35,10 @@ const PALETA_SUPERIOR = {
 };
 
 // --- Componente ---
-const CursadaResultados: React.FC<CursadaResultadosProps> = ({ resultado }) => {
+const CursadaResultados: React.FC<CursadaResultadosProps> = ({
+  resultado,
+  comentariosUrl,
+}) => {
   // (sin cambios)
   const allMcPreguntas = useMemo(
     () =>
@@ -253,6 +258,7 @@ const CursadaResultados: React.FC<CursadaResultadosProps> = ({ resultado }) => {
       <SectionBreakdownTable
         secciones={resultado.resultados_por_seccion}
         seriesMap={seriesMap}
+        comentariosUrl={comentariosUrl}
       />
     </div>
   );
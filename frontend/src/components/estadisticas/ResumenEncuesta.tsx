@@ -1,26 +1,33 @@
 import React, { useMemo, useEffect } from "react";
 
-interface ResultadoOpcion {
-  opcion_id: number;
-  opcion_texto: string;
-  cantidad: number;
-}
-
-interface ResultadoPregunta {
+interface PuntajePreguntaInforme {
   pregunta_id: number;
   pregunta_texto: string;
-  pregunta_tipo: "MULTIPLE_CHOICE" | "REDACCION";
-  resultados_opciones: ResultadoOpcion[] | null;
-  respuestas_texto: { texto: string }[] | null;
+  puntaje: number;
+  cantidad_respuestas: number;
 }
 
-interface ResultadoSeccion {
+interface PuntajeSeccionInforme {
+  seccion_id: number;
   seccion_nombre: string;
-  resultados_por_pregunta: ResultadoPregunta[];
+  letra: string;
+  puntaje: number | null;
+  cantidad_respuestas: number;
+  preguntas: PuntajePreguntaInforme[];
+}
+
+// Secciones B a E de la encuesta de la cursada (GET /profesor/informes/{id}/resultados-encuesta)
+export interface ResultadosEncuestaInforme {
+  actividad_instancia_id: number;
+  encuesta_instancia_id: number;
+  materia_nombre: string;
+  cuatrimestre_info: string;
+  encuesta_cerrada: boolean;
+  secciones: PuntajeSeccionInforme[];
 }
 
 interface ResumenEncuestaProps {
-  resultadosEncuesta: ResultadoSeccion[] | null;
+  resultadosEncuesta: ResultadosEncuestaInforme | null;
   onGenerarResumen: (resumen: string) => void;
 }
 
@@ -33,30 +40,14 @@ const ResumenEncuesta: React.FC<ResumenEncuestaProps> = ({
 
     let textoResumen = "";
 
-    resultadosEncuesta.forEach((seccion) => {
-      seccion.resultados_por_pregunta.forEach((pregunta) => {
-        if (
-          pregunta.pregunta_tipo === "MULTIPLE_CHOICE" &&
-          pregunta.resultados_opciones &&
-          pregunta.resultados_opciones.length > 0
-        ) {
-          const total = pregunta.resultados_opciones.reduce(
-            (sum, opcion) => sum + opcion.cantidad,
-            0
-          );
-
-          textoResumen += `Pregunta: ${pregunta.pregunta_texto}\n`;
-          textoResumen += `Total de respuestas: ${total}\n`;
-
-          pregunta.resultados_opciones.forEach((opcion) => {
-            const porcentaje =
-              total > 0 ? ((opcion.cantidad / total) * 100).toFixed(1) : "0.0";
-            textoResumen += `- ${opcion.opcion_texto}: ${opcion.cantidad} respuestas (${porcentaje}%)\n`;
-          });
-
-          textoResumen += "\n";
-        }
+    resultadosEncuesta.secciones.forEach((seccion) => {
+      if (seccion.puntaje === null) return;
+      textoResumen += `${seccion.seccion_nombre}: ${seccion.puntaje.toFixed(2)} `;
+      textoResumen += `(${seccion.cantidad_respuestas} respuestas)\n`;
+      seccion.preguntas.forEach((pregunta) => {
+        textoResumen += `- ${pregunta.pregunta_texto}: ${pregunta.puntaje.toFixed(2)}\n`;
       });
+      textoResumen += "\n";
     });
 
     return textoResumen.trim();
@@ -1,5 +1,8 @@
 import React, { useState } from "react";
+import { useAuth } from "../../auth/AuthContext";
 import type {
+  ComentariosPagina,
+  RespuestaTextoItem,
   ResultadoSeccion,
   ResultadoPregunta,
   ResultadoOpcion,
@@ -16,36 +19,100 @@ interface SeriesMap {
 interface QuestionBreakdownProps {
   pregunta: ResultadoPregunta;
   seriesMap: SeriesMap;
+  comentariosUrl?: string;
 }
 
 interface SectionBreakdownTableProps {
   secciones: ResultadoSeccion[];
   seriesMap: SeriesMap;
+  // Base de /{pregunta_id}/comentarios para pedir el resto de los comentarios
+  comentariosUrl?: string;
 }
 
+const COMENTARIOS_POR_PAGINA = 20;
+
+// --- Sub-componente para los comentarios de una pregunta abierta ---
+
+const OpenQuestionBreakdown: React.FC<{
+  pregunta: ResultadoPregunta;
+  comentariosUrl?: string;
+}> = ({ pregunta, comentariosUrl }) => {
+  const { token } = useAuth();
+  const [comentarios, setComentarios] = useState<RespuestaTextoItem[]>(
+    pregunta.respuestas_texto ?? []
+  );
+  const [cargando, setCargando] = useState(false);
+  const total = pregunta.cantidad_comentarios ?? comentarios.length;
+
+  const cargarMas = async () => {
+    if (!comentariosUrl || !token) return;
+    setCargando(true);
+    try {
+      const params = new URLSearchParams({
+        offset: String(comentarios.length),
+        limit: String(COMENTARIOS_POR_PAGINA),
+      });
+      const res = await fetch(
+        `${comentariosUrl}/${pregunta.pregunta_id}/comentarios?${params.toString()}`,
+        { headers: { Authorization: `Bearer ${token}` } }
+      );
+      if (res.ok) {
+        const pagina: ComentariosPagina = await res.json();
+        setComentarios((actuales) => [...actuales, ...pagina.comentarios]);
+      }
+    } catch (err) {
+      console.error("Error cargando comentarios", err);
+    } finally {
+      setCargando(false);
+    }
+  };
+
+  return (
+    <div className="rounded-lg border border-gray-200 bg-white p-4 shadow-sm">
+      <header className="flex flex-wrap items-center justify-between gap-2">
+        <h4 className="text-sm font-semibold text-gray-800">
+          {pregunta.pregunta_texto}
+        </h4>
+        <span className="text-xs font-medium text-gray-500 uppercase tracking-wide">
+          {total} comentarios
+        </span>
+      </header>
+      <div className="mt-4 space-y-2 max-h-40 overflow-y-auto">
+        {comentarios.map((resp, index) => (
+          <p
+            key={index}
+            className="text-sm text-gray-600 italic border-b pb-1"
+          >
+            "{resp.texto}"
+          </p>
+        ))}
+      </div>
+      {comentariosUrl && comentarios.length < total && (
+        <button
+          type="button"
+          onClick={cargarMas}
+          disabled={cargando}
+          className="mt-2 text-xs bg-blue-100 text-blue-700 px-2 py-1 rounded disabled:opacity-50"
+        >
+          {cargando
+            ? "Cargando..."
+            : `Ver más comentarios (${total - comentarios.length} restantes)`}
+        </button>
+      )}
+    </div>
+  );
+};
+
 // --- Sub-componente para una Pregunta ---
 
 const QuestionBreakdown: React.FC<QuestionBreakdownProps> = ({
   pregunta,
   seriesMap,
+  comentariosUrl,
 }) => {
   if (pregunta.pregunta_tipo === "REDACCION") {
     return (
-      <div className="rounded-lg border border-gray-200 bg-white p-4 shadow-sm">
-        <h4 className="text-sm font-semibold text-gray-800">
-          {pregunta.pregunta_texto}
-        </h4>
-        <div className="mt-4 space-y-2 max-h-40 overflow-y-auto">
-          {pregunta.respuestas_texto?.map((resp, index) => (
-            <p
-              key={index}
-              className="text-sm text-gray-600 italic border-b pb-1"
-            >
-              "{resp.texto}"
-            </p>
-          ))}
-        </div>
-      </div>
+      <OpenQuestionBreakdown pregunta={pregunta} comentariosUrl={comentariosUrl} />
     );
   }
 
@@ -107,6 +174,7 @@ const QuestionBreakdown: React.FC<QuestionBreakdownProps> = ({
 const SectionBreakdownTable: React.FC<SectionBreakdownTableProps> = ({
   secciones,
   seriesMap,
+  comentariosUrl,
 }) => {
   const [expandedSection, setExpandedSection] = useState<string | null>(
     secciones[0]?.seccion_nombre ?? null
@@ -180,6 +248,7 @@ const SectionBreakdownTable: React.FC<SectionBreakdownTableProps> = ({
                               key={pregunta.pregunta_id}
                               pregunta={pregunta}
                               seriesMap={seriesMap}
+                              comentariosUrl={comentariosUrl}
                             />
                           ))}
                         </div>
@@ -7,6 +7,11 @@ import { Button } from "../components/Button";
 
 const API_BASE_URL = import.meta.env.VITE_API_URL ?? "http://localhost:8000";
 
+// Comentarios por pregunta en la carga inicial; el resto se pide paginado
+const MAX_COMENTARIOS = 5;
+const comentariosUrl = (resultado: ResultadoCursada) =>
+  `${API_BASE_URL}/departamento/estadisticas/instancia/${resultado.encuesta_instancia_id}/preguntas`;
+
 interface ItemSelector {
   id: number;
   nombre: string;
@@ -100,7 +105,7 @@ const CursadaAccordionItem: React.FC<{
       {/* BODY DESPLEGABLE */}
       {isOpen && (
         <div className="border-t border-gray-100 p-4 sm:p-6 bg-gray-50/30 animate-fadeIn">
-          <CursadaResultados resultado={resultado} />
+          <CursadaResultados resultado={resultado} comentariosUrl={comentariosUrl(resultado)} />
         </div>
       )}
     </div>
@@ -131,7 +136,7 @@ const ComparacionView: React.FC<{
             {r1.materia_nombre} ({r1.cuatrimestre_info})
           </div>
           <div className="bg-white rounded-b-lg shadow p-2">
-            <CursadaResultados resultado={r1} />
+            <CursadaResultados resultado={r1} comentariosUrl={comentariosUrl(r1)} />
           </div>
         </div>
 
@@ -141,7 +146,7 @@ const ComparacionView: React.FC<{
             {r2.materia_nombre} ({r2.cuatrimestre_info})
           </div>
           <div className="bg-white rounded-b-lg shadow p-2">
-            <CursadaResultados resultado={r2} />
+            <CursadaResultados resultado={r2} comentariosUrl={comentariosUrl(r2)} />
           </div>
         </div>
       </div>
@@ -215,8 +220,8 @@ const DepartamentoEstadisticasCursadas: React.FC = () => {
 
     const url =
       tipo === "profesor"
-        ? `${API_BASE_URL}/departamento/estadisticas/profesor/${id}`
-        : `${API_BASE_URL}/departamento/estadisticas/materia/${id}`;
+        ? `${API_BASE_URL}/departamento/estadisticas/profesor/${id}?max_comentarios=${MAX_COMENTARIOS}`
+        : `${API_BASE_URL}/departamento/estadisticas/materia/${id}?max_comentarios=${MAX_COMENTARIOS}`;
 
     try {
       const response = await fetch(url, {
@@ -1,13 +1,18 @@
-import React, { useState, useEffect, useMemo } from "react";
+import React, { useState, useEffect, useMemo, useRef } from "react";
 import { useNavigate, useParams } from "react-router-dom";
 import { jsPDF } from "jspdf";
 import autoTable from "jspdf-autotable";
-import ResumenEncuesta from "../components/estadisticas/ResumenEncuesta";
+import ResumenEncuesta, {
+  ResultadosEncuestaInforme,
+} from "../components/estadisticas/ResumenEncuesta";
 import { useAuth } from "../auth/AuthContext";
 import BarraProgreso from "../components/estadisticas/BarraProgreso";
 
 const API_BASE_URL = import.meta.env.VITE_API_URL ?? "http://localhost:8000";
 
+// Espera desde el último cambio antes de autoguardar el borrador
+const AUTOGUARDADO_MS = 1500;
+
 interface Opcion {
   id: number;
   texto: string;
@@ -38,25 +43,28 @@ interface PlantillaReporte {
   codigo: string;
   docente_responsable: string;
   cantidad_inscriptos?: number;
+  // Datos de los campos dinámicos, resueltos en el backend por origen_datos
+  datos_origen?: {
+    resultados_encuesta?: ResultadosEncuestaInforme | null;
+    dropdown_porcentaje_justificacion?: { opciones: string[] } | null;
+  };
 }
 
-interface ResultadoOpcion {
-  opcion_id: number;
-  opcion_texto: string;
-  cantidad: number;
-}
-interface ResultadoPregunta {
+
+interface BorradorRespuesta {
   pregunta_id: number;
-  pregunta_texto: string;
-  pregunta_tipo: "MULTIPLE_CHOICE" | "REDACCION";
-  resultados_opciones: ResultadoOpcion[] | null;
-  respuestas_texto: { texto: string }[] | null;
-}
-interface ResultadoSeccion {
-  seccion_nombre: string;
-  resultados_por_pregunta: ResultadoPregunta[];
+  opcion_id?: number | null;
+  texto?: string | null;
 }
 
+type Respuestas = { [key: number]: string | number };
+
+// Formato de /responder y de /borrador: opcion_id para multiple choice, texto para redacción
+const aRespuestaPayload = (pregunta: Pregunta, val: string | number) =>
+  pregunta.tipo === "MULTIPLE_CHOICE"
+    ? { pregunta_id: pregunta.id, opcion_id: Number(val) }
+    : { pregunta_id: pregunta.id, texto: String(val) };
+
 // Interfaz nueva para recibir el prop readOnly
 interface ResponderReportesProps {
   readOnly?: boolean;
@@ -68,12 +76,7 @@ const ResponderReportes: React.FC<ResponderReportesProps> = ({ readOnly = false
   const { token, logout } = useAuth();
 
   const [plantilla, setPlantilla] = useState<PlantillaReporte | null>(null);
-  const [respuestas, setRespuestas] = useState<{
-    [key: number]: string | number;
-  }>({});
-  const [resultadosEncuesta, setResultadosEncuesta] = useState<
-    ResultadoSeccion[] | null
-  >(null);
+  const [respuestas, setRespuestas] = useState<Respuestas>({});
 
   const [loading, setLoading] = useState(true);
   const [mensaje, setMensaje] = useState<string | null>(null);
@@ -82,15 +85,25 @@ const ResponderReportes: React.FC<ResponderReportesProps> = ({ readOnly = false
   const [activeTab, setActiveTab] = useState(0);
   const [errorPreguntaId, setErrorPreguntaId] = useState<number | null>(null);
   const [resumenParaCopiar, setResumenParaCopiar] = useState<string>("");
+  // Borrador: no se autoguarda hasta haber restaurado el existente (lo pisaría)
+  const [borradorListo, setBorradorListo] = useState(false);
+  const [estadoBorrador, setEstadoBorrador] = useState<string | null>(null);
+  const guardadoRef = useRef<Respuestas>({});
 
-  // Generar opciones de porcentaje (0% a 100% en pasos de 5 o 10)
+  // Opciones de porcentaje (0% a 100%); vienen con la plantilla
   const porcentajeOptions = useMemo(() => {
+    const desdeBackend =
+      plantilla?.datos_origen?.dropdown_porcentaje_justificacion?.opciones;
+    if (desdeBackend) return desdeBackend;
     const opts = [];
     for (let i = 0; i <= 100; i += 5) {
       opts.push(`${i}%`);
     }
     return opts;
-  }, []);
+  }, [plantilla]);
+
+  // Valores de la encuesta para la pregunta 2.B (vienen con la plantilla)
+  const resultadosEncuesta = plantilla?.datos_origen?.resultados_encuesta ?? null;
 
   // 1. Cargar la estructura del reporte (Plantilla)
   useEffect(() => {
@@ -127,25 +140,41 @@ const ResponderReportes: React.FC<ResponderReportesProps> = ({ readOnly = false
     };
   }, [instanciaId, token, logout]);
 
-  // 2. Cargar Resultados de Encuestas (para el autocompletado) - Solo si NO es readOnly (opcional)
+  // 2. Restaurar el borrador autoguardado (si ya se había empezado el informe)
   useEffect(() => {
-    if (!token) return;
-    const fetchResultados = async () => {
+    if (!token || readOnly || !instanciaId || !plantilla) return;
+    let isMounted = true;
+
+    const fetchBorrador = async () => {
       try {
-        const res = await fetch(`${API_BASE_URL}/profesor/mis-resultados`, {
-          headers: { Authorization: `Bearer ${token}` },
+        const res = await fetch(
+          `${API_BASE_URL}/reportes-abiertas/instancia/${instanciaId}/borrador`,
+          { headers: { Authorization: `Bearer ${token}` } }
+        );
+        if (!res.ok) return;
+        const data: { respuestas: BorradorRespuesta[] } = await res.json();
+        const restauradas: Respuestas = {};
+        data.respuestas.forEach((r) => {
+          const val = r.opcion_id ?? r.texto;
+          if (val !== null && val !== undefined) restauradas[r.pregunta_id] = val;
         });
-        if (res.ok) {
-          const json = await res.json();
-          const first = Array.isArray(json) && json.length > 0 ? json[0] : null;
-          setResultadosEncuesta(first ? first.resultados_por_seccion : []);
+        if (!isMounted) return;
+        guardadoRef.current = { ...restauradas };
+        if (Object.keys(restauradas).length > 0) {
+          setRespuestas((prev) => ({ ...prev, ...restauradas }));
+          setEstadoBorrador("Se restauró el borrador guardado.");
         }
       } catch (err) {
-        console.error(err);
+        console.error("Error cargando el borrador", err);
+      } finally {
+        if (isMounted) setBorradorListo(true);
       }
     };
-    fetchResultados();
-  }, [token]);
+    fetchBorrador();
+    return () => {
+      isMounted = false;
+    };
+  }, [instanciaId, token, readOnly, plantilla]);
 
   // 3. NUEVO: Cargar respuestas previas si es modo lectura (readOnly)
   useEffect(() => {
@@ -186,6 +215,49 @@ const ResponderReportes: React.FC<ResponderReportesProps> = ({ readOnly = false
     }
   }, [plantilla, readOnly]);
 
+  // 5. Autoguardado con debounce: solo se mandan las respuestas que cambiaron desde el último guardado
+  useEffect(() => {
+    if (readOnly || !borradorListo || reporteCompletado) return;
+    if (!token || !instanciaId || !plantilla) return;
+
+    const timer = setTimeout(async () => {
+      const cambiadas = plantilla.secciones
+        .flatMap((s) => s.preguntas)
+        .filter((p) => {
+          const val = respuestas[p.id];
+          if (val === undefined) return false;
+          const anterior = guardadoRef.current[p.id];
+          return anterior === undefined || String(anterior) !== String(val);
+        });
+      if (cambiadas.length === 0) return;
+
+      try {
+        const res = await fetch(
+          `${API_BASE_URL}/reportes-abiertas/instancia/${instanciaId}/borrador`,
+          {
+            method: "PUT",
+            headers: {
+              "Content-Type": "application/json",
+              Authorization: `Bearer ${token}`,
+            },
+            body: JSON.stringify({
+              respuestas: cambiadas.map((p) => aRespuestaPayload(p, respuestas[p.id])),
+            }),
+          }
+        );
+        if (!res.ok) throw new Error(`Error ${res.status}`);
+        cambiadas.forEach((p) => {
+          guardadoRef.current[p.id] = respuestas[p.id];
+        });
+        const hora = new Date().toLocaleTimeString("es-AR", { hour: "2-digit", minute: "2-digit" });
+        setEstadoBorrador(`Borrador guardado a las ${hora}.`);
+      } catch (err) {
+        setEstadoBorrador("No se pudo guardar el borrador.");
+      }
+    }, AUTOGUARDADO_MS);
+    return () => clearTimeout(timer);
+  }, [respuestas, borradorListo, readOnly, reporteCompletado, token, instanciaId, plantilla]);
+
   const isPreguntaObligatoria = (p: Pregunta) => {
     if (readOnly) return false; // En modo lectura nada es obligatorio visualmente para validación
     if (p.tipo === "MULTIPLE_CHOICE") return true;
@@ -293,12 +365,8 @@ const ResponderReportes: React.FC<ResponderReportesProps> = ({ readOnly = false
     const allPreguntas = plantilla.secciones.flatMap((s) => s.preguntas);
     const payloadRespuestas = Object.entries(respuestas)
       .map(([pid, val]) => {
-        const preguntaId = Number(pid);
-        const pregunta = allPreguntas.find((p) => p.id === preguntaId);
-        if (!pregunta) return null;
-        if (pregunta.tipo === "MULTIPLE_CHOICE")
-          return { pregunta_id: preguntaId, opcion_id: Number(val) };
-        return { pregunta_id: preguntaId, texto: String(val) };
+        const pregunta = allPreguntas.find((p) => p.id === Number(pid));
+        return pregunta ? aRespuestaPayload(pregunta, val) : null;
       })
       .filter(Boolean);
 
@@ -433,6 +501,11 @@ const ResponderReportes: React.FC<ResponderReportesProps> = ({ readOnly = false
         <div className="text-right text-xs text-gray-500 mt-1">
           Sección {activeTab + 1} de {totalSecciones}
         </div>
+        {!readOnly && estadoBorrador && (
+          <div className="text-right text-xs text-gray-400 mt-1">
+            {estadoBorrador}
+          </div>
+        )}
       </div>
 
       <div className="space-y-6 min-h-[300px]">
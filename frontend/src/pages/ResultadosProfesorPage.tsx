@@ -6,6 +6,9 @@ import { useAuth } from "../auth/AuthContext";
 
 const API_BASE_URL = import.meta.env.VITE_API_URL ?? "http://localhost:8000";
 
+// Comentarios por pregunta en la carga inicial; el resto se pide paginado
+const MAX_COMENTARIOS = 5;
+
 // Generamos los últimos 5 años (descendente) para el filtro
 const currentYear = new Date().getFullYear();
 const years = Array.from({ length: 5 }, (_, i) => currentYear - i); // Ej: [2025, 2024, 2023, 2022, 2021]
@@ -70,6 +73,8 @@ const ResultadosProfesorPage: React.FC = () => {
         if (selectedYear) params.append("anio", selectedYear);
         // Si hay una materia seleccionada, la agregamos a la URL
         if (selectedMateria) params.append("materia_id", selectedMateria);
+        // Solo los primeros comentarios; el resto se pide por pregunta
+        params.append("max_comentarios", String(MAX_COMENTARIOS));
 
         const url = `${API_BASE_URL}/profesor/mis-resultados?${params.toString()}`;
 
@@ -115,7 +120,10 @@ const ResultadosProfesorPage: React.FC = () => {
           &larr; Volver al listado
         </button>
         
-        <CursadaResultados resultado={selectedResultado} />
+        <CursadaResultados
+          resultado={selectedResultado}
+          comentariosUrl={`${API_BASE_URL}/profesor/resultados/${selectedResultado.encuesta_instancia_id}/preguntas`}
+        />
 
         {/* Botón para crear informe de cátedra si corresponde */}
         {selectedResultado.informe_curricular_instancia_id && (
@@ -17,6 +17,8 @@ export interface ResultadoPregunta {
   pregunta_tipo: "REDACCION" | "MULTIPLE_CHOICE";
   resultados_opciones: ResultadoOpcion[] | null;
   respuestas_texto: RespuestaTextoItem[] | null;
+  // Total de comentarios; con max_comentarios respuestas_texto trae solo los primeros
+  cantidad_comentarios?: number | null;
 }
 
 export interface ResultadoSeccion {
@@ -32,9 +34,19 @@ export interface ResultadoCursada {
 
   resultados_por_seccion: ResultadoSeccion[];
   informe_curricular_instancia_id?: number | null;
+  encuesta_instancia_id?: number | null;
   fecha_cierre?: string | null;
 }
 
+// Corresponde a schemas.ComentariosPagina
+export interface ComentariosPagina {
+  pregunta_id: number;
+  total: number;
+  offset: number;
+  limit: number;
+  comentarios: RespuestaTextoItem[];
+}
+
 export interface PlantillaBase {
   id: number;
   titulo: string;